@@ -0,0 +1,55 @@
+'''
+Benchmark of the choropleth figure. The build time and the serialised size of the figure are measured for the former json.load of the GeoJSON file on every call and for every resolution level of the geometry store.
+
+Run from the project root directory:
+python -m benchmarks.choropleth 1_sehr_hoch.geo.json
+'''
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from visualizations.geometry import feature_id, geometry_store
+from visualizations.plots import Visuals
+
+
+def timed(func, repeat=5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build time and payload of the choropleth figure per resolution level")
+    parser.add_argument("path", nargs="?", default="1_sehr_hoch.geo.json")
+    args = parser.parse_args(argv)
+
+    import plotly.express as px
+
+    with open(args.path) as dimension:
+        names = [feature_id(feature, "properties.name") for feature in json.load(dimension)["features"]]
+    data = pd.DataFrame({"Länder": names, "NetExpenditure(TEUR)": range(len(names))})
+
+    def uncached():
+        with open(args.path) as dimension:
+            return px.choropleth(data, geojson=json.load(dimension), locations="Länder", featureidkey="properties.name", color="NetExpenditure(TEUR)")
+
+    def stored(resolution):
+        return Visuals().choropleth_figure(data, args.path, "Länder", "NetExpenditure(TEUR)", {}, "", (0, len(names)), resolution=resolution)
+
+    start = time.perf_counter()
+    geometry_store.entry(args.path)
+    print(f"parse and simplify once: {time.perf_counter() - start:.3f}s\n")
+
+    print(f"{'variant':>10} {'build (s)':>10} {'payload (KiB)':>14}")
+    print(f"{'json.load':>10} {timed(uncached):>10.4f} {len(uncached().to_json()) / 1024:>14.1f}")
+    for resolution in ("full", "high", "medium", "low", "auto"):
+        print(f"{resolution:>10} {timed(lambda: stored(resolution)):>10.4f} {len(stored(resolution).to_json()) / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
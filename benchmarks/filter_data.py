@@ -0,0 +1,60 @@
+'''
+Benchmark of the "Total" row filter of Dataset.filter_data. A synthetic table shaped like the 29 column subsistence export is scaled to millions of rows and the vectorised marker_mask is timed against the former row-wise DataFrame.apply filter, which is only run on the smaller sizes.
+
+Run from the project root directory:
+python -m benchmarks.filter_data
+'''
+import time
+
+import numpy as np
+import pandas as pd
+
+from visualizations.eda import marker_mask
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000, 4_000_000]
+APPLY_LIMIT = 100_000
+LÄNDER = ["Baden-Württemberg", "Bayern", "Berlin", "Brandenburg", "Bremen", "Hamburg", "Hessen", "Mecklenburg-Vorpommern",
+          "Niedersachsen", "Nordrhein-Westfalen", "Rheinland-Pfalz", "Saarland", "Sachsen", "Sachsen-Anhalt", "Schleswig-Holstein", "Thüringen", "Total"]
+
+
+def synthetic_table(n_rows: int, n_measures=27, seed=0) -> pd.DataFrame:
+    '''
+    Produces a table with a Länder and Gender label column and n_measures numeric columns, about 1 in 9 rows are subtotal rows.
+    '''
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Länder": np.array(LÄNDER, dtype=object)[rng.integers(0, len(LÄNDER), n_rows)],
+        "Gender": np.array(["Male", "Female", "Total"], dtype=object)[rng.integers(0, 3, n_rows) // 2 * 2 % 3],
+    })
+    measures = rng.integers(0, 100_000, size=(n_rows, n_measures))
+    return pd.concat([df, pd.DataFrame(measures, columns=[f"M{i}" for i in range(n_measures)])], axis=1)
+
+
+def timed(func, repeat=3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'rows':>10} {'marker_mask (s)':>16} {'ns/row':>8} {'apply (s)':>10} {'ns/row':>8}")
+
+    for n_rows in ROW_COUNTS:
+        df = synthetic_table(n_rows)
+        vectorised = timed(lambda: df[~marker_mask(df)])
+
+        row = f"{n_rows:>10} {vectorised:>16.4f} {vectorised / n_rows * 1e9:>8.1f}"
+        if n_rows <= APPLY_LIMIT:
+            row_wise = timed(lambda: df[~df.apply(lambda r: r.astype(str).str.contains("Total").any(), axis=1)], repeat=1)
+            row += f" {row_wise:>10.4f} {row_wise / n_rows * 1e9:>8.1f}"
+        else:
+            row += f" {'-':>10} {'-':>8}"
+
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+'''
+Import-time profile of the application entry points. Each module is imported in a fresh interpreter started with "python -X importtime", the per-module self and cumulative times are parsed from its stderr and the best cumulative time of a few runs is compared against the startup budget of the module.
+
+Run from the project root directory:
+python -m benchmarks.import_time [--output profile.json] [module ...]
+'''
+import argparse
+import json
+import subprocess
+import sys
+
+# Startup budgets in seconds of a cold "import <module>", the wireframe budget is dominated by streamlit and pandas
+BUDGETS = {
+    "visualizations": 0.25,
+    "webview.wireframe": 3.0,
+}
+RUNS = 3
+
+
+def profile_import(module: str, python=sys.executable) -> dict[str, dict]:
+    '''
+    Imports the module in a fresh interpreter and parses the -X importtime report.
+
+    Inputs:
+    - module: dotted module name
+    - python: interpreter executable
+
+    Output:
+    - dictionary of imported module name to its "self" and "cumulative" import time in seconds, in import order
+    '''
+    process = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True)
+    if process.returncode:
+        raise ImportError(f"import {module} failed: {process.stderr.strip().splitlines()[-1]}")
+
+    profile = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            # Header line of the report
+            continue
+        profile[name.strip()] = {"self": int(own) / 1e6, "cumulative": int(cumulative) / 1e6}
+
+    return profile
+
+
+def import_time(module: str, runs=RUNS) -> tuple[float, dict[str, dict]]:
+    '''
+    Provides the best cumulative import time of the module over a number of fresh interpreters together with the profile of that run.
+    '''
+    best, best_profile = float("inf"), {}
+    for _ in range(runs):
+        profile = profile_import(module)
+        if profile[module]["cumulative"] < best:
+            best, best_profile = profile[module]["cumulative"], profile
+
+    return best, best_profile
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time profile of the application modules")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS))
+    parser.add_argument("--output", help="store the profiles as .json")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest modules printed")
+    args = parser.parse_args(argv)
+
+    over_budget = False
+    recorded = {}
+    for module in args.modules:
+        try:
+            seconds, profile = import_time(module)
+        except ImportError as error:
+            print(error)
+            over_budget = True
+            continue
+        budget = BUDGETS.get(module)
+        recorded[module] = {"seconds": seconds, "budget": budget, "profile": profile}
+
+        if budget is None:
+            status = "no budget"
+        else:
+            status = f"budget {budget}s " + ("ok" if seconds <= budget else "OVER BUDGET")
+            over_budget |= seconds > budget
+        print(f"import {module}: {seconds:.3f}s ({status})")
+
+        slowest = sorted(profile.items(), key=lambda item: item[1]["self"], reverse=True)[:args.top]
+        for name, timing in slowest:
+            print(f"    {timing['self'] * 1e3:>9.1f} ms self {timing['cumulative'] * 1e3:>9.1f} ms cumulative  {name}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(recorded, output, indent=2)
+
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+'''
+Benchmark of the line and bar charts on large inputs. Synthetic monthly series per Land, bar plots over Kreis-level regions and Kreis by month heatmaps are drawn with the SVG rendering of every point, bar and cell and with the automatic rendering of Visuals (LTTB downsampled and WebGL lines, aggregated bars, rasterised heatmaps), measuring the figure build time, the serialisation time and the serialised size of the figure.
+
+Run from the project root directory:
+python -m benchmarks.large_figures
+'''
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from visualizations.figures import figure_templates
+from visualizations.plots import Visuals
+
+MONTHS_PER_LAND = [12, 120, 1_200, 12_000, 60_000]
+REGION_COUNTS = [16, 400, 4_000]
+PIVOT_SHAPES = [(2, 16), (400, 120), (400, 1_200), (4_000, 1_200)]
+# Largest pivot table drawn cell by cell, the JSON of every cell takes minutes beyond it
+FULL_CELL_LIMIT = 500_000
+LÄNDER = 16
+
+
+def monthly_series(months: int, seed=0) -> pd.DataFrame:
+    '''
+    Produces a Year, Total and Länder table with one row per month and Land, the recipient counts follow a random walk.
+    '''
+    rng = np.random.default_rng(seed)
+    walks = 50_000 + np.cumsum(rng.normal(0, 500, (LÄNDER, months)), axis=1)
+    return pd.DataFrame({
+        "Länder": np.repeat([f"Land {number}" for number in range(LÄNDER)], months),
+        "Year": np.tile(2000 + np.arange(months) / 12, LÄNDER),
+        "Total": walks.ravel().round().astype(np.int64),
+    })
+
+
+def regions(count: int, seed=0) -> pd.DataFrame:
+    '''
+    Produces one PublicAssistance value per region.
+    '''
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"PublicAssistance": "Hilfe zum Lebensunterhalt", "Kreis": [f"Kreis {number}" for number in range(count)], "Value": rng.integers(0, 10_000, count)})
+
+
+def kreis_months(kreise: int, months: int, seed=0) -> pd.DataFrame:
+    '''
+    Produces a pivot table of one random walk over the months per Kreis.
+    '''
+    rng = np.random.default_rng(seed)
+    values = 1_000 + np.cumsum(rng.normal(0, 10, (kreise, months)), axis=1)
+    return pd.DataFrame(values, index=[f"Kreis {number}" for number in range(kreise)], columns=[f"{2000 + month // 12}-{month % 12 + 1:02d}" for month in range(months)])
+
+
+def timed(func, repeat=3) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def row(label, size, draw) -> str:
+    figure_templates.clear()
+    first, _ = timed(draw, repeat=1)
+    patched, figure = timed(draw)
+    serialised, document = timed(figure.to_json)
+    return f"{label:>10} {size:>10} {first:>10.3f} {patched:>12.3f} {serialised:>14.3f} {len(document) / 1024:>12.0f} {figure.data[0].type:>10} {len(figure.data):>7}"
+
+
+def main():
+    full, auto = Visuals(), Visuals()
+    # Every point is kept within a budget of the longest series per pixel
+    full.webgl_points, full.bar_limit, full.raster_cells, full.points_per_pixel = math.inf, math.inf, math.inf, max(MONTHS_PER_LAND)
+
+    header = f"{'mode':>10} {'size':>10} {'first (s)':>10} {'patched (s)':>12} {'serialise (s)':>14} {'JSON (KiB)':>12} {'trace':>10} {'traces':>7}"
+    print("line_progression_chart, points per Land")
+    print(header)
+    for months in MONTHS_PER_LAND:
+        data = monthly_series(months)
+        for label, visuals in (("full", full), ("auto", auto)):
+            print(row(label, months, lambda: visuals.line_progression_chart(data, "Year", "Total", "Länder", "Monthly")))
+
+    print("\nbar_plot_visual, regions")
+    print(header)
+    for count in REGION_COUNTS:
+        data = regions(count)
+        for label, visuals in (("full", full), ("auto", auto)):
+            print(row(label, count, lambda: visuals.bar_plot_visual(data, "PublicAssistance", "Hilfe zum Lebensunterhalt", "Value", "Kreise", type_area="Kreis")))
+
+    print("\ngenerate_heatmap, cells")
+    print(header)
+    for kreise, months in PIVOT_SHAPES:
+        data = kreis_months(kreise, months)
+        for label, visuals in (("full", full), ("auto", auto)):
+            if label == "full" and data.size > FULL_CELL_LIMIT:
+                continue
+            print(row(label, data.size, lambda: visuals.generate_heatmap("Month", "Kreis", "Recipients", "Recipients per Kreis", data)))
+
+
+if __name__ == "__main__":
+    main()
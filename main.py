@@ -1,6 +1,11 @@
+import logging
+import os
+
 from webview.wireframe import WebApp
 
 
 if __name__ == "__main__":
+    # Stage timings of the pipelines are logged at INFO, head previews of the frames at DEBUG
+    logging.basicConfig(level=os.environ.get("VISUALIZATIONS_LOG_LEVEL", "WARNING"), format="%(asctime)s %(name)s %(levelname)s %(message)s")
     WebApp()
 
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from visualizations.cache import FrameCache
+from visualizations.eda import BasicSecurity
+
+
+class TestFrameCache(unittest.TestCase):
+    """
+    Unit tests for the processed frame cache of the Dataset classes
+    """
+
+    def setUp(self):
+        """
+        Setting up a temporary data and cache directory with a copy of the basic security benefits export
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "basic_security_benefits.csv")
+        shutil.copy("data/basic_security_benefits.csv", self.path)
+        self.cache = FrameCache(os.path.join(self.directory, "cache"))
+        self.steps = [
+            ("file_processing", (["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"],), {}),
+            ("dtype_conversion", ("Q1", "Q2", "Q3", "Q4"), {}),
+            ("filter_data", (), {}),
+            ("data_group", (), {"cols": ["Q1", "Q2", "Q3", "Q4"], "group_element": "Gender", "include_total": True}),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def dataset(self):
+        bsc = BasicSecurity(self.path, ";")
+        bsc.frame_cache = self.cache
+        return bsc
+
+    def test_warm_start_skips_processing(self):
+        """
+        Testing that a second run restores the frames from the cache without parsing the csv file
+        """
+        cold = self.dataset()
+        cold.run_pipeline(self.steps)
+
+        warm = self.dataset()
+        with mock.patch.object(BasicSecurity, "file_processing") as file_processing:
+            warm.run_pipeline(self.steps)
+            file_processing.assert_not_called()
+
+        pd.testing.assert_frame_equal(warm.df, cold.df)
+        pd.testing.assert_frame_equal(warm.Gender_df, cold.Gender_df)
+
+    def test_changed_arguments_use_new_key(self):
+        """
+        Testing that different processing arguments do not share a cache entry
+        """
+        bsc = self.dataset()
+        other_steps = self.steps[:-1] + [("data_group", (), {"cols": ["Q1"], "group_element": "Gender"})]
+        self.assertNotEqual(bsc.cache_key(self.steps), bsc.cache_key(other_steps))
+
+    def test_invalidate_and_clean(self):
+        """
+        Testing the explicit invalidation of a dataset and the removal of stale entries after the source changed
+        """
+        bsc = self.dataset()
+        bsc.run_pipeline(self.steps)
+        self.assertEqual(bsc.invalidate_cache(), 1)
+        self.assertIsNone(self.cache.load(bsc.cache_key(self.steps)))
+
+        bsc.run_pipeline(self.steps)
+        with open(self.path, "ab") as data_file:
+            data_file.write(b"\n")
+        self.assertEqual(self.cache.clean(), 1)
+        self.assertEqual(self.cache.clean(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from pandas.testing import assert_frame_equal
+
+from visualizations import genesis
+from visualizations.eda import BasicSecurity, Dataset, PublicAssistance, Subsistence
+from visualizations.tidy import SUBSISTENCE_CELLS
+
+
+class TestChunkedPipeline(unittest.TestCase):
+    """
+    Unit tests for the out-of-core mode of run_pipeline
+    """
+
+    def setUp(self):
+        """
+        Setting up the PublicAssistance and BasicSecurity pipelines of the package
+        """
+        self.pa_steps = [
+            ("file_processing", (["Year", "Länder", "TypeCode", "PublicAssistance", "Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"],), {}),
+            ("dtype_conversion", ("Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"), {}),
+            ("filter_data", (), {}),
+            ("data_group", (), {"cols": ["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"], "group_element": "Länder"}),
+            ("data_group", (), {"cols": ["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"], "group_element": "PublicAssistance"}),
+        ]
+        self.bsc_steps = [
+            ("file_processing", (["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"],), {}),
+            ("dtype_conversion", ("Q1", "Q2", "Q3", "Q4"), {}),
+            ("filter_data", (), {}),
+            ("pivot_table", (), {"columns": ["Q1", "Q2", "Q3", "Q4"], "group_element": ["Länder", "Gender"], "values": "Total", "index": "Gender", "column_header": "Länder"}),
+            ("data_group", (), {"cols": ["Q1", "Q2", "Q3", "Q4"], "group_element": "Gender", "include_total": True}),
+        ]
+
+    def test_matches_in_memory_pipeline(self):
+        """
+        Testing that the combined partial sums of small chunks give the frames of the in-memory pipeline, including the fixed-point declarations
+        """
+        for cls, path, steps in ((PublicAssistance, "data/public_assistance.csv", self.pa_steps), (BasicSecurity, "data/basic_security_benefits.csv", self.bsc_steps)):
+            eager = cls(path, ";")
+            eager.run_pipeline(steps, use_cache=False)
+            streamed = cls(path, ";")
+            outputs = streamed.run_chunked(steps, memory_budget=16 * 1024)
+
+            self.assertIsNone(streamed.df)
+            expected = {name: frame for name, frame in eager.processed_frames().items() if name != "df"}
+            self.assertEqual(sorted(outputs), sorted(expected))
+            for name, frame in expected.items():
+                assert_frame_equal(getattr(streamed, name), frame)
+                self.assertEqual(getattr(streamed, name).attrs, frame.attrs)
+
+    def test_dataset_requires_prepare_frame(self):
+        """
+        Testing that a Dataset class without prepare_frame is rejected when it is instantiated instead of when a chunk is streamed
+        """
+        class Unprepared(Dataset):
+            pass
+
+        with self.assertRaisesRegex(TypeError, "prepare_frame"):
+            Unprepared("data/basic_security_benefits.csv", ";")
+
+    def test_year_range_rows(self):
+        """
+        Testing that the year range rows of the Subsistence chunks are collected into filtered_df and that tidy is refused
+        """
+        steps = [("file_processing", (), {}), ("dtype_conversion", ("Year", *SUBSISTENCE_CELLS), {}), ("filter_data", (), {"year_start": 2010, "year_end": 2022})]
+        eager = Subsistence("data/subsistence_benefits.csv", ";")
+        eager.run_pipeline(steps, use_cache=False)
+        streamed = Subsistence("data/subsistence_benefits.csv", ";")
+        streamed.run_pipeline(steps, use_cache=False, memory_budget=64 * 1024)
+
+        assert_frame_equal(streamed.filtered_df, eager.filtered_df)
+        with self.assertRaises(ValueError):
+            streamed.run_pipeline(steps + [("tidy", (), {})], use_cache=False, memory_budget=64 * 1024)
+        with self.assertRaises(ValueError):
+            streamed.run_pipeline(steps, lazy=True, memory_budget=64 * 1024)
+
+    def test_resized_chunks(self):
+        """
+        Testing that the rows of the following chunks can be changed while iterating
+        """
+        chunks = genesis.read_genesis_table("data/subsistence_benefits.csv", "ISO-8859-1", ";", skiprows=7, skipfooter=4, chunksize=100)
+        sizes = [len(next(chunks))]
+        chunks.chunksize = 150
+        sizes += [len(chunk) for chunk in chunks]
+        self.assertEqual(sizes, [100, 150, 150, 49])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from visualizations.cube import AggregateCube
+from visualizations.measures import TEUR, declare_fixed_point
+
+
+class TestAggregateCube(unittest.TestCase):
+    """
+    Unit tests for the rollup cube answering the dashboard filters
+    """
+
+    def setUp(self):
+        """
+        Setting up a small Länder x benefit x year table with a subtotal row and a missing cell
+        """
+        self.df = pd.DataFrame({
+            "Länder": pd.Categorical(["Bayern", "Bayern", "Berlin", "Berlin", "Total"], categories=["Bayern", "Berlin", "Total"]),
+            "PublicAssistance": pd.Categorical(["Care", "Health", "Care", "Health", "Care"]),
+            "Year": [2021, 2022, 2021, 2022, 2021],
+            "Expenditure(TEUR)": pd.array([10, 20, 30, None, 40], dtype="Int64"),
+        })
+        declare_fixed_point(self.df, {"Expenditure(TEUR)": TEUR})
+        self.cube = AggregateCube()
+        self.cube.update("pa", self.df, ["Länder", "PublicAssistance", "Year"], key="v1")
+
+    def test_rollup_levels(self):
+        """
+        Testing that every level equals the groupby of the source without its subtotal rows
+        """
+        source = self.df[self.df["Länder"] != "Total"]
+        for by in (["Länder"], ["PublicAssistance"], ["Länder", "Year"]):
+            expected = source.groupby(by, observed=True)[["Expenditure(TEUR)"]].sum(min_count=1).reset_index()
+            assert_frame_equal(self.cube.query("pa", by), expected)
+
+        total = self.cube.query("pa", [])
+        self.assertEqual(total["Expenditure(TEUR)"].tolist(), [60])
+        self.assertEqual(total.attrs["fixed_point"]["Expenditure(TEUR)"]["unit"], "TEUR")
+
+    def test_filtered_query(self):
+        """
+        Testing that a benefit type and Länder selection is summed over the selected slices
+        """
+        result = self.cube.query("pa", ["PublicAssistance"], where={"Länder": ["Berlin"]})
+        self.assertEqual(result["PublicAssistance"].tolist(), ["Care", "Health"])
+        self.assertEqual(result["Expenditure(TEUR)"].tolist(), [30, pd.NA])
+
+        result = self.cube.query("pa", ["Year", "Länder"], where={"PublicAssistance": ["Care"]})
+        self.assertEqual(list(result.columns), ["Year", "Länder", "Expenditure(TEUR)"])
+
+        with self.assertRaises(KeyError):
+            self.cube.query("pa", ["Gender"])
+
+    def test_incremental_update(self):
+        """
+        Testing that only partitions with a changed key are rebuilt
+        """
+        self.cube.update("sub", self.df, ["Länder", "Year"], key="s1")
+        sub = self.cube.partitions["sub"]
+
+        self.assertFalse(self.cube.update("pa", self.df, ["Länder", "PublicAssistance", "Year"], key="v1"))
+        self.assertTrue(self.cube.update("pa", self.df.iloc[:2], ["Länder", "PublicAssistance", "Year"], key="v2"))
+        self.assertIs(self.cube.partitions["sub"], sub)
+        self.assertEqual(self.cube.query("pa", [])["Expenditure(TEUR)"].tolist(), [30])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from visualizations import load_basic_security, load_public_assistance
+from visualizations.cache import FrameCache
+from visualizations.database import SQLBackend
+from visualizations.eda import BasicSecurity, Dataset
+
+
+class TestSQLBackend(unittest.TestCase):
+    """
+    Unit tests for the embedded database backend of the aggregations
+    """
+
+    def setUp(self):
+        """
+        Setting up an in-memory SQLite database and a small frame with a categorical dimension and missing cells
+        """
+        self.backend = SQLBackend(engine="sqlite")
+        self.df = pd.DataFrame({
+            "Länder": pd.Categorical(["Berlin", "Bayern", "Berlin", "Bremen", None], categories=["Bayern", "Berlin", "Bremen"]),
+            "Q1": pd.array([1, 2, 3, None, 5], dtype="UInt32"),
+            "Q2": pd.array([10, None, 30, None, 50], dtype="Int64"),
+        })
+        self.df.attrs["fixed_point"] = {"Q2": {"unit": "TEUR", "decimals": 0}}
+
+    def tearDown(self):
+        self.backend.close()
+
+    def test_group_sum_matches_pandas(self):
+        """
+        Testing that the SQL aggregation returns the categories, order, missing sums, dtypes and attrs of the pandas groupby
+        """
+        self.backend.ingest("table", self.df)
+        expected = self.df.groupby("Länder", observed=True)[["Q1", "Q2"]].sum(min_count=1).reset_index()
+
+        grouped = self.backend.group_sum("table", ["Länder"], ["Q1", "Q2"])
+        assert_frame_equal(grouped, expected)
+        self.assertEqual(grouped.attrs, self.df.attrs)
+
+        with self.assertRaises(KeyError):
+            self.backend.group_sum("table", ["Gender"], ["Q1"])
+
+    def test_ingest_once(self):
+        """
+        Testing that a table is not written again for the same key and that chunks are appended
+        """
+        chunks = [self.df.iloc[:2], self.df.iloc[2:]]
+        self.assertTrue(self.backend.ingest("table", iter(chunks), key="v1"))
+        self.assertFalse(self.backend.ingest("table", self.df, key="v1"))
+
+        assert_frame_equal(self.backend.frame("table"), self.df)
+
+    def test_dataset_backend(self):
+        """
+        Testing that data_group and pivot_table produce the pandas results when run through the backend
+        """
+        steps = [
+            ("file_processing", (["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"],), {}),
+            ("dtype_conversion", ("Q1", "Q2", "Q3", "Q4"), {}),
+            ("filter_data", (), {}),
+            ("pivot_table", (), {"columns": ["Q1", "Q2", "Q3", "Q4"], "group_element": ["Länder", "Gender"], "values": "Total", "index": "Gender", "column_header": "Länder"}),
+            ("data_group", (), {"cols": ["Q1", "Q2", "Q3", "Q4"], "group_element": "Gender", "include_total": True}),
+        ]
+        expected = BasicSecurity("data/basic_security_benefits.csv", ";")
+        expected.run_pipeline(steps, use_cache=False)
+        bsc = BasicSecurity("data/basic_security_benefits.csv", ";")
+        bsc.sql_backend = self.backend
+        bsc.run_pipeline(steps, use_cache=False)
+
+        self.assertEqual(self.backend.key("basic_security_benefits"), bsc.cache_key(steps[:3]))
+        for name in ("LänderGender_df", "pivot_table", "Gender_df"):
+            assert_frame_equal(getattr(bsc, name), getattr(expected, name))
+
+    def test_package_pipelines_backend(self):
+        """
+        Testing that the lazy package pipelines aggregate through the backend once it is set and produce the pandas results
+        """
+        with tempfile.TemporaryDirectory() as cache_dir, mock.patch.object(Dataset, "frame_cache", FrameCache(cache_dir)):
+            expected = {"pa": load_public_assistance(), "bsc": load_basic_security()}
+            for dataset in expected.values():
+                dataset.invalidate_cache()
+
+            with mock.patch.object(Dataset, "sql_backend", self.backend), mock.patch.object(self.backend, "group_sum", wraps=self.backend.group_sum) as group_sum:
+                datasets = {"pa": load_public_assistance(), "bsc": load_basic_security()}
+
+        self.assertIsNotNone(self.backend.key("public_assistance"))
+        self.assertIsNotNone(self.backend.key("basic_security_benefits"))
+        self.assertEqual(group_sum.call_count, 4)
+        for name, frames in (("pa", ["Länder_df", "PublicAssistance_df"]), ("bsc", ["LänderGender_df", "pivot_table", "Gender_df"])):
+            for frame in frames:
+                assert_frame_equal(getattr(datasets[name], frame), getattr(expected[name], frame))
+
+
+if __name__ == "__main__":
+    unittest.main()
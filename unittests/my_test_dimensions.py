@@ -0,0 +1,49 @@
+import unittest
+
+import pandas as pd
+
+from visualizations.dimensions import LÄNDER, SEXES, Dimension
+
+
+class TestDimensions(unittest.TestCase):
+    """
+    Unit tests for the shared dimension registry
+    """
+
+    def test_mis_decoded_labels_map_to_canonical(self):
+        """
+        Testing that replacement characters, mojibake and transliterations resolve to the canonical Land
+        """
+        for label in ["Thüringen", "Th�ringen", "ThÃ¼ringen", "Thueringen", " thüringen "]:
+            self.assertEqual(LÄNDER.canonical(label), "Thüringen")
+        self.assertEqual(LÄNDER.canonical("Baden-W�rttemberg"), "Baden-Württemberg")
+
+    def test_normalise_uses_shared_categories(self):
+        """
+        Testing that normalised columns of different datasets share the same categorical dtype and keep missing values
+        """
+        first = LÄNDER.normalise(pd.Series(["Bayern", "Th�ringen", None]))
+        second = LÄNDER.normalise(pd.Series(["Thüringen", "Berlin"], index=[5, 6]))
+
+        self.assertEqual(first.dtype, second.dtype)
+        self.assertEqual(first.tolist()[:2], ["Bayern", "Thüringen"])
+        self.assertTrue(pd.isna(first.iloc[2]))
+        self.assertEqual(second.index.tolist(), [5, 6])
+        self.assertEqual(SEXES.normalise(pd.Series(["weiblich"])).iloc[0], "Female")
+
+    def test_unknown_labels_become_other(self):
+        """
+        Testing that unknown labels are stored as Other with a warning, so frames normalised before and after them keep one dtype
+        """
+        dimension = Dimension("Test", ["b", "a"])
+        before = dimension.normalise(pd.Series(["a", "b"]))
+        with self.assertLogs("visualizations.dimensions", "WARNING"):
+            after = dimension.normalise(pd.Series(["b", "c"]))
+
+        self.assertEqual(after.tolist(), ["b", "Other"])
+        self.assertEqual(dimension.categories, ["Other", "a", "b"])
+        self.assertEqual(before.dtype, after.dtype)
+        self.assertIsInstance(pd.concat([before, after]).dtype, pd.CategoricalDtype)
+
+if __name__ == "__main__":
+    unittest.main()
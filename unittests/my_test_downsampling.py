@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from visualizations import Visuals
+from visualizations.downsampling import downsample, lttb
+from visualizations.figures import figure_templates
+
+
+def sequential_lttb(x, y, threshold):
+    """
+    Selection of the textbook LTTB algorithm walking the buckets one by one
+    """
+    edges = np.linspace(1, len(x) - 1, threshold - 1).astype(int)
+    selected = [0]
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        following = slice(end, edges[bucket + 2]) if bucket + 2 < len(edges) else slice(len(x) - 1, len(x))
+        ax, ay = x[selected[-1]], y[selected[-1]]
+        areas = np.abs((ax - x[following].mean()) * (y[start:end] - ay) - (ax - x[start:end]) * (y[following].mean() - ay))
+        selected.append(start + int(np.argmax(areas)))
+    return np.array(selected + [len(x) - 1])
+
+
+class TestDownsampling(unittest.TestCase):
+    """
+    Unit tests for the LTTB downsampling of the line charts
+    """
+
+    def setUp(self):
+        """
+        Setting up a dense monthly series with one spike and one dip
+        """
+        self.x = 2000 + np.arange(5000) / 12
+        self.y = np.sin(np.arange(5000) / 200) * 100 + 1000
+        self.y[1234], self.y[3456] = 5000, -2000
+
+    def test_lttb(self):
+        """
+        Testing that the selection holds the threshold of ascending positions including the first and last point, the spike and the dip
+        """
+        selected = lttb(self.x, self.y, 200)
+
+        self.assertEqual(len(selected), 200)
+        self.assertEqual((selected[0], selected[-1]), (0, 4999))
+        self.assertTrue(np.all(np.diff(selected) > 0))
+        self.assertIn(1234, selected)
+        self.assertIn(3456, selected)
+        np.testing.assert_array_equal(lttb(self.x[:100], self.y[:100], 200), np.arange(100))
+
+    def test_matches_sequential_lttb(self):
+        """
+        Testing that the vectorised passes select the same points as the bucket by bucket algorithm on smooth and noisy series
+        """
+        rng = np.random.default_rng(1)
+        for y in (np.cumsum(rng.normal(size=20_000)), rng.normal(size=20_000), self.y):
+            x = np.arange(len(y), dtype=float)
+            np.testing.assert_array_equal(lttb(x, y, 500), sequential_lttb(x, y, 500))
+
+    def test_downsample(self):
+        """
+        Testing that unordered series with missing values are ordered, cleaned and reduced, while labels on the x axis are kept
+        """
+        order = np.random.default_rng(0).permutation(5000)
+        y_values = pd.array(self.y.round().astype(int), dtype="Int64")[order]
+        y_values[7] = pd.NA
+
+        x_kept, y_kept = downsample(self.x[order], y_values.to_numpy(), 300)
+        self.assertEqual(len(x_kept), 300)
+        self.assertTrue(np.all(np.diff(x_kept) > 0))
+        self.assertEqual((max(y_kept), min(y_kept)), (5000, -2000))
+
+        labels = np.array([f"month {number}" for number in range(5000)], dtype=object)
+        self.assertIs(downsample(labels, self.y, 300)[0], labels)
+
+    def test_line_progression_chart(self):
+        """
+        Testing that every line is reduced to the width of the chart and that the x range is applied before the reduction
+        """
+        figure_templates.clear()
+        data = pd.DataFrame({"Länder": np.repeat(["Bayern", "Berlin"], 5000), "Year": np.tile(self.x, 2), "Total": np.tile(self.y, 2)})
+        visuals = Visuals()
+
+        chart = visuals.line_progression_chart(data, "Year", "Total", "Länder", "Monthly", width=400)
+        self.assertEqual([len(trace.x) for trace in chart.data], [400, 400])
+        self.assertEqual(max(chart.data[0].y), 5000)
+
+        zoomed = visuals.line_progression_chart(data, "Year", "Total", "Länder", "Monthly", width=400, x_range=(2100, 2110))
+        self.assertEqual([len(trace.x) for trace in zoomed.data], [121, 121])
+        self.assertEqual({trace.type for trace in zoomed.data}, {"scatter"})
+
+
+if __name__ == "__main__":
+    unittest.main()
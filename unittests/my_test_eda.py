@@ -1,6 +1,7 @@
 import unittest
 import pandas as pd
 from visualizations import PublicAssistance, BasicSecurity
+from visualizations.eda import marker_mask
 
 class TestPublicAssistance(unittest.TestCase):
     """
@@ -29,6 +30,20 @@ class TestPublicAssistance(unittest.TestCase):
         """
         self.pa.filter_data()
         self.assertNotIn("Total", self.pa.df["Länder"].values)
+        self.assertNotIn("Total", self.pa.df["PublicAssistance"].values)
+
+    def test_marker_mask(self):
+        """
+        Testing that the vectorised marker mask flags rows with a marker in any label column, including categorical columns, and ignores numeric columns
+        """
+        df = pd.DataFrame({
+            "Länder": pd.Categorical(["Bayern", "Total", "Berlin", None]),
+            "Gender": ["Male", "Female", "Total Males", "Female"],
+            "Q1": [1, 2, 3, 4],
+        })
+        self.assertEqual(marker_mask(df).tolist(), [False, True, True, False])
+        self.assertEqual(marker_mask(df, label_cols=["Länder"]).tolist(), [False, True, False, False])
+        self.assertEqual(marker_mask(df, markers=("Bay", "Berl")).tolist(), [True, False, True, False])
         
     def test_data_group(self):
         """
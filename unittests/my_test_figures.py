@@ -0,0 +1,131 @@
+import json
+import unittest
+
+import pandas as pd
+
+from visualizations import Visuals
+from visualizations.figures import figure_templates, groups
+
+
+class TestFigureTemplates(unittest.TestCase):
+    """
+    Unit tests for the figures patched from the chart templates
+    """
+
+    def setUp(self):
+        """
+        Setting up two inputs per chart, the first one builds the template and the second one is patched into it
+        """
+        figure_templates.clear()
+        self.visuals = Visuals()
+        länder = pd.Categorical(["Hamburg", "Bayern", "Berlin", "Hamburg", "Bayern", "Berlin"], categories=["Bayern", "Berlin", "Bremen", "Hamburg"])
+        self.quarters = pd.DataFrame({"Länder": länder, "Quarter": ["Q1", "Q1", "Q1", "Q2", "Q2", "Q2"], "Value": [10, 20, 30, 15, 25, 35]})
+        self.years = pd.DataFrame({"Länder": länder, "Year": [2010, 2010, 2010, 2011, 2011, 2011], "Total": [5, 6, 7, 8, 9, 10]})
+        self.pivot = pd.DataFrame([[1, 2, 3], [4, 5, 6]], index=pd.Index(["Male", "Female"], name="Gender"), columns=pd.Index(["Bayern", "Berlin", "Hamburg"], name="Länder"))
+
+    def tearDown(self):
+        figure_templates.clear()
+
+    def assertMatchesExpress(self, draw_first, draw):
+        """
+        Asserting that a figure patched into the template of another input equals the figure plotly.express builds for the input
+        """
+        draw_first()
+        builds = figure_templates.builds
+        patched = draw()
+        self.assertEqual(figure_templates.builds, builds)
+
+        figure_templates.clear()
+        built = draw()
+        self.assertEqual(json.loads(patched.to_json()), json.loads(built.to_json()))
+
+    def test_groups_in_order_of_appearance(self):
+        """
+        Testing that the traces follow the first appearance of the values, not the order of the categories
+        """
+        split = groups(self.quarters, "Länder", "Value")
+        self.assertEqual([value for value, _ in split], ["Hamburg", "Bayern", "Berlin"])
+        self.assertEqual([list(arrays[0]) for _, arrays in split], [[10, 15], [20, 25], [30, 35]])
+
+    def test_bar_plot_visual(self):
+        """
+        Testing that the patched bar plot of the selected regions equals the figure of plotly.express
+        """
+        data = self.quarters.rename(columns={"Quarter": "PublicAssistance"})
+        self.assertMatchesExpress(
+            lambda: self.visuals.bar_plot_visual(data, "PublicAssistance", "Q1", "Value", "Q1 values"),
+            lambda: self.visuals.bar_plot_visual(data, "PublicAssistance", "Q2", "Value", "Q2 values", chosen_states=["Berlin", "Hamburg"]))
+
+    def test_grouped_bar_plot(self):
+        """
+        Testing that the patched grouped bar plot with its colour sequence and y-axis range equals the figure of plotly.express
+        """
+        self.assertMatchesExpress(
+            lambda: self.visuals.grouped_bar_plot(self.quarters.head(3), 30, "Länder", "Value", "Quarter", "First", ["red"]),
+            lambda: self.visuals.grouped_bar_plot(self.quarters, 40, "Länder", "Value", "Quarter", "Second", ["purple", "azure"]))
+
+    def test_line_progression_chart(self):
+        """
+        Testing that the patched line chart equals the figure of plotly.express
+        """
+        self.assertMatchesExpress(
+            lambda: self.visuals.line_progression_chart(self.years.head(2), "Year", "Total", "Länder", "First"),
+            lambda: self.visuals.line_progression_chart(self.years, "Year", "Total", "Länder", "Second"))
+
+    def test_donut_visual(self):
+        """
+        Testing that the patched donut chart equals the figure of plotly.express
+        """
+        self.assertMatchesExpress(
+            lambda: self.visuals.donut_visual(self.years, "Total", "Länder"),
+            lambda: self.visuals.donut_visual(self.quarters, "Value", "Quarter", in_percent=True))
+
+    def test_generate_heatmap(self):
+        """
+        Testing that the patched heatmap equals the figure of plotly.express
+        """
+        self.assertMatchesExpress(
+            lambda: self.visuals.generate_heatmap("x", "y", "z", "First", self.pivot.iloc[:1, :2]),
+            lambda: self.visuals.generate_heatmap("Länder", "Gender", "Total Value", "Second", self.pivot))
+
+    def test_webgl_lines(self):
+        """
+        Testing that long series are drawn with WebGL traces equal to those of plotly.express and short series keep the SVG traces
+        """
+        self.visuals.webgl_points = 4
+        long_years = pd.concat([self.years.assign(Year=self.years["Year"] + offset) for offset in range(0, 10, 2)], ignore_index=True)
+
+        self.assertEqual({trace.type for trace in self.visuals.line_progression_chart(self.years.head(3), "Year", "Total", "Länder", "Short").data}, {"scatter"})
+        self.assertEqual({trace.type for trace in self.visuals.line_progression_chart(long_years, "Year", "Total", "Länder", "Long").data}, {"scattergl"})
+        self.assertMatchesExpress(
+            lambda: self.visuals.line_progression_chart(long_years.head(6), "Year", "Total", "Länder", "First"),
+            lambda: self.visuals.line_progression_chart(long_years, "Year", "Total", "Länder", "Second"))
+
+    def test_aggregated_bars(self):
+        """
+        Testing that the regions beyond the bar limit are summed into one bar
+        """
+        self.visuals.bar_limit = 3
+        data = pd.DataFrame({"PublicAssistance": "A", "Kreis": [f"K{number}" for number in range(10)], "Value": range(10)})
+
+        bars = self.visuals.bar_plot_visual(data, "PublicAssistance", "A", "Value", "Kreise", type_area="Kreis")
+        self.assertEqual([trace.name for trace in bars.data], ["K9", "K8", "Other (8)"])
+        self.assertEqual([list(trace.y) for trace in bars.data], [[9], [8], [28]])
+
+        self.visuals.bar_limit = 10
+        self.assertEqual(len(self.visuals.bar_plot_visual(data, "PublicAssistance", "A", "Value", "Kreise", type_area="Kreis").data), 10)
+
+    def test_figures_are_independent(self):
+        """
+        Testing that changing a returned figure leaves the template and the following figures unchanged
+        """
+        first = self.visuals.line_progression_chart(self.years, "Year", "Total", "Länder", "Title")
+        expected = first.to_json()
+        first.update_layout(title="Changed", height=100)
+        first.data[0].line.color = "red"
+
+        self.assertEqual(self.visuals.line_progression_chart(self.years, "Year", "Total", "Länder", "Title").to_json(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from visualizations import genesis
+
+
+class TestEncodingResolution(unittest.TestCase):
+    """
+    Unit tests for the sampled encoding resolution of GENESIS files
+    """
+
+    def setUp(self):
+        """
+        Copies a GENESIS export into a temporary directory so the sidecar files do not touch the data directory
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "basic_security_benefits.csv")
+        shutil.copy("data/basic_security_benefits.csv", self.path)
+        genesis._resolved_encodings.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        genesis._resolved_encodings.clear()
+
+    def test_sample_is_bounded(self):
+        """
+        Testing that the sample only holds the head and tail blocks of the file
+        """
+        sample = genesis.read_sample(self.path, sample_size=1024)
+        self.assertLessEqual(len(sample), 2048)
+        self.assertTrue(sample.startswith(b"GENESIS-Tabelle"))
+        self.assertIn(b"created:", sample)
+
+    def test_resolve_encoding_writes_sidecar(self):
+        """
+        Testing that the resolved encoding is persisted and served from the sidecar without running chardet again
+        """
+        encoding = genesis.resolve_encoding(self.path)
+        self.assertEqual(encoding, "ISO-8859-1")
+        self.assertTrue(os.path.exists(genesis.sidecar_path(self.path, "encoding")))
+
+        genesis._resolved_encodings.clear()
+        with mock.patch.object(genesis.chardet, "detect") as detect:
+            self.assertEqual(genesis.resolve_encoding(self.path), "ISO-8859-1")
+            detect.assert_not_called()
+
+    def test_changed_file_invalidates_sidecar(self):
+        """
+        Testing that a modified file is detected again instead of using the stale sidecar entry
+        """
+        genesis.resolve_encoding(self.path)
+        genesis._resolved_encodings.clear()
+
+        with open(self.path, "w", encoding="utf-8") as data_file:
+            data_file.write("GENESIS-Tabelle: 00000-0000\nLänder;Thüringen\n")
+
+        self.assertEqual(genesis.resolve_encoding(self.path), "utf-8")
+
+    def test_low_confidence_falls_back_to_full_scan(self):
+        """
+        Testing that an uncertain sample result triggers the full file scan
+        """
+        with mock.patch.object(genesis.chardet, "detect", return_value={"encoding": None, "confidence": 0.0}):
+            self.assertEqual(genesis.resolve_encoding(self.path), "ISO-8859-1")
+
+    def test_ascii_sample_falls_back_to_full_scan(self):
+        """
+        Testing that a latin-1 file with ASCII-only head and tail blocks is not resolved and stored as ASCII
+        """
+        rows = [f"2022;Kreis {number};{number}\n" for number in range(3000)]
+        rows[1500:1510] = [f"2022;Thüringen {number};{number}\n" for number in range(10)]
+        with open(self.path, "w", encoding="latin-1") as data_file:
+            data_file.write("GENESIS-Tabelle: 00000-0000\n" + "".join(rows) + "__________\n")
+
+        encoding = genesis.resolve_encoding(self.path)
+        self.assertNotEqual(encoding, "ascii")
+        with open(self.path, encoding=encoding) as data_file:
+            self.assertIn("Thüringen 0", data_file.read())
+
+        genesis._resolved_encodings.clear()
+        self.assertEqual(genesis.resolve_encoding(self.path), encoding)
+
+
+class TestGenesisReader(unittest.TestCase):
+    """
+    Unit tests for the byte range based GENESIS table reader
+    """
+
+    def test_footer_offset_counts_quoted_notes_as_one_row(self):
+        """
+        Testing that the footer offset points at the separator line preceding the multi-line quoted note
+        """
+        with open("data/subsistence_benefits.csv", "rb") as data_file:
+            offset = genesis.footer_offset(data_file, 4)
+            data_file.seek(offset)
+            self.assertTrue(data_file.readline().startswith(b"__________"))
+
+    def test_read_matches_python_engine(self):
+        """
+        Testing that the C engine reader returns the same frame as the python engine with skipfooter
+        """
+        expected = pd.read_csv("data/basic_security_benefits.csv", encoding="ISO-8859-1", delimiter=";", skiprows=6, skipfooter=4, engine="python")
+        df = genesis.read_genesis_table("data/basic_security_benefits.csv", "ISO-8859-1", ";", skiprows=6, skipfooter=4)
+        pd.testing.assert_frame_equal(df, expected)
+
+    def test_chunked_read(self):
+        """
+        Testing that chunked reading streams the complete data block
+        """
+        chunks = genesis.read_genesis_table("data/subsistence_benefits.csv", "ISO-8859-1", ";", skiprows=7, skipfooter=4, chunksize=100)
+        sizes = [len(chunk) for chunk in chunks]
+        self.assertEqual(sizes, [100, 100, 100, 100, 49])
+
+
+class TestBoundaryDetection(unittest.TestCase):
+    """
+    Unit tests for the GENESIS header and footer detection
+    """
+
+    def test_detect_boundaries(self):
+        """
+        Testing that the header lines, first data row and footer separator are located for each table
+        """
+        expected = {
+            "data/public_assistance.csv": ("22111-0022", 4, 6, 5),
+            "data/basic_security_benefits.csv": ("22151-0032", 6, 8, 7),
+            "data/subsistence_benefits.csv": ("22121-0011", 5, 9, 8),
+        }
+        for path, (table, header_start, data_start, skiprows) in expected.items():
+            boundaries = genesis.detect_boundaries(path, ";")
+            self.assertEqual(boundaries.table, table)
+            self.assertEqual(boundaries.header_start, header_start)
+            self.assertEqual(boundaries.data_start, data_start)
+            self.assertEqual(boundaries.skiprows(), skiprows)
+
+            with open(path, "rb") as data_file:
+                data_file.seek(boundaries.data_end)
+                self.assertIn(data_file.readline(), (b"", b"__________\n"))
+
+    def test_detected_read_matches_explicit_read(self):
+        """
+        Testing that the detected boundaries produce the same frame as the hand-tuned skiprows and skipfooter values
+        """
+        expected = genesis.read_genesis_table("data/subsistence_benefits.csv", "ISO-8859-1", ";", skiprows=7, skipfooter=4)
+        df = genesis.read_genesis_table("data/subsistence_benefits.csv", "ISO-8859-1", ";", header_depth=2)
+        pd.testing.assert_frame_equal(df, expected)
+
+    def test_non_genesis_file_is_rejected(self):
+        """
+        Testing that files without the GENESIS preamble raise a ValueError
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as data_file:
+            data_file.write("a;b\n1;2\n")
+        try:
+            with self.assertRaises(ValueError):
+                genesis.detect_boundaries(data_file.name, ";")
+        finally:
+            os.remove(data_file.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from visualizations import Visuals
+from visualizations.geometry import GeometryStore, polygons
+
+
+def wiggle(start, end, count, amplitude):
+    """
+    Points of a finely sampled border between two corners, shifted sideways by a small wave
+    """
+    (x0, y0), (x1, y1) = start, end
+    points = []
+    for step in range(count + 1):
+        fraction = step / count
+        offset = amplitude * math.sin(fraction * math.pi * 9) if 0 < step < count else 0
+        points.append([round(x0 + (x1 - x0) * fraction + offset * (y1 - y0), 6), round(y0 + (y1 - y0) * fraction + offset * (x0 - x1), 6)])
+    return points
+
+
+def ring(*edges):
+    """
+    Closed ring joining the edges, each edge starting at the end of the previous one
+    """
+    points = []
+    for edge in edges:
+        points.extend(edge[:-1])
+    return points + [points[0]]
+
+
+class TestGeometryStore(unittest.TestCase):
+    """
+    Unit tests for the cached and simplified boundaries of the choropleth figures
+    """
+
+    def setUp(self):
+        """
+        Setting up two Länder sharing a finely sampled border and an enclave inside the first one, similar to Berlin in Brandenburg
+        """
+        west, east = (10.0, 50.0), (12.0, 50.0)
+        north_west, north_east, north = (10.0, 52.0), (12.0, 52.0), (11.0, 52.0)
+        south = (11.0, 50.0)
+        border = wiggle(south, north, 400, 0.01)
+        enclave = [[10.4 + 0.2 * math.cos(angle / 100 * 2 * math.pi), 51.0 + 0.2 * math.sin(angle / 100 * 2 * math.pi)] for angle in range(100)]
+        enclave = [[round(x, 6), round(y, 6)] for x, y in enclave]
+        enclave.append(enclave[0])
+
+        features = [
+            {"type": "Feature", "properties": {"name": "Brandenburg"}, "geometry": {"type": "Polygon", "coordinates": [
+                ring(wiggle(west, south, 200, 0.005), border, wiggle(north, north_west, 200, 0.005), wiggle(north_west, west, 200, 0.005)), enclave[::-1]]}},
+            {"type": "Feature", "properties": {"name": "Sachsen"}, "geometry": {"type": "MultiPolygon", "coordinates": [[
+                ring(border[::-1], wiggle(south, east, 200, 0.005), wiggle(east, north_east, 200, 0.005), wiggle(north_east, north, 200, 0.005))]]}},
+            {"type": "Feature", "properties": {"name": "Berlin"}, "geometry": {"type": "Polygon", "coordinates": [enclave]}},
+        ]
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "laender.geo.json")
+        with open(self.path, "w") as geo_file:
+            json.dump({"type": "FeatureCollection", "features": features}, geo_file)
+        self.store = GeometryStore()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def rings(self, collection, name):
+        feature, = [feature for feature in collection["features"] if feature["properties"]["name"] == name]
+        return [[tuple(point) for point in ring] for polygon in polygons(feature["geometry"]) for ring in polygon]
+
+    def shared_edges(self, points, shared):
+        return {frozenset(edge) for edge in zip(points, points[1:]) if set(edge) <= shared}
+
+    def test_parsed_once_per_version(self):
+        """
+        Testing that the file is parsed on first use and again only after it changed
+        """
+        first = self.store.collection(self.path, "low")
+        self.assertIs(self.store.collection(self.path, "low"), first)
+        self.assertEqual(self.store.loads, 1)
+
+        os.utime(self.path, ns=(1, 1))
+        self.store.collection(self.path, "low")
+        self.assertEqual(self.store.loads, 2)
+
+    def test_levels_shrink(self):
+        """
+        Testing that the coarser levels hold fewer points and bytes than the full geometries
+        """
+        report = self.store.report(self.path)
+        self.assertEqual(list(report), ["full", "high", "medium", "low"])
+        for finer, coarser in zip(list(report.values()), list(report.values())[1:]):
+            self.assertGreaterEqual(finer["points"], coarser["points"])
+        self.assertLess(report["low"]["bytes"] * 10, report["full"]["bytes"])
+
+    def test_shared_borders_stay_identical(self):
+        """
+        Testing that a border simplified at every level is the same line in both neighbours and that the enclave matches its hole
+        """
+        for level in ("full", "high", "medium", "low"):
+            collection = self.store.collection(self.path, level)
+            outer, hole = self.rings(collection, "Brandenburg")
+            neighbour, = self.rings(collection, "Sachsen")
+            berlin, = self.rings(collection, "Berlin")
+
+            shared = set(outer) & set(neighbour)
+            self.assertGreater(len(shared), 2)
+            self.assertEqual(self.shared_edges(outer, shared), self.shared_edges(neighbour, shared))
+            self.assertEqual(set(hole), set(berlin))
+            self.assertGreaterEqual(len(berlin), 4)
+
+    def test_auto_level(self):
+        """
+        Testing that a map of a small region receives finer geometries than the map of all regions
+        """
+        entry = self.store.entry(self.path)
+        self.assertEqual(entry.level_for([0, 1, 2], height=350), "medium")
+        self.assertEqual(entry.level_for([0, 1, 2], height=100), "low")
+        self.assertEqual(entry.level_for([2], height=350), "high")
+
+        berlin = self.store.collection(self.path, ids=["Berlin"])
+        self.assertEqual([feature["properties"]["name"] for feature in berlin["features"]], ["Berlin"])
+
+    def test_choropleth_figure(self):
+        """
+        Testing that the choropleth figure reads the boundaries of the regions in the dataframe from the store
+        """
+        data = pd.DataFrame({"Länder": ["Brandenburg", "Sachsen"], "NetExpenditure(TEUR)": [1000, 2000]})
+        choro = Visuals().choropleth_figure(dataframe=data, dimensions_url=self.path, locations="Länder", color="NetExpenditure(TEUR)",
+                                            labels={}, title="Net Expenditure", range_color=(0, 2000), resolution="medium")
+
+        self.assertIsInstance(choro, go.Figure)
+        self.assertEqual([feature["properties"]["name"] for feature in choro.data[0].geojson["features"]], ["Brandenburg", "Sachsen"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import importlib.util
+import subprocess
+import sys
+import unittest
+
+from benchmarks.import_time import BUDGETS, import_time
+
+
+class TestImportTime(unittest.TestCase):
+    """
+    Unit tests enforcing the startup budgets of the application modules
+    """
+
+    def test_visualizations_budget(self):
+        """
+        Testing that importing the package stays within budget and loads no plotting or dataframe library
+        """
+        seconds, profile = import_time("visualizations")
+
+        self.assertLessEqual(seconds, BUDGETS["visualizations"])
+        for heavy in ("pandas", "plotly", "matplotlib", "chardet"):
+            self.assertNotIn(heavy, profile)
+
+    def test_plots_defer_plotting_libraries(self):
+        """
+        Testing that plotly and matplotlib are only imported when a figure is drawn
+        """
+        _, profile = import_time("visualizations.plots", runs=1)
+
+        self.assertNotIn("plotly", profile)
+        self.assertNotIn("matplotlib", profile)
+
+    @unittest.skipIf(importlib.util.find_spec("streamlit") is None, "streamlit is not installed")
+    def test_wireframe_budget(self):
+        """
+        Testing the startup budget of the streamlit application module and that importing it runs no dataset pipeline
+        """
+        seconds, _ = import_time("webview.wireframe")
+
+        self.assertLessEqual(seconds, BUDGETS["webview.wireframe"])
+
+        submitted = subprocess.run([sys.executable, "-c", "import webview.wireframe, visualizations; print(sorted(visualizations.dataset_loader.futures))"], capture_output=True, text=True, check=True)
+        self.assertEqual(submitted.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import logging
+import unittest
+
+import pandas as pd
+
+from visualizations.eda import BasicSecurity
+from visualizations.instrumentation import Instrumentation, instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Unit tests for the per-stage timings of the Dataset pipelines
+    """
+
+    def setUp(self):
+        """
+        Setting up an empty log and the basic security pipeline of the package
+        """
+        instrumentation.clear()
+        self.steps = [
+            ("file_processing", (["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"],), {}),
+            ("dtype_conversion", ("Q1", "Q2", "Q3", "Q4"), {}),
+            ("filter_data", (), {}),
+            ("data_group", (), {"cols": ["Q1", "Q2", "Q3", "Q4"], "group_element": "Gender", "include_total": True}),
+        ]
+
+    def tearDown(self):
+        instrumentation.clear()
+
+    def test_pipeline_stages(self):
+        """
+        Testing that every step of the pipeline is recorded with its rows, the bytes read by file_processing and the time of the enclosing run_pipeline
+        """
+        bsc = BasicSecurity("data/basic_security_benefits.csv", ";")
+        bsc.run_pipeline(self.steps, use_cache=False)
+
+        records = {record["stage"]: record for record in instrumentation.report()}
+        self.assertEqual(set(records), {"run_pipeline", "file_processing", "dtype_conversion", "filter_data", "data_group"})
+        for record in records.values():
+            self.assertEqual(record["owner"], "BasicSecurity")
+            self.assertGreaterEqual(record["seconds"], 0)
+
+        self.assertIsNone(records["file_processing"]["rows_in"])
+        self.assertEqual(records["dtype_conversion"]["rows_in"], records["file_processing"]["rows_out"])
+        self.assertEqual(records["filter_data"]["rows_out"], len(bsc.df))
+        self.assertLess(records["filter_data"]["rows_out"], records["filter_data"]["rows_in"])
+        self.assertEqual(records["data_group"]["rows_out"], len(bsc.Gender_df))
+
+        self.assertGreater(records["file_processing"]["bytes_read"], 0)
+        self.assertEqual(records["run_pipeline"]["bytes_read"], records["file_processing"]["bytes_read"])
+        self.assertGreaterEqual(records["run_pipeline"]["seconds"], records["file_processing"]["seconds"])
+
+    def test_summary_and_json(self):
+        """
+        Testing that repeated calls are summed per stage and written to the JSON report
+        """
+        log = Instrumentation()
+        for rows in (10, 30):
+            with log.stage("filter_data", "Dataset", rows_in=rows) as record:
+                record["rows_out"] = rows // 2
+
+        summary, = log.summary()
+        self.assertEqual((summary["calls"], summary["rows_in"], summary["rows_out"]), (2, 40, 20))
+        self.assertGreaterEqual(summary["seconds"], summary["max_seconds"])
+
+        document = json.loads(log.to_json())
+        self.assertEqual(len(document["records"]), 2)
+        self.assertEqual(document["summary"][0]["stage"], "filter_data")
+
+    def test_nested_peak(self):
+        """
+        Testing that the peak allocation of an inner stage is included in the peak of the enclosing stage
+        """
+        log = Instrumentation()
+        log.trace_memory(True)
+        try:
+            with log.stage("outer"):
+                with log.stage("inner"):
+                    block = bytearray(4 * 1024 * 1024)
+                    del block
+        finally:
+            log.trace_memory(False)
+
+        records = {record["stage"]: record for record in log.report()}
+        self.assertGreaterEqual(records["inner"]["peak_bytes"], 4 * 1024 * 1024)
+        self.assertGreaterEqual(records["outer"]["peak_bytes"], records["inner"]["peak_bytes"])
+
+    def test_disabled(self):
+        """
+        Testing that nothing is recorded while the instrumentation is disabled
+        """
+        instrumentation.enabled = False
+        try:
+            BasicSecurity("data/basic_security_benefits.csv", ";").run_pipeline(self.steps, use_cache=False)
+        finally:
+            instrumentation.enabled = True
+        self.assertEqual(instrumentation.report(), [])
+
+    def test_previews_need_debug_level(self):
+        """
+        Testing that the frame previews are only logged at DEBUG level
+        """
+        logger = logging.getLogger("visualizations.eda")
+        with self.assertLogs(logger, level="DEBUG") as logs:
+            BasicSecurity("data/basic_security_benefits.csv", ";").run_pipeline(self.steps, use_cache=False)
+        self.assertTrue(any(record.levelno == logging.DEBUG for record in logs.records))
+
+        self.assertFalse(logger.isEnabledFor(logging.DEBUG))
+        self.assertIsInstance(pd.DataFrame(instrumentation.summary()), pd.DataFrame)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import subprocess
+import sys
+import threading
+import unittest
+
+from visualizations.loader import DatasetLoader
+
+
+class TestDatasetLoader(unittest.TestCase):
+    """
+    Unit tests for the concurrent loading of the dataset pipelines
+    """
+
+    def test_pipelines_run_concurrently(self):
+        """
+        Both pipelines wait on a shared barrier, so they only finish when they run at the same time
+        """
+        barrier = threading.Barrier(2, timeout=5)
+
+        def pipeline(value):
+            barrier.wait()
+            return value
+
+        loader = DatasetLoader({"first": lambda: pipeline(1), "second": lambda: pipeline(2)}).start()
+
+        self.assertEqual(loader.result("first", timeout=5), 1)
+        self.assertEqual(loader.result("second", timeout=5), 2)
+
+    def test_timings_reported(self):
+        """
+        Testing that every finished pipeline reports its wall time
+        """
+        loader = DatasetLoader({"pa": lambda: "pa", "bsc": lambda: "bsc"})
+        loader.wait_all(timeout=5)
+
+        report = loader.report()
+        self.assertEqual(set(report), {"pa", "bsc"})
+        self.assertTrue(all(seconds >= 0 for seconds in report.values()))
+
+    def test_exceptions_propagate(self):
+        """
+        Testing that a failing pipeline raises on its own future without affecting the other datasets
+        """
+        def failing():
+            raise ValueError("broken file")
+
+        loader = DatasetLoader({"broken": failing, "fine": lambda: "ok"})
+
+        with self.assertRaises(ValueError):
+            loader.result("broken", timeout=5)
+        self.assertEqual(loader.result("fine", timeout=5), "ok")
+        self.assertIsNotNone(loader.report()["broken"])
+
+
+class TestLazyPackage(unittest.TestCase):
+    """
+    Unit tests for the lazily built module attributes of the visualizations package
+    """
+
+    def run_python(self, code):
+        # A fresh interpreter, the test process has imported the submodules already
+        return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+
+    def test_import_runs_no_pipeline(self):
+        """
+        Testing that importing the package imports neither the dataset classes nor the plotting module
+        """
+        output = self.run_python("import sys, visualizations; print('visualizations.eda' in sys.modules, 'visualizations.plots' in sys.modules, visualizations.dataset_loader.futures == {})")
+
+        self.assertEqual(output, ["False", "False", "True"])
+
+    def test_single_dataset_access(self):
+        """
+        Testing that accessing one dataset only runs its own pipeline and that the attribute is memoised
+        """
+        output = self.run_python("import visualizations as v; bsc = v.bsc; print(sorted(v.dataset_loader.futures), v.bsc is bsc, v.max_quarterly_value > 0)")
+
+        self.assertEqual(output[-3:], ["['bsc']", "True", "True"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import pandas as pd
+
+from visualizations.measures import FixedPoint, declare_fixed_point, display_values, downcast_counts, to_counts, to_fixed_point
+
+
+class TestCountConversion(unittest.TestCase):
+    """
+    Unit tests for the conversion of GENESIS measure columns
+    """
+
+    def test_markers_become_missing(self):
+        """
+        Testing that the GENESIS markers are converted into missing values instead of zeros
+        """
+        counts = to_counts(pd.Series(["12", "-", ".", "x", "...", "7"]))
+        self.assertEqual(counts.isna().tolist(), [False, True, True, True, True, False])
+        self.assertEqual(counts.sum(), 19)
+
+    def test_downcast_to_smallest_type(self):
+        """
+        Testing that counts are stored in the smallest nullable integer type
+        """
+        self.assertEqual(to_counts(pd.Series(["1", "255"])).dtype, "UInt8")
+        self.assertEqual(to_counts(pd.Series(["1", "70000"])).dtype, "UInt32")
+        self.assertEqual(to_counts(pd.Series(["-1", "300"])).dtype, "Int16")
+        self.assertEqual(downcast_counts(pd.Series([1.0, None, 3.0])).dtype, "UInt8")
+        self.assertEqual(downcast_counts(pd.Series([1.5, 2.0])).dtype, "Float64")
+
+    def test_group_of_suppressed_cells_stays_missing(self):
+        """
+        Testing that aggregations do not count suppressed cells as zero
+        """
+        df = pd.DataFrame({"Länder": ["Bayern", "Bayern", "Berlin"], "Value": to_counts(pd.Series(["5", "x", "-"]))})
+        sums = df.groupby("Länder")["Value"].sum(min_count=1)
+        self.assertEqual(sums["Bayern"], 5)
+        self.assertTrue(pd.isna(sums["Berlin"]))
+
+
+class TestFixedPoint(unittest.TestCase):
+    """
+    Unit tests for the fixed-point currency representation
+    """
+
+    def test_exact_parsing(self):
+        """
+        Testing that decimal text is parsed into scaled integers without rounding errors
+        """
+        values = to_fixed_point(pd.Series(["1234,5", "-0.25", "7", "-"]), FixedPoint("TEUR", 2))
+        self.assertEqual(values.dtype, "Int64")
+        self.assertEqual(values.tolist()[:3], [123450, -25, 700])
+        self.assertTrue(pd.isna(values.iloc[3]))
+
+        with self.assertLogs("visualizations.measures", "WARNING"):
+            self.assertTrue(to_fixed_point(pd.Series(["0.125"]), FixedPoint("TEUR", 2)).isna().all())
+
+    def test_stray_flags_become_missing(self):
+        """
+        Testing that a cell with an unexpected flag becomes a missing value with a warning in both converters
+        """
+        with self.assertLogs("visualizations.measures", "WARNING") as logs:
+            values = to_fixed_point(pd.Series(["1.234p", "17", "-"], name="Revenue(TEUR)"), FixedPoint("TEUR", 0))
+            counts = to_counts(pd.Series(["1.234p", "17", "-"], name="Q1"))
+        self.assertEqual(values.isna().tolist(), [True, False, True])
+        self.assertEqual(values.iloc[1], 17)
+        self.assertEqual(counts.isna().tolist(), [True, False, True])
+        self.assertIn("'1.234p'", logs.output[0])
+        self.assertEqual(len(logs.output), 2)
+
+    def test_sums_are_order_independent(self):
+        """
+        Testing that sums of fixed-point values do not depend on the aggregation order, unlike float sums
+        """
+        values = to_fixed_point(pd.Series(["0.1", "0.2", "0.3"] * 1000), FixedPoint("TEUR", 1))
+        self.assertEqual(values.sum(), values[::-1].sum())
+        self.assertEqual(values.sum(), 600 * 10)
+
+    def test_display_values(self):
+        """
+        Testing that declared fixed-point columns are converted back into their unit for display
+        """
+        df = declare_fixed_point(pd.DataFrame({"Revenue(TEUR)": pd.array([123450], dtype="Int64")}), {"Revenue(TEUR)": FixedPoint("TEUR", 2)})
+        self.assertEqual(display_values(df)["Revenue(TEUR)"].iloc[0], 1234.5)
+        self.assertEqual(display_values(df.groupby([0]).sum())["Revenue(TEUR)"].iloc[0], 1234.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from pandas.testing import assert_frame_equal
+
+from visualizations.eda import BasicSecurity
+from visualizations.memo import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    Unit tests for the least recently used result store
+    """
+
+    def test_lru_eviction(self):
+        """
+        Testing that the least recently used entry is evicted and that hits, misses and evictions are counted
+        """
+        cache = ResultCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.info(), {"hits": 2, "misses": 1, "evictions": 1, "size": 2, "maxsize": 2})
+
+
+class TestMemoisedDataset(unittest.TestCase):
+    """
+    Unit tests for the memoised grouping, pivot and melt methods of the Dataset classes
+    """
+
+    def setUp(self):
+        """
+        Setting up a converted and filtered BasicSecurity object without the frame cache
+        """
+        self.bsc = BasicSecurity("data/basic_security_benefits.csv", ";")
+        self.bsc.run_pipeline([
+            ("file_processing", (["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"],), {}),
+            ("dtype_conversion", ("Q1", "Q2", "Q3", "Q4"), {}),
+            ("filter_data", (), {}),
+        ], use_cache=False)
+
+    def test_repeated_calls_hit(self):
+        """
+        Testing that repeated calls return copies of the stored result and restore the frames stored on the object
+        """
+        first = self.bsc.data_group(["Q1", "Q2"], "Gender")
+        stored = self.bsc.Gender_df
+        self.bsc.Gender_df = None
+        second = self.bsc.data_group(["Q1", "Q2"], "Gender")
+
+        self.assertIsNot(second, first)
+        assert_frame_equal(second, first)
+        self.assertIs(self.bsc.Gender_df, stored)
+        self.assertEqual(self.bsc.result_cache.info()["hits"], 1)
+
+        self.bsc.pivot_table(columns=["Q1", "Q2", "Q3", "Q4"], group_element=["Länder", "Gender"], values="Total", index="Gender", column_header="Länder")
+        melted_df, _ = self.bsc.max_quarterly_assessment(data=self.bsc.LänderGender_df, cols=["Länder", "Q1", "Q2"], var_assignment="Quarter", value_name="Value")
+        again, _ = self.bsc.max_quarterly_assessment(data=self.bsc.LänderGender_df, cols=["Länder", "Q1", "Q2"], var_assignment="Quarter", value_name="Value")
+        assert_frame_equal(again, melted_df)
+        self.assertEqual(self.bsc.result_cache.info()["hits"], 2)
+
+    def test_results_are_copies(self):
+        """
+        Testing that changing a returned result in place does not change the result served to later callers
+        """
+        first = self.bsc.data_group(["Q1"], "Gender")
+        expected = first.copy()
+        first.sort_values("Q1", inplace=True)
+        first["Share"] = 1
+
+        assert_frame_equal(self.bsc.data_group(["Q1"], "Gender"), expected)
+
+    def test_mutation_invalidates(self):
+        """
+        Testing that results computed before a change of self.df are never served afterwards
+        """
+        before = self.bsc.data_group(["Q1"], "Gender")
+        version = self.bsc.df_version
+
+        self.bsc.df = self.bsc.df[self.bsc.df["Länder"] == "Bayern"]
+        self.assertGreater(self.bsc.df_version, version)
+
+        after = self.bsc.data_group(["Q1"], "Gender")
+        self.assertIsNot(after, before)
+        self.assertLess(after["Q1"].sum(), before["Q1"].sum())
+
+        self.bsc.dtype_conversion("Q2")
+        self.assertIsNot(self.bsc.data_group(["Q1"], "Gender"), after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+from pandas.testing import assert_frame_equal
+
+from visualizations.eda import BasicSecurity, PublicAssistance
+
+
+class TestQueryPlan(unittest.TestCase):
+    """
+    Unit tests for the lazy query pipeline of the Dataset classes
+    """
+
+    def setUp(self):
+        """
+        Setting up the basic security steps as used by the visualizations package
+        """
+        self.steps = [
+            ("file_processing", (["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"],), {}),
+            ("dtype_conversion", ("Q1", "Q2", "Q3", "Q4"), {}),
+            ("filter_data", (), {}),
+            ("pivot_table", (), {"columns": ["Q1", "Q2", "Q3", "Q4"], "group_element": ["Länder", "Gender"], "values": "Total", "index": "Gender", "column_header": "Länder"}),
+            ("data_group", (), {"cols": ["Q1", "Q2", "Q3", "Q4"], "group_element": "Gender", "include_total": True}),
+        ]
+
+    def test_lazy_matches_eager(self):
+        """
+        Testing that the lazy plan produces the same frames and fixed-point declarations as the eager methods
+        """
+        eager = BasicSecurity("data/basic_security_benefits.csv", ";")
+        eager.run_pipeline(self.steps, use_cache=False)
+        lazy = BasicSecurity("data/basic_security_benefits.csv", ";")
+        lazy.run_pipeline(self.steps, use_cache=False, lazy=True)
+
+        expected, frames = eager.processed_frames(), lazy.processed_frames()
+        self.assertEqual(sorted(expected), sorted(frames))
+        for name in expected:
+            assert_frame_equal(frames[name], expected[name])
+
+    def test_money_columns_match_eager(self):
+        """
+        Testing the fused groupby of two aggregations over fixed-point columns
+        """
+        cols = ["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"]
+        steps = [
+            ("file_processing", (["Year", "Länder", "TypeCode", "PublicAssistance"] + cols,), {}),
+            ("dtype_conversion", tuple(cols), {}),
+            ("filter_data", (), {}),
+            ("data_group", (), {"cols": cols, "group_element": "Länder"}),
+            ("data_group", (), {"cols": cols, "group_element": "PublicAssistance"}),
+        ]
+        eager = PublicAssistance("data/public_assistance.csv", ";")
+        eager.run_pipeline(steps, use_cache=False)
+        lazy = PublicAssistance("data/public_assistance.csv", ";")
+        lazy.run_pipeline(steps, use_cache=False, lazy=True)
+
+        for name in ("Länder_df", "PublicAssistance_df"):
+            assert_frame_equal(getattr(lazy, name), getattr(eager, name))
+            self.assertEqual(getattr(lazy, name).attrs, getattr(eager, name).attrs)
+
+    def test_stray_flag_in_money_column(self):
+        """
+        Testing that a flagged currency cell becomes a missing value in the eager, lazy and chunked pipelines instead of stopping them
+        """
+        cols = ["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"]
+        steps = [
+            ("file_processing", (["Year", "Länder", "TypeCode", "PublicAssistance"] + cols,), {}),
+            ("dtype_conversion", tuple(cols), {}),
+            ("filter_data", (), {}),
+            ("data_group", (), {"cols": cols, "group_element": "Länder"}),
+        ]
+        with open("data/public_assistance.csv", "rb") as data_file:
+            content = data_file.read().replace(b";Subsistence payments;116383;", b";Subsistence payments;1.234p;", 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "public_assistance.csv")
+            with open(path, "wb") as data_file:
+                data_file.write(content)
+
+            for options in ({}, {"lazy": True}, {"memory_budget": 64 * 1024}):
+                pa = PublicAssistance(path, ";")
+                with self.assertLogs("visualizations.measures", "WARNING"):
+                    pa.run_pipeline(steps, use_cache=False, **options)
+                self.assertEqual(pa.Länder_df["Länder"].iloc[0], "Baden-Württemberg")
+                self.assertFalse(pa.Länder_df[cols].isna().any().any())
+
+    def test_optimised_plan(self):
+        """
+        Testing that the aggregations share a single groupby and that unused columns are pruned when df is not kept
+        """
+        bsc = BasicSecurity("data/basic_security_benefits.csv", ";")
+        bsc.file_processing(["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"])
+        plan = bsc.lazy().convert("Q1", "Q2", "Q3", "Q4").filter().group(["Q1"], "Gender").group(["Q1", "Q2"], "Länder")
+
+        optimised = plan.optimise(keep_df=False)
+        self.assertEqual(optimised["shared_aggregation"], (["Gender", "Länder"], ["Q1", "Q2"]))
+        self.assertEqual(optimised["projection"], ["Länder", "Gender", "Q1", "Q2"])
+        self.assertEqual(list(optimised["converted"]), ["Q1", "Q2"])
+
+        outputs = plan.collect(keep_df=False)
+        self.assertNotIn("df", outputs)
+        self.assertEqual(list(bsc.df.columns), ["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"])
+        self.assertNotIn("Total", outputs["Gender_df"]["Gender"].tolist())
+
+    def test_melt(self):
+        """
+        Testing that the melt step matches max_quarterly_assessment
+        """
+        bsc = BasicSecurity("data/basic_security_benefits.csv", ";")
+        bsc.run_pipeline(self.steps[:1], use_cache=False)
+        cols = ["Länder", "Q1", "Q2", "Q3", "Q4"]
+        outputs = bsc.lazy().convert("Q1", "Q2", "Q3", "Q4").filter().pivot(cols[1:], ["Länder", "Gender"], "Total", "Gender", "Länder").melt("LänderGender_df", cols, "Quarter", "Value").collect()
+
+        melted_df, _ = bsc.max_quarterly_assessment(data=outputs["LänderGender_df"], cols=cols, var_assignment="Quarter", value_name="Value")
+        assert_frame_equal(outputs["melted_df"], melted_df)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import base64
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from visualizations import Visuals
+from visualizations.raster import HeatmapRaster, bin_edges, bin_matrix
+
+
+class TestHeatmapRaster(unittest.TestCase):
+    """
+    Unit tests for the rasterised heatmaps of large pivot tables
+    """
+
+    def setUp(self):
+        """
+        Setting up Visuals drawing small rasters and a smooth Kreis by month pivot table
+        """
+        self.visuals = Visuals()
+        self.visuals.raster_cells, self.visuals.heatmap_height, self.visuals.chart_width = 1_000, 40, 100
+
+    def pivot(self, kreise, months):
+        values = np.add.outer(np.arange(kreise) / kreise, np.sin(np.arange(months) / 50)) * 1000
+        return pd.DataFrame(values, index=[f"Kreis {number}" for number in range(kreise)], columns=[f"Month {number}" for number in range(months)])
+
+    def test_bin_matrix(self):
+        """
+        Testing that the bins average their cells without the missing ones
+        """
+        values = np.array([[1, 2, 3, np.nan], [np.nan, np.nan, 7, 8], [np.nan, np.nan, 0, 0]], dtype=float)
+        binned = bin_matrix(values, bin_edges(3, 2), bin_edges(4, 2))
+
+        np.testing.assert_array_equal(binned, [[1.5, 3], [np.nan, 3.75]])
+        np.testing.assert_array_equal(bin_edges(3, 10), [0, 1, 2, 3])
+
+    def test_small_pivot_keeps_heatmap(self):
+        """
+        Testing that a pivot table within raster_cells is drawn with its cells
+        """
+        heatmap = self.visuals.generate_heatmap("Month", "Kreis", "Value", "Small", self.pivot(10, 50))
+        self.assertEqual([trace.type for trace in heatmap.data], ["heatmap"])
+
+    def test_payload_is_bounded(self):
+        """
+        Testing that the raster of a growing pivot table keeps the resolution of the chart and the size of its payload
+        """
+        sizes = []
+        for kreise, months in ((200, 400), (800, 1600)):
+            figure = self.visuals.generate_heatmap("Month", "Kreis", "Value", "Large", self.pivot(kreise, months))
+            self.assertEqual([trace.type for trace in figure.data], ["image", "scatter"])
+
+            source = figure.data[0].source
+            image = Image.open(io.BytesIO(base64.b64decode(source.split(",", 1)[1])))
+            self.assertEqual((image.mode, image.size), ("P", (100, 40)))
+            sizes.append(len(figure.to_json()))
+
+        self.assertLess(abs(sizes[1] - sizes[0]), sizes[0] * 0.1)
+        self.assertEqual(figure.layout.xaxis.ticktext[0], "Month 0")
+
+    def test_detail(self):
+        """
+        Testing that the cells behind a pixel average to the value drawn in the pixel and that missing cells are transparent
+        """
+        pivot = self.pivot(200, 400)
+        pivot.iloc[0:5, 0:4] = np.nan
+        raster = HeatmapRaster(pivot, 40, 100)
+
+        detail = self.visuals.heatmap_detail(pivot, x=7, y=3)
+        self.assertEqual(detail.shape, (5, 4))
+        self.assertEqual((detail.index[0], detail.columns[0]), ("Kreis 15", "Month 28"))
+        self.assertAlmostEqual(raster.binned()[3, 7], detail.to_numpy().mean())
+
+        figure = raster.figure("Month", "Kreis", "Value", "Missing", [[0, "#000000"], [1, "#ffffff"]], {})
+        image = Image.open(io.BytesIO(base64.b64decode(figure.data[0].source.split(",", 1)[1])))
+        self.assertEqual(image.getpixel((0, 0)), 0)
+        self.assertEqual(image.info["transparency"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+from pandas.testing import assert_frame_equal
+
+from visualizations.eda import Subsistence
+from visualizations.tidy import BASE_CELLS, SUBSISTENCE_CELLS
+
+
+class TestTidySubsistence(unittest.TestCase):
+    """
+    Unit tests for the long model of the Subsistence table
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Setting up the wide table and the long model of the Subsistence dataset without the frame cache
+        """
+        cls.sub = Subsistence("data/subsistence_benefits.csv", ";")
+        cls.sub.run_pipeline([
+            ("file_processing", (), {}),
+            ("dtype_conversion", ("Year", *SUBSISTENCE_CELLS), {}),
+        ], use_cache=False)
+        cls.wide = cls.sub.df.reset_index(drop=True)
+        cls.sub.tidy()
+
+    def test_base_cells_only(self):
+        """
+        Testing that the long model holds one row per reported base cell and only the non-derivable subtotals
+        """
+        self.assertEqual(list(self.sub.df.columns), ["Länder", "Year", "Location", "Nationality", "Gender", "Count"])
+        self.assertEqual(len(self.sub.df), self.wide[list(BASE_CELLS)].notna().sum().sum())
+        self.assertNotIn("Total", set(self.sub.df["Gender"]))
+        self.assertLess(len(self.sub.reported_totals), len(self.wide) * (len(SUBSISTENCE_CELLS) - len(BASE_CELLS)) / 4)
+        self.assertTrue(self.sub.counts.index.is_unique)
+
+    def test_wide_view_round_trip(self):
+        """
+        Testing that the wide view equals the wide table of file_processing and is computed once
+        """
+        assert_frame_equal(self.sub.wide_view(), self.wide)
+        hits = self.sub.result_cache.info()["hits"]
+        assert_frame_equal(self.sub.wide_view(), self.wide)
+        self.assertEqual(self.sub.result_cache.info()["hits"], hits + 1)
+
+        filtered = self.sub.wide_view(2010, 2022)
+        self.assertEqual(sorted(filtered["Year"].unique()), list(range(2010, 2023)))
+
+    def test_totals_on_demand(self):
+        """
+        Testing that subtotals equal the published columns and that a slice over the base cells is summed per Land
+        """
+        total = self.sub.total()
+        expected = self.wide.set_index(["Länder", "Year"])["Total"]
+        self.assertEqual(total.isna().tolist(), expected.isna().tolist())
+        self.assertTrue((total.dropna() == expected.dropna()).all())
+
+        foreign_females = self.sub.total(location="Institution", nationality="Foreign", sex="Female", by=["Länder"])
+        per_land = self.wide.groupby("Länder", observed=True)["Insitution Foreign Females"].sum(min_count=1)
+        self.assertEqual(foreign_females.to_dict(), per_land.to_dict())
+
+        derived = self.sub.total(published=False)
+        self.assertGreater((derived != expected).sum(), 0)
+
+    def test_year_range(self):
+        """
+        Testing that a year range slice holds the same rows as a scan of the Year column, ordered by year
+        """
+        expected = self.wide[self.wide["Year"].between(2010, 2015)]
+        result = self.sub.year_range(2010, 2015)
+        assert_frame_equal(result.sort_index(), expected)
+        self.assertTrue(result["Year"].is_monotonic_increasing)
+
+        self.assertEqual(self.sub.year_bounds(), (int(self.wide["Year"].min()), int(self.wide["Year"].max())))
+        self.assertEqual(len(self.sub.year_range(2030, None)), 0)
+        self.assertEqual(set(self.sub.year_range(2021, 2021, wide=False)["Year"]), {2021})
+
+
+if __name__ == "__main__":
+    unittest.main()
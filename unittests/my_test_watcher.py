@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from visualizations.eda import BasicSecurity
+from visualizations.loader import DatasetLoader
+from visualizations.watcher import DataWatcher
+
+
+class TestDataWatcher(unittest.TestCase):
+    """
+    Unit tests for the reload of changed source files into a running DatasetLoader
+    """
+
+    def setUp(self):
+        """
+        Setting up a loader reading a copy of the basic security table and a watcher without its polling thread
+        """
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "basic_security_benefits.csv")
+        shutil.copy("data/basic_security_benefits.csv", self.path)
+
+        def load():
+            bsc = BasicSecurity(self.path, ";")
+            bsc.run_pipeline([
+                ("file_processing", (["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"],), {}),
+                ("dtype_conversion", ("Q1", "Q2", "Q3", "Q4"), {}),
+                ("filter_data", (), {}),
+            ], use_cache=False)
+            return bsc
+
+        self.swapped = []
+        self.loader = DatasetLoader({"bsc": load})
+        self.watcher = DataWatcher(self.loader, on_swap=self.swapped.extend)
+        self.bsc = self.loader.result("bsc")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def rewrite_q1(self, land: bytes, value: bytes):
+        """
+        Replacing the first quarter value of the male recipients of a Land in the copied file
+        """
+        with open(self.path, "rb") as data_file:
+            lines = data_file.read().split(b"\n")
+        for position, line in enumerate(lines):
+            if line.startswith(land + b";Male;"):
+                fields = line.split(b";")
+                fields[30] = value
+                lines[position] = b";".join(fields)
+        with open(self.path, "wb") as data_file:
+            data_file.write(b"\n".join(lines))
+
+    def test_unchanged_content_is_not_reloaded(self):
+        """
+        Testing that a new mtime without a change of the content keeps the loaded dataset
+        """
+        self.assertEqual(self.watcher.poll(), [])
+        os.utime(self.path, ns=(1, 1))
+
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertIs(self.loader.result("bsc"), self.bsc)
+
+    def test_changed_content_is_swapped_in(self):
+        """
+        Testing that a changed file is processed again and replaces the dataset while the previous frames stay intact
+        """
+        previous = self.bsc.df
+        self.rewrite_q1(b"Bayern", b"1")
+
+        self.assertEqual(self.watcher.poll(), ["bsc"])
+        self.assertEqual(self.swapped, ["bsc"])
+
+        reloaded = self.loader.result("bsc")
+        self.assertIsNot(reloaded, self.bsc)
+        bayern = (reloaded.df["Länder"] == "Bayern") & (reloaded.df["Gender"] == "Male")
+        self.assertEqual(reloaded.df.loc[bayern, "Q1"].tolist(), [1])
+        self.assertIs(self.bsc.df, previous)
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_failed_reload_keeps_dataset(self):
+        """
+        Testing that a file that can no longer be processed leaves the current dataset in place
+        """
+        with open(self.path, "wb") as data_file:
+            data_file.write(b"not a GENESIS table\n")
+
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertIs(self.loader.result("bsc"), self.bsc)
+
+    def test_start_during_slow_reload(self):
+        """
+        Testing that starting the watcher, as every rerun of the dashboard does, returns at once while a reload is still running
+        """
+        started, release = threading.Event(), threading.Event()
+        load = self.loader.pipelines["bsc"]
+
+        def slow_load():
+            started.set()
+            release.wait(10)
+            return load()
+
+        self.loader.pipelines["bsc"] = slow_load
+        self.rewrite_q1(b"Bayern", b"1")
+        poll = threading.Thread(target=self.watcher.poll)
+        poll.start()
+        self.assertTrue(started.wait(10))
+
+        self.watcher.interval = 60
+        begin = time.perf_counter()
+        self.watcher.start()
+        self.assertLess(time.perf_counter() - begin, 1)
+
+        release.set()
+        poll.join(10)
+        self.watcher.stop(timeout=1)
+        self.assertEqual(self.swapped, ["bsc"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,62 +1,199 @@
-from .eda import PublicAssistance, BasicSecurity
-from .plots import Visuals
-
-# Public Assistance Dataframe
-pa = PublicAssistance("data/public_assistance.csv", ";", 5, 7)
-pa.file_processing(["Year", "Länder", "TypeCode", "PublicAssistance", "Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"])
-pa.dtype_conversion("Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)")
-pa.filter_data()
-pa.data_group(cols=["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"], group_element="Länder")
-pa.data_group(cols=["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"], group_element="PublicAssistance")
-
-# Basic Security Benefits DataFrame
-bsc = BasicSecurity("data/basic_security_benefits.csv", ";", skiprows=6, skipfooter=4)
-bsc.file_processing(["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"])
-bsc.dtype_conversion("Q1", "Q2", "Q3", "Q4")
-bsc.filter_data()
-bsc.pivot_table(columns=["Q1", "Q2", "Q3", "Q4"], group_element=["Länder", "Gender"], values="Total", index="Gender", column_header="Länder")
-bsc.data_group(cols=["Q1", "Q2", "Q3", "Q4"], group_element="Gender", include_total=True)
-melted_df, max_quarterly_value = bsc.max_quarterly_assessment(data=bsc.LänderGender_df, cols=["Länder", "Q1", "Q2", "Q3", "Q4"], var_assignment="Quarter", value_name="Value")
-
-
-
-# Subsistence Benefit Recipients Dataframe
-sub_benefits = eda.Subsistence(path_to_file="data/subsistence_benefits.csv", delimiter=";", skiprows=7, skipfooter=4)
-sub_benefits.file_processing()
-sub_benefits.dtype_conversion("Year", "Non-Institution German Males",
-                              "Non-Institution Foreign Males",
-                              "Total Non-Insitution Males",
-                              "Institution German Males",
-                              "Insitution Foreign Males",
-                              "Total Institution Males",
-                              "Total German Males",
-                              "Total Foreign Males",
-                              "Total Males",
-                              "Non-Institution German Females",
-                              "Non-Institution Foreign Females",
-                              "Total Non-Insitution Females",
-                              "Institution German Females",
-                              "Insitution Foreign Females",
-                              "Total Institution Females",
-                              "Total German Females",
-                              "Total Foreign Females",
-                              "Total Females",
-                              "Non-Institution Germans Total",
-                              "Non-Institution Foreign Total",
-                              "Non-Institution Total",
-                              "Institution Germans Total",
-                              "Institution Foreign Total",
-                              "Institution Total",
-                              "Germans Total",
-                              "Foreign Total",
-                              "Total",
-                              )
-sub_benefits.filter_data(year_start=2010, year_end=2022)
-
-# Visualizations Module
-public_assist = Visuals()
-basics = Visuals()
-subsistence = Visuals()
+'''
+The visualizations package exposes the processed datasets (pa, bsc, sub_benefits together with melted_df and max_quarterly_value), the aggregate_cube over them and the Visuals instances (public_assist, basics, subsistence) as module attributes. They are built on first access through the module __getattr__ and memoised, so importing the package or a single submodule does not run any dataset pipeline.
+'''
+import importlib
 
+from .loader import DatasetLoader
+from .watcher import DataWatcher
 
+# Classes re-exported from the submodules, imported on first access
+_LAZY_IMPORTS = {
+    "Dataset": ".eda",
+    "PublicAssistance": ".eda",
+    "BasicSecurity": ".eda",
+    "Subsistence": ".eda",
+    "Visuals": ".plots",
+}
 
+
+def load_public_assistance():
+    from .eda import PublicAssistance
+
+    # Public Assistance Dataframe
+    pa = PublicAssistance("data/public_assistance.csv", ";")
+    pa.run_pipeline([
+        ("file_processing", (["Year", "Länder", "TypeCode", "PublicAssistance", "Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"],), {}),
+        ("dtype_conversion", ("Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"), {}),
+        ("filter_data", (), {}),
+        ("data_group", (), {"cols": ["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"], "group_element": "Länder"}),
+        ("data_group", (), {"cols": ["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"], "group_element": "PublicAssistance"}),
+    ], lazy=True)
+    return pa
+
+
+def load_basic_security():
+    from .eda import BasicSecurity
+
+    # Basic Security Benefits DataFrame
+    bsc = BasicSecurity("data/basic_security_benefits.csv", ";")
+    bsc.run_pipeline([
+        ("file_processing", (["Länder", "Gender", "Q1", "Q2", "Q3", "Q4"],), {}),
+        ("dtype_conversion", ("Q1", "Q2", "Q3", "Q4"), {}),
+        ("filter_data", (), {}),
+        ("pivot_table", (), {"columns": ["Q1", "Q2", "Q3", "Q4"], "group_element": ["Länder", "Gender"], "values": "Total", "index": "Gender", "column_header": "Länder"}),
+        ("data_group", (), {"cols": ["Q1", "Q2", "Q3", "Q4"], "group_element": "Gender", "include_total": True}),
+    ], lazy=True)
+    return bsc
+
+
+def load_subsistence():
+    from .eda import Subsistence
+
+    # Subsistence Benefit Recipients Dataframe
+    sub_benefits = Subsistence(path_to_file="data/subsistence_benefits.csv", delimiter=";")
+    sub_benefits.run_pipeline([
+        ("file_processing", (), {}),
+        ("dtype_conversion", ("Year",
+                             "Non-Institution German Males",
+                             "Non-Institution Foreign Males",
+                             "Total Non-Insitution Males",
+                             "Institution German Males",
+                             "Insitution Foreign Males",
+                             "Total Institution Males",
+                             "Total German Males",
+                             "Total Foreign Males",
+                             "Total Males",
+                             "Non-Institution German Females",
+                             "Non-Institution Foreign Females",
+                             "Total Non-Insitution Females",
+                             "Institution German Females",
+                             "Insitution Foreign Females",
+                             "Total Institution Females",
+                             "Total German Females",
+                             "Total Foreign Females",
+                             "Total Females",
+                             "Non-Institution Germans Total",
+                             "Non-Institution Foreign Total",
+                             "Non-Institution Total",
+                             "Institution Germans Total",
+                             "Institution Foreign Total",
+                             "Institution Total",
+                             "Germans Total",
+                             "Foreign Total",
+                             "Total",
+                             ), {}),
+        ("filter_data", (), {"year_start": 2010, "year_end": 2022}),
+        ("tidy", (), {}),
+    ], lazy=True)
+    return sub_benefits
+
+
+def quarterly_assessment():
+    bsc = dataset_loader.result("bsc")
+    return bsc.max_quarterly_assessment(data=bsc.LänderGender_df, cols=["Länder", "Q1", "Q2", "Q3", "Q4"], var_assignment="Quarter", value_name="Value")
+
+
+# Source frame, dimensions and measures of the aggregate cube partition of each dataset, None selects every numeric column. The Subsistence line chart slices its year range from the dataset itself.
+CUBE_SOURCES = {
+    "pa": ("df", ["Länder", "PublicAssistance", "Year"], ["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"]),
+}
+
+
+def update_cube(cube, names=None) -> list[str]:
+    '''
+    Rebuilds the cube partitions of the datasets whose pipeline key changed.
+
+    Inputs:
+    - cube: AggregateCube object
+    - names: datasets to check, every cube source when None
+
+    Output:
+    - names of the rebuilt partitions
+    '''
+    rebuilt = []
+    for name in names or CUBE_SOURCES:
+        frame_name, dimensions, measures = CUBE_SOURCES[name]
+        dataset = dataset_loader.result(name)
+        if cube.update(name, getattr(dataset, frame_name), dimensions, measures, key=dataset.pipeline_key):
+            rebuilt.append(name)
+
+    return rebuilt
+
+
+def build_cube():
+    from .cube import AggregateCube
+
+    cube = AggregateCube()
+    update_cube(cube)
+    return cube
+
+
+def visuals():
+    from .plots import Visuals
+
+    return Visuals()
+
+
+# The dataset pipelines are submitted on first access, dataset_loader.start() loads all of them concurrently
+dataset_loader = DatasetLoader({
+    "pa": load_public_assistance,
+    "bsc": load_basic_security,
+    "sub_benefits": load_subsistence,
+})
+
+
+def refresh_datasets(names: list[str]) -> None:
+    '''
+    Replaces the module attributes and cube partitions derived from reloaded datasets. Each attribute is rebound in a single assignment, readers holding the previous frames keep using them.
+
+    Inputs:
+    - names: reloaded dataset names
+    '''
+    for name in names:
+        if name in globals():
+            globals()[name] = dataset_loader.result(name)
+
+    if "bsc" in names and "melted_df" in globals():
+        globals()["melted_df"], globals()["max_quarterly_value"] = quarterly_assessment()
+
+    sources = [name for name in names if name in CUBE_SOURCES]
+    if sources and "aggregate_cube" in globals():
+        update_cube(globals()["aggregate_cube"], sources)
+
+
+# Polls the source files of the loaded datasets once started, e.g. by the WebApp
+dataset_watcher = DataWatcher(dataset_loader, on_swap=refresh_datasets)
+
+# Module attributes built on first access, names sharing one builder receive the items of its result
+_LAZY_ATTRIBUTES = {
+    ("pa",): lambda: dataset_loader.result("pa"),
+    ("bsc",): lambda: dataset_loader.result("bsc"),
+    ("sub_benefits",): lambda: dataset_loader.result("sub_benefits"),
+    ("melted_df", "max_quarterly_value"): quarterly_assessment,
+    ("aggregate_cube",): build_cube,
+    ("public_assist",): visuals,
+    ("basics",): visuals,
+    ("subsistence",): visuals,
+}
+
+
+def __getattr__(name: str):
+    '''
+    Builds a lazy module attribute on first access and stores it in the module namespace, so later lookups no longer reach this function.
+    '''
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+
+    for names, build in _LAZY_ATTRIBUTES.items():
+        if name in names:
+            value = build()
+            globals().update(zip(names, value) if len(names) > 1 else {name: value})
+            return globals()[name]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS) | {name for names in _LAZY_ATTRIBUTES for name in names})
@@ -0,0 +1,193 @@
+'''
+This section contributes towards persisting the processed DataFrame objects of the Dataset classes. Frames are stored in a columnar format (Parquet when pyarrow is available) under a key derived from the content hash of the source .csv file and the processing steps, so a warm start only memory-maps the finished frames instead of re-running the pipeline.
+'''
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from .genesis import file_signature, load_sidecar, store_sidecar
+
+CACHE_DIR = os.environ.get("VISUALIZATIONS_CACHE_DIR", os.path.join(".cache", "datasets"))
+# Bump whenever the Dataset processing methods change the frames they produce
+PIPELINE_VERSION = 6
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_content_hashes: dict[tuple, str] = {}
+
+
+def content_hash(path_to_file: str) -> str:
+    '''
+    Provides the sha256 digest of the file content. Digests are memoised in memory and in a sidecar file keyed by the size and mtime of the file, so unchanged files are not hashed again.
+
+    Inputs:
+    - path_to_file: relative or absolute file path
+
+    Output:
+    - hexadecimal sha256 digest
+    '''
+    signature = file_signature(path_to_file)
+
+    if signature in _content_hashes:
+        return _content_hashes[signature]
+
+    stored = load_sidecar(path_to_file, "sha256", signature)
+    digest = stored.get("sha256") if stored else None
+
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path_to_file, "rb") as data_file:
+            for block in iter(lambda: data_file.read(HASH_BLOCK_SIZE), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        store_sidecar(path_to_file, "sha256", signature, {"sha256": digest})
+
+    _content_hashes[signature] = digest
+    return digest
+
+
+def frame_format() -> str:
+    '''
+    Provides the storage format of the cached frames: "parquet" when pyarrow is installed, "pickle" otherwise.
+    '''
+    return "parquet" if importlib.util.find_spec("pyarrow") else "pickle"
+
+
+class FrameCache:
+    '''
+    Directory based store of processed DataFrame objects. Each entry is a folder named after its key holding one file per frame and a manifest.json describing the source file the frames were derived from.
+    '''
+
+    def __init__(self, cache_dir=CACHE_DIR) -> None:
+        '''
+        Inputs:
+        - cache_dir: directory holding the cache entries
+        '''
+        self.cache_dir = cache_dir
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _manifests(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(".tmp-"):
+                continue
+            entry = os.path.join(self.cache_dir, name)
+            try:
+                with open(os.path.join(entry, "manifest.json")) as manifest:
+                    yield entry, json.load(manifest)
+            except (OSError, ValueError):
+                yield entry, None
+
+    def load(self, key: str) -> dict[str, pd.DataFrame] | None:
+        '''
+        Loads the frames of a cache entry. Parquet files are memory-mapped.
+
+        Inputs:
+        - key: cache key of the entry
+
+        Output:
+        - dictionary of attribute name to DataFrame, None when the entry does not exist
+        '''
+        entry = self.entry_path(key)
+        try:
+            with open(os.path.join(entry, "manifest.json")) as manifest:
+                manifest = json.load(manifest)
+
+            frames = {}
+            for name, file_name in manifest["frames"].items():
+                path = os.path.join(entry, file_name)
+                if manifest["format"] == "parquet":
+                    frames[name] = pd.read_parquet(path, memory_map=True)
+                else:
+                    frames[name] = pd.read_pickle(path)
+            return frames
+        except Exception:
+            # Missing, partially removed or incompatible entries are treated as a cache miss
+            return None
+
+    def store(self, key: str, frames: dict[str, pd.DataFrame], source: str) -> None:
+        '''
+        Stores the frames under the key. The entry is written into a temporary folder first and renamed into place, so readers never observe a partially written entry.
+
+        Inputs:
+        - key: cache key of the entry
+        - frames: dictionary of attribute name to DataFrame
+        - source: path of the source file the frames were derived from
+        '''
+        storage = frame_format()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporary = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+
+        try:
+            files = {}
+            for index, (name, frame) in enumerate(frames.items()):
+                file_name = f"{index}.{storage}"
+                if isinstance(frame.columns, pd.CategoricalIndex):
+                    # pyarrow cannot restore categorical column labels, e.g. the Länder header of a pivot table
+                    frame = frame.set_axis(pd.Index(frame.columns.astype(str), name=frame.columns.name), axis=1)
+                if storage == "parquet":
+                    frame.to_parquet(os.path.join(temporary, file_name))
+                else:
+                    frame.to_pickle(os.path.join(temporary, file_name))
+                files[name] = file_name
+
+            with open(os.path.join(temporary, "manifest.json"), "w") as manifest:
+                json.dump({
+                    "source": os.path.abspath(source),
+                    "source_hash": content_hash(source),
+                    "format": storage,
+                    "frames": files,
+                }, manifest)
+
+            os.replace(temporary, self.entry_path(key))
+        except OSError:
+            # Another process stored the same entry first or the directory is not writable
+            pass
+        finally:
+            shutil.rmtree(temporary, ignore_errors=True)
+
+    def invalidate(self, source=None) -> int:
+        '''
+        Removes the entries derived from the source file, or every entry when no source is given.
+
+        Output:
+        - number of removed entries
+        '''
+        removed = 0
+        source = os.path.abspath(source) if source else None
+
+        for entry, manifest in self._manifests():
+            if source is None or (manifest and manifest.get("source") == source):
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+
+        return removed
+
+    def clean(self) -> int:
+        '''
+        Removes stale entries: unreadable or partially written entries and entries whose source file was deleted or changed content since they were stored.
+
+        Output:
+        - number of removed entries
+        '''
+        removed = 0
+
+        for entry, manifest in self._manifests():
+            stale = manifest is None
+            if not stale:
+                source = manifest.get("source")
+                stale = not source or not os.path.exists(source) or content_hash(source) != manifest.get("source_hash")
+
+            if stale:
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+
+        return removed
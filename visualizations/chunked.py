@@ -0,0 +1,164 @@
+'''
+This section contributes towards the out-of-core mode of the Dataset pipelines. The GENESIS table is streamed in chunks whose number of rows follows a memory budget, the conversion and filter steps are applied chunk by chunk and the aggregations are kept as partial sums combined after every chunk, so only one chunk of the raw table and the (small) aggregates are held in memory at a time.
+'''
+import logging
+
+import pandas as pd
+
+from .instrumentation import instrumented
+from .measures import GENESIS_MISSING_MARKERS, declare_fixed_point, to_counts, to_fixed_point
+
+logger = logging.getLogger(__name__)
+
+# Rows of the first chunk, from which the memory taken by a row is estimated
+SAMPLE_ROWS = 100
+# Converting and filtering a chunk holds about this many copies of it at once
+WORKING_COPIES = 3
+
+
+def rows_within_budget(chunk: pd.DataFrame, memory_budget: int) -> int:
+    '''
+    Provides the number of rows per chunk that keeps the processing of a chunk within the memory budget.
+
+    Inputs:
+    - chunk: a prepared chunk of the raw table
+    - memory_budget: bytes available for a chunk
+
+    Output:
+    - number of rows, at least 1
+    '''
+    row_bytes = chunk.memory_usage(deep=True).sum() / max(len(chunk), 1)
+    return max(int(memory_budget // (WORKING_COPIES * max(row_bytes, 1))), 1)
+
+
+class ChunkedPipeline:
+    '''
+    The ChunkedPipeline records convert, filter, between, group and pivot steps and runs them over the chunks streamed by Dataset.stream_file. The recorded steps follow the signatures of the corresponding Dataset methods, so a run_pipeline step list can be replayed chunk by chunk. The aggregation methods of the Dataset run once at the end on the combined partial sums, producing the same output frames as the in-memory pipeline.
+    '''
+
+    def __init__(self, dataset, memory_budget: int) -> None:
+        '''
+        Inputs:
+        - dataset: Dataset object streaming the chunks
+        - memory_budget: bytes available for a chunk
+        '''
+        self.dataset = dataset
+        self.memory_budget = memory_budget
+        self.transforms: list = []
+        self.aggregations: list[dict] = []
+        self.outputs: dict[str, list[pd.DataFrame]] = {}
+        self.fixed_point = {}
+        self.chunks = 0
+        self.rows = 0
+        self.peak_bytes = 0
+
+    def convert(self, *columns: str, missing_markers=GENESIS_MISSING_MARKERS) -> "ChunkedPipeline":
+        '''
+        Converts the measure columns of every chunk like Dataset.dtype_conversion.
+        '''
+        money_columns = self.dataset.money_columns
+        self.fixed_point.update({col: money_columns[col] for col in columns if col in money_columns})
+
+        def convert_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+            converted = {
+                col: to_fixed_point(chunk[col], money_columns[col], missing_markers) if col in money_columns else to_counts(chunk[col], missing_markers)
+                for col in columns
+            }
+            return chunk.assign(**converted)
+
+        self.transforms.append(convert_chunk)
+        return self
+
+    def filter(self, region_col="Länder", markers=("Total",), label_cols=None) -> "ChunkedPipeline":
+        '''
+        Removes the subtotal rows of every chunk like Dataset.filter_data.
+        '''
+        from .eda import marker_mask
+
+        self.transforms.append(lambda chunk: chunk[~marker_mask(chunk, markers, label_cols)])
+        return self
+
+    def between(self, column: str, low, high, name: str) -> "ChunkedPipeline":
+        '''
+        Collects the rows with column values between low and high into an additional output frame, e.g. the year range of the Subsistence dataset.
+        '''
+        self.outputs[name] = []
+
+        def collect_rows(chunk: pd.DataFrame) -> pd.DataFrame:
+            self.outputs[name].append(chunk[chunk[column].between(low, high)])
+            return chunk
+
+        self.transforms.append(collect_rows)
+        return self
+
+    def group(self, cols: list[str], group_element: str, include_total=False) -> "ChunkedPipeline":
+        '''
+        Sums the columns per group like Dataset.data_group.
+        '''
+        return self._aggregate("data_group", [group_element], cols, (cols, group_element), {"include_total": include_total})
+
+    def pivot(self, columns: list[str], group_element: list[str], values: str, index: str, column_header: str) -> "ChunkedPipeline":
+        '''
+        Sums the columns per group and pivots the row totals like BasicSecurity.pivot_table.
+        '''
+        return self._aggregate("pivot_table", list(group_element), columns, (columns, group_element), {"values": values, "index": index, "column_header": column_header})
+
+    def _aggregate(self, method: str, keys: list[str], cols: list[str], args: tuple, kwargs: dict) -> "ChunkedPipeline":
+        self.aggregations.append({"method": method, "keys": list(keys), "cols": list(cols), "args": args, "kwargs": kwargs, "partial": None})
+        return self
+
+    @instrumented
+    def run(self, chunks) -> dict[str, pd.DataFrame]:
+        '''
+        Streams the chunks through the recorded steps and runs the aggregation methods of the Dataset on the combined partial sums. The dataset keeps the output frames but no df, the full table is never materialised.
+
+        Inputs:
+        - chunks: iterator of prepared chunks, e.g. from Dataset.stream_file
+
+        Output:
+        - dictionary of attribute name to output frame
+        '''
+        for chunk in chunks:
+            self.chunks += 1
+            self.rows += len(chunk)
+            self.peak_bytes = max(self.peak_bytes, int(chunk.memory_usage(deep=True).sum()))
+
+            for transform in self.transforms:
+                chunk = transform(chunk)
+
+            for aggregation in self.aggregations:
+                partial = chunk.groupby(aggregation["keys"], observed=True)[aggregation["cols"]].sum(min_count=1)
+                if aggregation["partial"] is not None:
+                    # Sums of the chunks add up, a group missing in every chunk stays missing
+                    partial = pd.concat([aggregation["partial"], partial]).groupby(level=aggregation["keys"], observed=True).sum(min_count=1)
+                aggregation["partial"] = partial
+
+        outputs = {name: pd.concat(parts) for name, parts in self.outputs.items() if parts}
+        for name, output in outputs.items():
+            setattr(self.dataset, name, declare_fixed_point(output, self.fixed_point))
+
+        before = set(vars(self.dataset))
+        frames = {name: value for name, value in vars(self.dataset).items() if isinstance(value, pd.DataFrame)}
+        shadowed = vars(self.dataset).get("sql_backend")
+        # The aggregation methods read the combined partial sums, which must not be ingested as the table of the SQL backend
+        self.dataset.sql_backend = None
+        try:
+            for aggregation in self.aggregations:
+                if aggregation["partial"] is None:
+                    continue
+                self.dataset.df = declare_fixed_point(aggregation["partial"].reset_index(), self.fixed_point)
+                getattr(self.dataset, aggregation["method"])(*aggregation["args"], **aggregation["kwargs"])
+        finally:
+            if shadowed is None:
+                del self.dataset.sql_backend
+            else:
+                self.dataset.sql_backend = shadowed
+            self.dataset.df = None
+
+        outputs.update({
+            name: value for name, value in vars(self.dataset).items()
+            if isinstance(value, pd.DataFrame) and name != "_df" and (name not in before or frames.get(name) is not value)
+        })
+
+        logger.info("%s streamed in %d chunks of %d rows, largest chunk %.0f KiB for a budget of %.0f KiB", self.dataset.path_to_file, self.chunks, self.rows, self.peak_bytes / 1024, self.memory_budget / 1024)
+        return outputs
@@ -0,0 +1,137 @@
+'''
+This section contributes towards the aggregate cube behind the dashboard filters. Each source table is rolled up once over every combination of its dimensions (e.g. Länder x PublicAssistance x Year), so a change of the benefit type, measure or Länder selection is answered by a lookup in the matching rollup level and a sum over at most the selected Länder slices instead of a mask and groupby over the full frame.
+'''
+import itertools
+import logging
+import threading
+
+import pandas as pd
+
+from .measures import declare_fixed_point, fixed_point_columns
+
+logger = logging.getLogger(__name__)
+
+
+def grand_total(frame: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Sums every row of the frame into a single row, keeping the nullable dtypes of the columns.
+    '''
+    return frame.groupby(lambda _: 0).sum(min_count=1)
+
+
+class CubePartition:
+    '''
+    The rollup levels of one source table. Every level is a grouped frame indexed by its dimensions, the finest level is aggregated from the source and the coarser levels are rolled up from it.
+    '''
+
+    def __init__(self, frame: pd.DataFrame, dimensions: list[str], measures=None, key=None, markers=("Total",)) -> None:
+        '''
+        Inputs:
+        - frame: source DataFrame object
+        - dimensions: label columns of the cube
+        - measures: numeric columns summed in the cube, every numeric column that is not a dimension when None
+        - key: identifies the source data, e.g. the cache key of the Dataset pipeline
+        - markers: labels of subtotal rows in the source, dropped as the cube computes its own subtotal levels
+        '''
+        from .eda import marker_mask
+
+        self.dimensions = list(dimensions)
+        self.measures = list(measures) if measures is not None else [
+            col for col in frame.columns if col not in self.dimensions and pd.api.types.is_numeric_dtype(frame[col])
+        ]
+        self.key = key
+        self.fixed_point = {col: unit for col, unit in fixed_point_columns(frame).items() if col in self.measures}
+
+        frame = frame[~marker_mask(frame, markers, [dim for dim in self.dimensions if not pd.api.types.is_numeric_dtype(frame[dim])])]
+        finest = frame.groupby(self.dimensions, observed=True)[self.measures].sum(min_count=1)
+        self.levels: dict[frozenset, pd.DataFrame] = {frozenset(self.dimensions): finest}
+
+        for size in range(len(self.dimensions) - 1, -1, -1):
+            for level in itertools.combinations(self.dimensions, size):
+                if level:
+                    self.levels[frozenset(level)] = finest.groupby(level=list(level), observed=True).sum(min_count=1)
+                else:
+                    self.levels[frozenset()] = grand_total(finest)
+
+    def query(self, by: list[str], where=None) -> pd.DataFrame:
+        '''
+        Provides the measures summed per combination of the by dimensions, restricted to the selected labels of the where dimensions.
+
+        Inputs:
+        - by: dimensions of the result rows, an empty list for the grand total
+        - where: dictionary of dimension to the list of labels to keep
+
+        Output:
+        - DataFrame object with the by dimensions as columns followed by the measures
+        '''
+        where = {dim: list(labels) for dim, labels in (where or {}).items() if labels is not None}
+        unknown = [dim for dim in list(by) + list(where) if dim not in self.dimensions]
+        if unknown:
+            raise KeyError(f"{unknown} are not dimensions of the cube {self.dimensions}")
+
+        level = self.levels[frozenset(by) | frozenset(where)]
+        for dim, labels in where.items():
+            level = level[level.index.get_level_values(dim).isin(labels)]
+
+        if set(where) - set(by):
+            # The selected slices of the finer level are added up, e.g. at most 16 Länder
+            result = level.groupby(level=list(by), observed=True).sum(min_count=1) if by else grand_total(level)
+        else:
+            result = level
+
+        result = result.reset_index() if by else result.reset_index(drop=True)
+        if by and list(result.columns[:len(by)]) != list(by):
+            result = result[list(by) + self.measures]
+
+        return declare_fixed_point(result, self.fixed_point)
+
+
+class AggregateCube:
+    '''
+    The AggregateCube holds one CubePartition per source table. Partitions are rebuilt independently, so a changed source only rebuilds its own rollups.
+    '''
+
+    def __init__(self) -> None:
+        self.partitions: dict[str, CubePartition] = {}
+        self._lock = threading.Lock()
+
+    def update(self, name: str, frame: pd.DataFrame, dimensions: list[str], measures=None, key=None) -> bool:
+        '''
+        Builds the partition of a source table unless it already holds the data of the key.
+
+        Inputs:
+        - name: source table name, e.g. "pa"
+        - frame: source DataFrame object
+        - dimensions: label columns of the cube
+        - measures: numeric columns summed in the cube, every numeric column that is not a dimension when None
+        - key: identifies the source data, the partition is always rebuilt when None
+
+        Output:
+        - True when the partition was (re)built, False when it was up to date
+        '''
+        current = self.partitions.get(name)
+        if key is not None and current is not None and current.key == key:
+            return False
+
+        partition = CubePartition(frame, dimensions, measures, key)
+        with self._lock:
+            self.partitions[name] = partition
+        logger.info("Aggregate cube partition %s built with %d rollup levels", name, len(partition.levels))
+
+        return True
+
+    def query(self, name: str, by: list[str], where=None, measures=None) -> pd.DataFrame:
+        '''
+        Provides the measures of a source table summed per combination of the by dimensions, see CubePartition.query.
+
+        Inputs:
+        - name: source table name
+        - by: dimensions of the result rows
+        - where: dictionary of dimension to the list of labels to keep
+        - measures: measures to return, all measures of the partition when None
+        '''
+        result = self.partitions[name].query(by, where)
+        if measures is not None:
+            result = result[list(by) + list(measures)]
+
+        return result
@@ -0,0 +1,194 @@
+'''
+This section contributes towards the optional embedded database backend of the Dataset classes. The processed GENESIS tables are ingested once into a local database file (DuckDB when installed, SQLite otherwise) with the dimension columns stored as indexed integer codes, and the aggregations of data_group and pivot_table run as SQL GROUP BY queries instead of in-memory pandas groupbys.
+'''
+import functools
+import importlib
+import importlib.util
+import json
+import sqlite3
+import threading
+from typing import Iterable
+
+import pandas as pd
+
+
+def database_engine() -> str:
+    '''
+    Provides the embedded database used by default: "duckdb" when installed, "sqlite" otherwise.
+    '''
+    return "duckdb" if importlib.util.find_spec("duckdb") else "sqlite"
+
+
+def quote(identifier: str) -> str:
+    '''
+    Quotes a table or column name, e.g. Expenditure(TEUR) or Länder.
+    '''
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+@functools.lru_cache(maxsize=None)
+def sum_dtype(dtype: str) -> str:
+    '''
+    Provides the dtype pandas gives the groupby sum of a column of the dtype (e.g. UInt8 widens to UInt64 while UInt32 is kept), so SQL results line up with the in-memory aggregations.
+    '''
+    sample = pd.DataFrame({"key": [0], "value": pd.Series([0]).astype(dtype if dtype != "object" else "Float64")})
+    return str(sample.groupby("key")["value"].sum(min_count=1).dtype)
+
+
+class SQLBackend:
+    '''
+    Local database holding one table per dataset. Categorical columns are stored as their integer codes together with the category list, numeric columns keep their values with missing values as NULL, so results are rebuilt with the same categories and in the same order as the pandas groupby.
+    '''
+
+    def __init__(self, path=":memory:", engine=None) -> None:
+        '''
+        Inputs:
+        - path: database file, an in-memory database when ":memory:"
+        - engine: "duckdb" or "sqlite", detected from the installed packages when None
+        '''
+        self.path = path
+        self.engine = engine or database_engine()
+        self._lock = threading.Lock()
+
+        if self.engine == "duckdb":
+            self.connection = importlib.import_module("duckdb").connect(path)
+        else:
+            # The dataset loader aggregates from worker threads, access is serialised by the lock
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+
+        self._execute("CREATE TABLE IF NOT EXISTS _tables (name TEXT PRIMARY KEY, key TEXT, attrs TEXT)")
+        self._execute("CREATE TABLE IF NOT EXISTS _columns (table_name TEXT, name TEXT, position INTEGER, dtype TEXT, categories TEXT)")
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            cursor = self.connection.execute(sql, params)
+            rows = cursor.fetchall() if cursor.description else []
+            names = [column[0] for column in cursor.description] if cursor.description else []
+            if self.engine == "sqlite":
+                self.connection.commit()
+        return names, rows
+
+    def key(self, name: str) -> str | None:
+        '''
+        Provides the ingestion key of a table, None when the table was never ingested.
+        '''
+        _, rows = self._execute("SELECT key FROM _tables WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    def _schema(self, name: str) -> dict[str, dict]:
+        _, rows = self._execute("SELECT name, dtype, categories FROM _columns WHERE table_name = ? ORDER BY position", (name,))
+        return {col: {"dtype": dtype, "categories": json.loads(categories) if categories else None} for col, dtype, categories in rows}
+
+    def _storage(self, frame: pd.DataFrame) -> pd.DataFrame:
+        # Categorical columns are stored as their codes, missing labels as NULL
+        return frame.assign(**{
+            col: frame[col].cat.codes.astype("Int32").mask(frame[col].isna())
+            for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)
+        })
+
+    def _append(self, name: str, frame: pd.DataFrame, create: bool) -> None:
+        storage = self._storage(frame)
+        with self._lock:
+            if self.engine == "duckdb":
+                self.connection.register("_ingest", storage)
+                statement = "CREATE TABLE {0} AS SELECT * FROM _ingest" if create else "INSERT INTO {0} SELECT * FROM _ingest"
+                self.connection.execute(statement.format(quote(name)))
+                self.connection.unregister("_ingest")
+            else:
+                storage.to_sql(name, self.connection, if_exists="replace" if create else "append", index=False)
+                self.connection.commit()
+
+    def ingest(self, name: str, frames: pd.DataFrame | Iterable[pd.DataFrame], key=None) -> bool:
+        '''
+        Stores the frame, or the chunks of a frame, as the table name unless the table already holds the data of the key. Indexes are created on the categorical (dimension) columns.
+
+        Inputs:
+        - name: table name
+        - frames: DataFrame object or iterable of DataFrame chunks with the same columns
+        - key: identifies the ingested data, e.g. the cache key of the processing steps, the table is always rewritten when None
+
+        Output:
+        - True when the table was (re)written, False when it was up to date
+        '''
+        if key is not None and self.key(name) == key:
+            return False
+
+        self.drop(name)
+        first = None
+        for chunk in ([frames] if isinstance(frames, pd.DataFrame) else frames):
+            self._append(name, chunk, create=first is None)
+            first = chunk if first is None else first
+
+        if first is None:
+            raise ValueError(f"No data was provided for table {name}")
+
+        for position, col in enumerate(first.columns):
+            categorical = isinstance(first[col].dtype, pd.CategoricalDtype)
+            categories = json.dumps(list(first[col].cat.categories)) if categorical else None
+            self._execute("INSERT INTO _columns VALUES (?, ?, ?, ?, ?)", (name, str(col), position, str(first[col].dtype), categories))
+            if categorical:
+                self._execute(f"CREATE INDEX {quote(f'{name}_{col}')} ON {quote(name)} ({quote(col)})")
+
+        self._execute("INSERT INTO _tables VALUES (?, ?, ?)", (name, key, json.dumps(first.attrs, default=str)))
+        return True
+
+    def drop(self, name: str) -> None:
+        '''
+        Removes a table and its description.
+        '''
+        self._execute(f"DROP TABLE IF EXISTS {quote(name)}")
+        self._execute("DELETE FROM _tables WHERE name = ?", (name,))
+        self._execute("DELETE FROM _columns WHERE table_name = ?", (name,))
+
+    def _labels(self, values: list, column: dict) -> pd.Series:
+        if column["categories"] is not None:
+            codes = [-1 if code is None else code for code in values]
+            return pd.Series(pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(column["categories"])))
+        return pd.Series(values, dtype=column["dtype"] if column["dtype"] != "object" else object)
+
+    def group_sum(self, name: str, keys: list[str], cols: list[str]) -> pd.DataFrame:
+        '''
+        Sums the columns per group in SQL. Like groupby(keys, observed=True)[cols].sum(min_count=1).reset_index(): SQL SUM skips NULL cells and returns NULL for groups without any value, groups with a missing key are dropped and groups are ordered by category.
+
+        Inputs:
+        - name: table name
+        - keys: columns to group by
+        - cols: columns to sum
+
+        Output:
+        - grouped DataFrame object with the attrs of the ingested frame
+        '''
+        schema = self._schema(name)
+        missing = [col for col in keys + cols if col not in schema]
+        if missing:
+            raise KeyError(f"{missing} are not columns of table {name}")
+
+        key_list = ", ".join(quote(key) for key in keys)
+        sums = ", ".join(f"SUM({quote(col)}) AS {quote(col)}" for col in cols)
+        present = " AND ".join(f"{quote(key)} IS NOT NULL" for key in keys)
+        _, rows = self._execute(f"SELECT {key_list}, {sums} FROM {quote(name)} WHERE {present} GROUP BY {key_list} ORDER BY {key_list}")
+
+        values = list(zip(*rows)) if rows else [[] for _ in keys + cols]
+        grouped = pd.DataFrame({key: self._labels(list(values[position]), schema[key]) for position, key in enumerate(keys)})
+        for position, col in enumerate(cols, start=len(keys)):
+            grouped[col] = pd.array(list(values[position]), dtype=sum_dtype(schema[col]["dtype"]))
+
+        _, attrs = self._execute("SELECT attrs FROM _tables WHERE name = ?", (name,))
+        grouped.attrs = json.loads(attrs[0][0]) if attrs else {}
+        return grouped
+
+    def frame(self, name: str) -> pd.DataFrame:
+        '''
+        Reads a whole table back into a DataFrame object with its categorical columns restored.
+        '''
+        schema = self._schema(name)
+        names, rows = self._execute(f"SELECT * FROM {quote(name)}")
+        values = list(zip(*rows)) if rows else [[] for _ in names]
+
+        frame = pd.DataFrame({col: self._labels(list(values[position]), schema[col]) for position, col in enumerate(names)})
+        _, attrs = self._execute("SELECT attrs FROM _tables WHERE name = ?", (name,))
+        frame.attrs = json.loads(attrs[0][0]) if attrs else {}
+        return frame
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,107 @@
+'''
+This section contributes towards the shared dimension registry of the datasets. The raw GENESIS labels of the Länder, benefit types and sexes, including labels with mis-decoded umlauts, are mapped onto one canonical list of categories per dimension so every dataset stores these columns as pandas Categorical objects over the same dictionary.
+'''
+import logging
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Category of the labels matching no canonical label of a dimension
+OTHER = "Other"
+
+_TRANSLITERATION = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "Ä": "Ae", "Ö": "Oe", "Ü": "Ue", "ß": "ss"})
+
+
+def label_key(label: str) -> str:
+    '''
+    Folds a label into a matching key that is insensitive to case, whitespace and broken umlauts: non-ASCII characters, replacement characters and mojibake sequences such as "Ã¼" are dropped.
+
+    Inputs:
+    - label: raw label
+
+    Output:
+    - folded key, e.g. "Th�ringen", "ThÃ¼ringen" and "Thüringen" all produce "thringen"
+    '''
+    normalised = unicodedata.normalize("NFC", str(label))
+    return "".join(char for char in normalised.lower() if char.isascii() and not char.isspace())
+
+
+class Dimension:
+    '''
+    A dimension holds the canonical categories of a label column together with the aliases of each category. The categories are fixed and sorted like the labels of a string groupby, labels that match no category are stored as OTHER, so every frame normalised over a dimension has the same dtype and frames can be concatenated without falling back to object columns.
+    '''
+
+    def __init__(self, name: str, categories: list[str], aliases=None) -> None:
+        '''
+        Inputs:
+        - name: name of the dimension
+        - categories: canonical labels
+        - aliases: dictionary of additional raw label to canonical label
+        '''
+        self.name = name
+        self.categories: list[str] = sorted({*categories, OTHER})
+        self.dtype = pd.CategoricalDtype(self.categories)
+        self._lookup: dict[str, str] = {}
+
+        # Folded and transliterated (ü -> ue) keys of every category
+        for category in self.categories:
+            self._lookup.setdefault(label_key(category), category)
+            self._lookup.setdefault(label_key(category.translate(_TRANSLITERATION)), category)
+        for alias, category in (aliases or {}).items():
+            self._lookup[label_key(alias)] = category
+
+    def canonical(self, label: str) -> str:
+        '''
+        Provides the canonical category of a raw label, OTHER when the label is unknown.
+        '''
+        return self._lookup.get(label_key(label), OTHER)
+
+    def normalise(self, series: pd.Series) -> pd.Series:
+        '''
+        Converts a column of raw labels into a Categorical over the categories of the dimension. Only the distinct raw labels are mapped, the rows are translated through the integer codes of pd.factorize.
+
+        Inputs:
+        - series: raw label column
+
+        Output:
+        - categorical series with the same index
+        '''
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        canonical = [self.canonical(label) for label in uniques]
+
+        unknown = [str(label) for label in uniques if label_key(label) not in self._lookup]
+        if unknown:
+            logger.warning("%s: labels %s match no category and are stored as %r", self.name, unknown[:5], OTHER)
+
+        positions = {category: index for index, category in enumerate(self.categories)}
+        lookup = np.array([positions[label] for label in canonical] + [-1], dtype=np.int32)
+
+        return pd.Series(pd.Categorical.from_codes(lookup[codes], dtype=self.dtype), index=series.index, name=series.name)
+
+
+LÄNDER = Dimension("Länder", [
+    "Baden-Württemberg", "Bayern", "Berlin", "Brandenburg", "Bremen", "Hamburg", "Hessen", "Mecklenburg-Vorpommern",
+    "Niedersachsen", "Nordrhein-Westfalen", "Rheinland-Pfalz", "Saarland", "Sachsen", "Sachsen-Anhalt",
+    "Schleswig-Holstein", "Thüringen", "Total",
+], aliases={"Deutschland": "Total", "Insgesamt": "Total"})
+
+BENEFIT_TYPES = Dimension("PublicAssistance", [
+    "Subsistence payments",
+    "Basic sec.benefits in old age,red.earning capacity",
+    "Assistance towards healthcare",
+    "Integration assistance for disabled people",
+    "Assistance for nursing care",
+    "Assist.in overcoming special soc.difficulties etc.",
+    "Total",
+], aliases={"Insgesamt": "Total"})
+
+TYPE_CODES = Dimension("TypeCode", ["SOZ-03", "SOZ-04", "SOZ-05", "SOZ-06", "SOZ-07", "SOZ-08-09"])
+
+SEXES = Dimension("Gender", ["Male", "Female", "Total"], aliases={"männlich": "Male", "weiblich": "Female", "Insgesamt": "Total"})
+
+LOCATIONS = Dimension("Location", ["Non-Institution", "Institution", "Total"])
+
+NATIONALITIES = Dimension("Nationality", ["German", "Foreign", "Total"])
@@ -0,0 +1,103 @@
+'''
+This section contributes towards the downsampling of the time series of the line charts. A series with more points than the chart has pixels is reduced with the Largest-Triangle-Three-Buckets algorithm, which keeps the first and last point and from every bucket the point spanning the largest triangle with its neighbours, so the peaks and troughs of the series survive while the payload stays bounded by the width of the chart.
+'''
+import numpy as np
+import pandas as pd
+
+# Passes of the vectorised bucket selection before the remaining buckets are walked one by one
+MAX_PASSES = 16
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    '''
+    Selects the points of a series with the Largest-Triangle-Three-Buckets algorithm.
+
+    Every bucket selects the point spanning the largest triangle with the point selected in the previous bucket and the average of the next bucket. Instead of walking the buckets one by one, the selection is computed for all buckets at once from the selections of the previous pass, starting from the bucket averages. A bucket whose anchor no longer changes holds its final point, so the passes reach the sequential result bucket after bucket, usually within a few passes; the buckets still changing after MAX_PASSES are walked one by one.
+
+    Inputs:
+    - x: float array sorted in ascending order
+    - y: float array of the same length without missing values
+    - threshold: number of points to keep
+
+    Output:
+    - ascending positions of the selected points, every position when the series is not longer than the threshold
+    '''
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the points between the first and the last one
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    counts = np.diff(edges)
+    average_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    average_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    next_x, next_y = np.append(average_x[1:], x[-1])[:, None], np.append(average_y[1:], y[-1])[:, None]
+
+    # Buckets as rows of a matrix, the area of a point for an anchor (ax, ay) is |ax * u - ay * v + w|
+    positions = edges[:-1, None] + np.arange(counts.max())
+    valid = positions < edges[1:, None]
+    positions = np.minimum(positions, n - 2)
+    u, v = y[positions] - next_y, x[positions] - next_x
+    w = x[positions] * next_y - next_x * y[positions]
+    rows = np.arange(len(counts))
+
+    def select(ax, ay) -> np.ndarray:
+        areas = np.abs(ax[:, None] * u - ay[:, None] * v + w)
+        areas[~valid] = -1
+        return positions[rows, np.argmax(areas, axis=1)]
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    selected[1:-1] = select(np.append(x[0], average_x[:-1]), np.append(y[0], average_y[:-1]))
+    for _ in range(MAX_PASSES):
+        following = select(x[selected[:-2]], y[selected[:-2]])
+        changed = np.flatnonzero(following != selected[1:-1])
+        selected[1:-1] = following
+        if not len(changed):
+            return selected
+
+    for bucket in range(changed[0], len(counts)):
+        ax, ay = x[selected[bucket]], y[selected[bucket]]
+        areas = np.abs(ax * u[bucket] - ay * v[bucket] + w[bucket])
+        areas[~valid[bucket]] = -1
+        selected[bucket + 1] = positions[bucket, np.argmax(areas)]
+
+    return selected
+
+
+def numeric_axis(values: np.ndarray) -> np.ndarray | None:
+    '''
+    Provides the x values of a series as floats, None for values without an order, e.g. labels.
+    '''
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64).astype(float)
+    try:
+        return pd.to_numeric(pd.Series(values), errors="raise").to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError):
+        return None
+
+
+def downsample(x_values: np.ndarray, y_values: np.ndarray, budget: int) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Reduces a series to at most budget points. The points are ordered by x before they are selected, points with a missing x or y value are dropped from a downsampled series.
+
+    Inputs:
+    - x_values: x values of the series, numeric or dates
+    - y_values: y values of the series
+    - budget: largest number of points returned
+
+    Output:
+    - tuple of (x values, y values) of the kept points, the input itself when it is within the budget or its x values have no order
+    '''
+    if len(x_values) <= budget:
+        return x_values, y_values
+    x = numeric_axis(x_values)
+    if x is None:
+        return x_values, y_values
+
+    y = pd.to_numeric(pd.Series(y_values), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    positions = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    positions = positions[np.argsort(x[positions], kind="stable")]
+
+    selected = positions[lttb(x[positions], y[positions], budget)]
+    return x_values[selected], y_values[selected]
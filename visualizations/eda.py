@@ -1,103 +1,454 @@
 '''
 This section contributes towards data connection against the dataset .csv files extracted from the GENESIS-Online Database. The Parent and Child Classes adhere to common methods to capture file properties and process the csv files to be converted into Pandas Dataframe Objects
 '''
-import chardet
+import abc
+import functools
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
 import pandas as pd
 
-class Dataset:
+from .cache import PIPELINE_VERSION, FrameCache, content_hash
+from .dimensions import BENEFIT_TYPES, LÄNDER, SEXES, TYPE_CODES
+from .genesis import read_genesis_table, read_head, resolve_encoding
+from .instrumentation import instrumented
+from .memo import ResultCache, detached, freeze
+from .measures import GENESIS_MISSING_MARKERS, TEUR, FixedPoint, declare_fixed_point, fixed_point_columns, to_counts, to_fixed_point
+
+logger = logging.getLogger(__name__)
+
+def marker_mask(df: pd.DataFrame, markers=("Total",), label_cols=None) -> np.ndarray:
     '''
-    The Dataset Parent class acts as a baseline for accepting .csv files as input and utilizes encoding detection, data type conversion and numeric datatype filtering to parse data files into visualisable panda DataFrame Objects.
+    Flags the rows of which any label column contains one of the marker substrings. Each column is factorized (or its categorical codes are used), the markers are matched against the distinct values only and the row mask is taken from the integer codes, keeping the cost linear in the number of rows.
+
+    Inputs:
+    - df: DataFrame object
+    - markers: substrings to look for
+    - label_cols: columns to inspect, all non-numeric columns when None
+
+    Output:
+    - boolean numpy array with one entry per row
     '''
+    if label_cols is None:
+        label_cols = [col for col in df.columns if not pd.api.types.is_numeric_dtype(df[col])]
+
+    mask = np.zeros(len(df), dtype=bool)
+
+    for col in label_cols:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
 
-    def __init__(self, path_to_file: str, delimiter: str, skiprows: str, skipfooter: str) -> None:
+        labels = pd.Series(uniques.astype(str))
+        matched = np.zeros(len(labels), dtype=bool)
+        for marker in markers:
+            matched |= labels.str.contains(marker, regex=False).to_numpy()
+
+        if matched.any():
+            # Missing values carry the code -1 and never match
+            mask |= (codes >= 0) & matched[codes]
+
+    return mask
+
+
+def declare_total(df: pd.DataFrame, cols: list[str], total_col: str) -> None:
+    '''
+    Declares the row total of fixed-point columns as fixed-point when all summed columns share the same declaration.
+    '''
+    declared = fixed_point_columns(df)
+    units = {declared.get(col) for col in cols}
+
+    if len(units) == 1 and None not in units:
+        declare_fixed_point(df, {total_col: units.pop()})
+
+
+class Dataset(abc.ABC):
+    '''
+    The Dataset Parent class acts as a baseline for accepting .csv files as input and utilizes encoding detection, data type conversion and numeric datatype filtering to parse data files into visualisable panda DataFrame Objects. The child classes implement prepare_frame, which file_processing and the chunked mode share.
+    '''
+    # pandas parser used for the data block of the GENESIS tables, "c" or "pyarrow"
+    engine = "c"
+    # Number of lines the column header row lies above the first data row of the table
+    header_depth = 1
+    # Store of processed frames shared by all datasets
+    frame_cache = FrameCache()
+    # Currency measures stored as exact fixed-point integers
+    money_columns: dict[str, FixedPoint] = {}
+    # Optional SQLBackend running data_group and pivot_table as SQL aggregations, in-memory pandas groupbys when None
+    sql_backend = None
+    # run_pipeline steps producing the frame the aggregations read
+    aggregation_steps = ("data_group", "pivot_table")
+    # Number of memoised method results kept per object
+    result_cache_size = 64
+    # run_pipeline steps without a lazy equivalent, run eagerly on the collected frames of a lazy plan
+    eager_steps = ()
+
+    def __init__(self, path_to_file: str, delimiter: str, skiprows=None, skipfooter=None) -> None:
         '''
         Instantiates the Dataset object with baseline file parameters:
 
         Inputs:
         - path_to_file: Provide the relative or absolute file path to retrieve the file
         - delimiter: Provide the special characters (, ; / |) to recognize column separators
-        - skiprows: provides the top number of rows in the csv file to ignore
-        - skipfooter: provides the bottom number of rows in the csv file to ignore
+        - skiprows: provides the top number of rows in the csv file to ignore, detected from the GENESIS header lines when None
+        - skipfooter: provides the bottom number of rows in the csv file to ignore, detected from the GENESIS footer notes when None
         '''
         self.path_to_file  = path_to_file
         self.delimiter = delimiter
         self.skiprows = skiprows
         self.skipfooter = skipfooter
 
+        self.df_version = 0
+        self.result_cache = ResultCache(self.result_cache_size)
         self.df = None
+        self.ingest_steps = None
+        self.pipeline_key = None
+        self.source_hash = None
+        self._sql_ingested = None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+
+    @df.setter
+    def df(self, frame: pd.DataFrame) -> None:
+        # Every new dataframe invalidates the memoised results computed from its predecessor
+        self._df = frame
+        self.touch()
+
+    def touch(self) -> None:
+        '''
+        Marks the dataframe as changed, methods mutating self.df in place call it after the change.
+        '''
+        self.df_version += 1
+        self.result_cache.clear()
+
+    def memoised(func):
+        '''
+        A Decorator to memoise the result of the wrapping function (func) in the result cache of the object, keyed by the function name, its arguments and the version of self.df. The frames the function stores on the object (e.g. Länder_df) are recorded with the result and restored on a hit. Every call returns a copy of the stored result, the restored frames are the stored ones, so they keep identifying the same memoised arguments.
+
+        Inputs:
+        - func: The callback function to be used in the wrapper function
+        '''
+        @functools.wraps(func)
+        def wrapping_function(self, *args, **kwargs):
+            key = (func.__name__, self.df_version, freeze(args), freeze(kwargs))
+            entry = self.result_cache.get(key)
+
+            if entry is None:
+                before = dict(vars(self))
+                result = func(self, *args, **kwargs)
+                stored = {name: value for name, value in vars(self).items() if name != "_df" and isinstance(value, pd.DataFrame) and before.get(name) is not value}
+                # The arguments are kept alive with the entry, frames among them are identified by their id
+                entry = (result, stored, args, kwargs)
+                self.result_cache.put(key, entry)
+
+            result, stored, _, _ = entry
+            for name, value in stored.items():
+                setattr(self, name, value)
+
+            return detached(result)
+        return wrapping_function
 
     def encoding_detection(func):
         '''
-        A Decorator to retrieve the encoding type of the csv file to be used as input as part of the wrapping function (func)
+        A Decorator to retrieve the encoding type of the csv file to be used as input as part of the wrapping function (func). The encoding is resolved from a bounded sample of the file and persisted in a sidecar file, so repeated loads skip the detection.
 
         Inputs:
         - func: The callback function to be used in the wrapper function
         '''
+        @functools.wraps(func)
         def wrapping_function(self, *args, **kwargs):
             try:
-                with open(self.path_to_file, "rb") as data_file:
-                    output = chardet.detect(data_file.read())
-                    encoding = output["encoding"]
-                    print(f"\nCSV file encoding: {encoding}")
-            except FileNotFoundError as FE:
-                print("File {0} was not found, check relative path".format(self.file_to_path))
-                return
-            except EncodingWarning:
-                print("Encoding was not clearly identified")
+                encoding = resolve_encoding(self.path_to_file)
+                logger.debug("CSV file encoding of %s: %s", self.path_to_file, encoding)
+            except FileNotFoundError:
+                logger.error("File %s was not found, check relative path", self.path_to_file)
                 return
-            finally:
-                if encoding:
-                    return func(self, encoding, *args, *kwargs)
-                else:
-                    print("Encoding was not identified from file")
-                    return None
+
+            if encoding:
+                return func(self, encoding, *args, **kwargs)
+            else:
+                logger.error("Encoding was not identified from file %s", self.path_to_file)
+                return None
         return wrapping_function
 
 
-    def dtype_conversion(self, *args: str) -> pd.DataFrame:
+    def cache_key(self, steps: list[tuple], lazy=False, chunked=False) -> str:
+        '''
+        Derives the cache key of the processed frames from the content hash of the source file, the file parameters and the processing steps.
+
+        Inputs:
+        - steps: list of (method name, args, kwargs) tuples as accepted by run_pipeline
+        - lazy: whether the steps are executed as a lazy query plan
+        - chunked: whether the file is streamed in chunks, leaving df out of the processed frames
+        '''
+        description = [
+            PIPELINE_VERSION,
+            type(self).__name__,
+            content_hash(self.path_to_file),
+            self.delimiter,
+            self.skiprows,
+            self.skipfooter,
+            self.header_depth,
+            [[name, list(args), kwargs] for name, args, kwargs in steps],
+        ]
+        if lazy:
+            description.append("lazy")
+        if chunked:
+            description.append("chunked")
+        digest = hashlib.sha256(json.dumps(description, default=str, sort_keys=True).encode("utf-8")).hexdigest()
+
+        return f"{type(self).__name__}-{digest[:32]}"
+
+    def processed_frames(self) -> dict[str, pd.DataFrame]:
+        '''
+        Provides every DataFrame held by the object, e.g. df, Länder_df or pivot_table.
+        '''
+        frames = {name: value for name, value in vars(self).items() if isinstance(value, pd.DataFrame) and name != "_df"}
+        return {"df": self.df, **frames} if isinstance(self.df, pd.DataFrame) else frames
+
+    @instrumented
+    def run_pipeline(self, steps: list[tuple], use_cache=True, lazy=False, memory_budget=None) -> pd.DataFrame:
+        '''
+        Runs the processing methods in order, e.g. [("file_processing", (columns,), {}), ("filter_data", (), {})]. With use_cache the resulting frames are restored from the frame cache when the source file and steps are unchanged, otherwise they are computed and stored. With lazy the steps following file_processing are recorded in a QueryPlan and executed in one optimised pass, the eager_steps run on its output. With a memory_budget the file is streamed in chunks through a ChunkedPipeline instead of being read as a whole, only the aggregated frames are kept and df stays None.
+
+        Inputs:
+        - steps: list of (method name, args, kwargs) tuples
+        - use_cache: boolean value to read and write the frame cache, True as default argument
+        - lazy: boolean value to execute the steps as a lazy query plan, False as default argument
+        - memory_budget: bytes available for a chunk of the streamed file, the file is read as a whole when None
+
+        Output:
+        - The processed dataframe object, None when streamed
+        '''
+        if memory_budget is not None and lazy:
+            raise ValueError("run_pipeline streams chunks or builds a lazy plan, not both")
+
+        # Identifies the processed frames, e.g. for the partitions of the aggregate cube
+        self.pipeline_key = self.cache_key(steps, lazy, chunked=memory_budget is not None)
+        # Content the frames are processed from, compared by the DataWatcher
+        self.source_hash = content_hash(self.path_to_file)
+        key = self.pipeline_key if use_cache else None
+        names = [name for name, _, _ in steps]
+        aggregations = [names.index(name) for name in self.aggregation_steps if name in names]
+        self.ingest_steps = list(steps[:min(aggregations)]) if aggregations else list(steps)
+
+        if key:
+            frames = self.frame_cache.load(key)
+            if frames is not None:
+                for name, frame in frames.items():
+                    setattr(self, name, frame)
+                logger.info("Processed frames of %s loaded from cache", self.path_to_file)
+                return self.df
+
+        if memory_budget is not None:
+            self.run_chunked(steps, memory_budget)
+            if key and self.processed_frames():
+                self.frame_cache.store(key, self.processed_frames(), self.path_to_file)
+            return self.df
+
+        plan = None
+        deferred = []
+        for name, args, kwargs in steps:
+            if lazy and name in self.eager_steps:
+                deferred.append((name, args, kwargs))
+            elif lazy and name != "file_processing":
+                plan = plan or self.lazy()
+                self.plan_step(plan, name, args, kwargs)
+            else:
+                getattr(self, name)(*args, **kwargs)
+
+        if plan is not None and self.df is not None:
+            plan.collect()
+
+        for name, args, kwargs in deferred:
+            getattr(self, name)(*args, **kwargs)
+
+        if key and self.df is not None:
+            self.frame_cache.store(key, self.processed_frames(), self.path_to_file)
+
+        return self.df
+
+    def run_chunked(self, steps: list[tuple], memory_budget: int) -> dict[str, pd.DataFrame]:
         '''
-        Takes column names of a dataframe as string inputs and converts the datatypes of selected columns into int64
+        Streams the file in chunks of at most memory_budget bytes (including the copies made while converting them) and replays the steps following file_processing on every chunk, see ChunkedPipeline.
+
+        Inputs:
+        - steps: list of (method name, args, kwargs) tuples starting with file_processing
+        - memory_budget: bytes available for a chunk
+
+        Output:
+        - dictionary of attribute name to output frame
+        '''
+        from .chunked import ChunkedPipeline
+
+        (first, args, kwargs), *rest = steps
+        if first != "file_processing":
+            raise ValueError(f"A chunked pipeline starts with file_processing, not {first}")
+
+        pipeline = ChunkedPipeline(self, memory_budget)
+        for name, step_args, step_kwargs in rest:
+            if name in self.eager_steps:
+                raise ValueError(f"{name} needs the complete table and has no chunked equivalent in {type(self).__name__}")
+            self.plan_step(pipeline, name, step_args, step_kwargs)
+
+        chunks = self.stream_file(*args, memory_budget=memory_budget, **kwargs)
+        return pipeline.run(chunks) if chunks is not None else {}
+
+    @encoding_detection
+    def stream_file(self, encoding: str, *args, memory_budget=None, **kwargs):
+        '''
+        Reads the file like file_processing, but yields it as prepared chunks. The first chunk holds SAMPLE_ROWS rows, the following chunks as many rows as fit the memory_budget.
+
+        Inputs:
+        - encoding: provided by the encoding decorator
+        - args, kwargs: arguments of file_processing, passed on to prepare_frame
+        - memory_budget: bytes available for a chunk, chunks of SAMPLE_ROWS rows when None
+        '''
+        from .chunked import SAMPLE_ROWS, rows_within_budget
+
+        chunks = read_genesis_table(self.path_to_file, encoding, self.delimiter, skiprows=self.skiprows, skipfooter=self.skipfooter, header_depth=self.header_depth, engine=self.engine, chunksize=SAMPLE_ROWS)
+        with chunks:
+            for position, chunk in enumerate(chunks):
+                chunk = self.prepare_frame(chunk, *args, first=position == 0, **kwargs)
+                if position == 0 and memory_budget is not None:
+                    chunks.chunksize = rows_within_budget(chunk, memory_budget)
+                yield chunk
+
+    @abc.abstractmethod
+    def prepare_frame(self, df: pd.DataFrame, *args, first=True) -> pd.DataFrame:
+        '''
+        Turns the raw table, or a chunk of it, into the frame of file_processing. Implemented by the child classes.
+
+        Inputs:
+        - df: raw table or chunk read from the data block of the file
+        - args: arguments of file_processing, e.g. the column names
+        - first: whether df holds the first rows of the table
+        '''
+
+    def lazy(self):
+        '''
+        Starts a lazy query plan over the frame read by file_processing, e.g. dataset.lazy().convert("Q1").filter().group(["Q1"], "Gender").collect().
+
+        Output:
+        - QueryPlan object
+        '''
+        from .pipeline import QueryPlan
+
+        return QueryPlan(self)
+
+    def plan_step(self, plan, name: str, args: tuple, kwargs: dict) -> None:
+        '''
+        Records a run_pipeline step in the query plan or the chunked pipeline, the arguments follow the signature of the eager method of the same name.
+        '''
+        operations = {
+            "dtype_conversion": plan.convert,
+            "filter_data": plan.filter,
+            "data_group": plan.group,
+        }
+        if name not in operations:
+            raise ValueError(f"{name} has no lazy or chunked equivalent in {type(self).__name__}")
+
+        operations[name](*args, **kwargs)
+
+    def sql_table(self) -> str:
+        '''
+        Ingests the current frame into the SQL backend unless it was ingested before and provides its table name. Frames produced by run_pipeline are keyed by the steps preceding the first aggregation, so a database file written by an earlier run is not ingested again.
+
+        Output:
+        - table name, derived from the source file name
+        '''
+        name = os.path.splitext(os.path.basename(self.path_to_file))[0]
+
+        if self._sql_ingested != self.df_version:
+            key = self.cache_key(self.ingest_steps) if self.ingest_steps is not None else None
+            if self.sql_backend.ingest(name, self.df, key):
+                logger.info("%s ingested into the %s table %s", self.path_to_file, self.sql_backend.engine, name)
+            self._sql_ingested = self.df_version
+
+        return name
+
+    def invalidate_cache(self) -> int:
+        '''
+        Removes every cached frame derived from the source file of the object.
+
+        Output:
+        - number of removed cache entries
+        '''
+        return self.frame_cache.invalidate(self.path_to_file)
+
+    @classmethod
+    def clean_cache(cls) -> int:
+        '''
+        Removes stale cache entries whose source file was changed or deleted.
+
+        Output:
+        - number of removed cache entries
+        '''
+        return cls.frame_cache.clean()
+
+    @instrumented
+    def dtype_conversion(self, *args: str, missing_markers=GENESIS_MISSING_MARKERS) -> pd.DataFrame:
+        '''
+        Takes column names of a dataframe as string inputs and converts the datatypes of selected columns into the smallest nullable integer type holding their values (e.g. UInt32). Columns declared in money_columns are stored as scaled int64 fixed-point values instead. GENESIS special markers such as "-", "." and "x" become missing values rather than zeros, and only the selected columns are touched.
 
         Inputs:
         - *args: Accepts variable number of columns in the dataset
+        - missing_markers: cell values converted to missing values
 
         Output:
         - pd.DataFrame: Original dataframe with type converted columns
         '''
         try:
             for col in args:
-                self.df[col] = pd.to_numeric(self.df[col], errors="coerce")
+                if col in self.money_columns:
+                    self.df[col] = to_fixed_point(self.df[col], self.money_columns[col], missing_markers)
+                else:
+                    self.df[col] = to_counts(self.df[col], missing_markers)
 
-            self.df = self.df.fillna(0)
+            declare_fixed_point(self.df, {col: self.money_columns[col] for col in args if col in self.money_columns})
+            self.touch()
 
-            print(self.df[list(args)].head(10))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Converted columns of %s:\n%s", self.path_to_file, self.df[list(args)].head(10))
         except KeyError:
-            print("Column value does not correspond to a column in the dataframe")
+            logger.error("Column value does not correspond to a column in the dataframe")
             return
 
         return self.df
 
-    def filter_data(self, region_col="Länder"):
+    @instrumented
+    def filter_data(self, region_col="Länder", markers=("Total",), label_cols=None):
         '''
-        Use case for row values containing "Total" and filters them out of the dataframe object
+        Use case for row values containing "Total" and filters them out of the dataframe object. Only the label (non-numeric) columns are inspected: each column is factorized once and the markers are matched against its distinct values, so the row mask is built from integer codes instead of converting every cell to a string.
 
         Inputs:
         - region_col: Default set to 'Länder'
+        - markers: substrings identifying subtotal rows, ("Total",) as default argument
+        - label_cols: columns to inspect, all non-numeric columns when None
         '''
         try:
-            self.df = self.df[~self.df.apply(lambda r: r.astype(str).str.contains("Total").any(), axis=1)]
+            self.df = self.df[~marker_mask(self.df, markers, label_cols)]
 
-            self.df.reset_index(drop=False, inplace=True)
+            self.df = self.df.reset_index(drop=False)
 
-            self.df[region_col] = self.df["Länder"].astype(str)
+            self.df[region_col] = self.df["Länder"]
         except KeyError as KE:
-            print("Column value does not correspond to a column in the dataframe thus filter was not completed")
+            logger.error("Column value does not correspond to a column in the dataframe thus filter was not completed")
         finally:
             return self.df
 
+    @instrumented
+    @memoised
     def data_group(self, cols: list[str], group_element: str, include_total=False) -> pd.DataFrame:
         '''
-        Provides a related dataframe dependent upon the "group_element" attribute of the original dataframe.
+        Provides a related dataframe dependent upon the "group_element" attribute of the original dataframe. Missing (suppressed) cells are skipped in the sums, a group without any reported value stays missing instead of 0.
 
         Inputs:
         - cols: List of columns to sum when merged through groupby
@@ -109,72 +460,86 @@ class Dataset:
         '''
         var_name = f"{group_element}_df"
         try:
-            grouped_data = self.df.groupby(group_element)[cols].sum().reset_index()
+            if self.sql_backend is not None:
+                grouped_data = self.sql_backend.group_sum(self.sql_table(), [group_element], list(cols))
+            else:
+                grouped_data = self.df.groupby(group_element, observed=True)[cols].sum(min_count=1).reset_index()
 
             if include_total:
-                grouped_data["Total"] = grouped_data[cols].sum(axis=1)
+                grouped_data["Total"] = grouped_data[cols].sum(axis=1, min_count=1)
+                declare_total(grouped_data, cols, "Total")
 
             setattr(self, var_name, grouped_data)
-            print(f"\nGrouped DataFrame with sums: \n{grouped_data.head()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Grouped DataFrame with sums:\n%s", grouped_data.head())
 
             return grouped_data
         except KeyError:
-            print(f"column argument {group_element} entered is not part of DataFrame {self.df.columns}")
+            logger.error("column argument %s entered is not part of DataFrame %s", group_element, self.df.columns)
         finally:
-            print("Grouped Function process completed")
+            logger.debug("Grouped Function process completed")
 
 
 class PublicAssistance(Dataset):
     '''
     The child class inheriting from the Dataset class, focusing on the primary dataset public_assistance.
     '''
+    money_columns = {"Expenditure(TEUR)": TEUR, "Revenue(TEUR)": TEUR, "NetExpenditure(TEUR)": TEUR}
 
-    def __init__(self, path_to_file, delimiter, skiprows, skipfooter):
+    def __init__(self, path_to_file, delimiter, skiprows=None, skipfooter=None):
         '''
         Instantiates the PublicAssistance class object with the same parameters as defined in the Dataset class with no additions
         '''
         super().__init__(path_to_file, delimiter, skiprows, skipfooter)
     
+    @instrumented
     @Dataset.encoding_detection
     def file_processing(self, encoding: str, columns: list[str]) -> pd.DataFrame:
         '''
         Utilises the decorator function defined in the Dataset Class to identify file encoding and reads the contents of the files prior to conversion to a dataframe object.
         '''
         try:
-            with open(self.path_to_file, "r", encoding=encoding) as data_file:
-                file_contents = data_file.read()
-                print("\n", file_contents[:500])
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Head of %s:\n%s", self.path_to_file, read_head(self.path_to_file, encoding))
 
-            df = pd.read_csv(self.path_to_file, encoding=encoding, delimiter=self.delimiter, skiprows=self.skiprows, engine="python")
-            df.columns = columns
+            df = read_genesis_table(self.path_to_file, encoding, self.delimiter, skiprows=self.skiprows, header_depth=self.header_depth, engine=self.engine)
 
             #print("\n", df.head(10))
 
-            replaced_substring_1 = "ttemberg"
-            replaced_substring_2 = "ingen"
-            change_mechanism_1 = df["Länder"].str.endswith(replaced_substring_1)
-            change_mechanism_2 = df["Länder"].str.endswith(replaced_substring_2)
-
-            df.loc[change_mechanism_1, "Länder"] = "Baden-Württemberg"
-            df.loc[change_mechanism_2, "Länder"] = "Thüringen"
-            self.df = df
+            self.df = self.prepare_frame(df, columns)
 
             return
         except FileNotFoundError:
-            print("{0} File not detected, update the url argument provided".format(self.path_to_file))
+            logger.error("%s File not detected, update the url argument provided", self.path_to_file)
             return
+
+    def prepare_frame(self, df: pd.DataFrame, columns: list[str], first=True) -> pd.DataFrame:
+        '''
+        Names the columns of the raw table (or of a chunk of it) and normalises its labels to the shared categoricals.
+        '''
+        df.columns = columns
+
+        df["Länder"] = LÄNDER.normalise(df["Länder"])
+        df["TypeCode"] = TYPE_CODES.normalise(df["TypeCode"])
+        df["PublicAssistance"] = BENEFIT_TYPES.normalise(df["PublicAssistance"])
+
+        return df
     
 
 class BasicSecurity(Dataset):
     '''
     The child class inheriting from the Dataset class, focusing on the primary dataset public_assistance.
     '''
-    def __init__(self, path_to_file, delimiter, skiprows, skipfooter):
+    # The year header row sits above the reference month row
+    header_depth = 2
+
+    def __init__(self, path_to_file, delimiter, skiprows=None, skipfooter=None):
         '''
         Instantiates the BasicSecurity class object with the same parameters as defined in the Dataset class with no additions
         '''
         super().__init__(path_to_file, delimiter, skiprows, skipfooter)
 
+    @instrumented
     @Dataset.encoding_detection
     def file_processing(self, encoding: str, columns: list[str]) -> pd.DataFrame:
         '''
@@ -183,31 +548,32 @@ class BasicSecurity(Dataset):
         Additionally, The function reduces the dataframe size by selecting the critical dataframe columns and assigns the dataframe object to the object property.
         '''
         try:
-            with open(self.path_to_file, "r", encoding=encoding) as data_file:
-                file_contents = data_file.read()
-                print("\n", file_contents[:500])
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Head of %s:\n%s", self.path_to_file, read_head(self.path_to_file, encoding))
 
 
-            df = pd.read_csv(self.path_to_file, encoding=encoding, delimiter=self.delimiter, skiprows=self.skiprows, skipfooter=self.skipfooter, engine="python")
+            df = read_genesis_table(self.path_to_file, encoding, self.delimiter, skiprows=self.skiprows, skipfooter=self.skipfooter, header_depth=self.header_depth, engine=self.engine)
 
-            df = df.drop(0).reset_index(drop=True)
+            self.df = self.prepare_frame(df, columns)
+        except FileNotFoundError:
+            logger.error("%s File not detected, update the url argument provided", self.path_to_file)
+            return
 
-            df = df.iloc[:, [0 , 1, 30, 31, 32, 33]]
+    def prepare_frame(self, df: pd.DataFrame, columns: list[str], first=True) -> pd.DataFrame:
+        '''
+        Removes the reference month row below the header, selects the latest year columns and normalises the labels of the raw table (or of a chunk of it, the month row only heads the first chunk).
+        '''
+        if first:
+            df = df.drop(df.index[0]).reset_index(drop=True)
 
-            df.columns = columns
+        df = df.iloc[:, [0 , 1, 30, 31, 32, 33]]
 
-            replaced_substring_1 = "ttemberg"
-            replaced_substring_2 = "ingen"
-            change_mechanism_1 = df["Länder"].str.endswith(replaced_substring_1)
-            change_mechanism_2 = df["Länder"].str.endswith(replaced_substring_2)
+        df.columns = columns
 
-            df.loc[change_mechanism_1, "Länder"] = "Baden-Württemberg"
-            df.loc[change_mechanism_2, "Länder"] = "Thüringen"
+        df["Länder"] = LÄNDER.normalise(df["Länder"])
+        df["Gender"] = SEXES.normalise(df["Gender"])
 
-            self.df = df
-        except FileNotFoundError:
-            print("{0} File not detected, update the url argument provided".format(self.path_to_file))
-            return
+        return df
 
     def modify_for_pivot(func) -> pd.DataFrame:
         '''
@@ -219,13 +585,19 @@ class BasicSecurity(Dataset):
         Output:
         - produces the wrapper function with added functionality of the decorator. 
         '''
+        @functools.wraps(func)
         def wrapper_function(self, columns: list[str], group_element: list[str], **kwargs) -> pd.DataFrame:
-            grouped_data = self.df.groupby(list(group_element))[columns].sum().reset_index()
+            if self.sql_backend is not None:
+                grouped_data = self.sql_backend.group_sum(self.sql_table(), list(group_element), list(columns))
+            else:
+                grouped_data = self.df.groupby(list(group_element), observed=True)[columns].sum(min_count=1).reset_index()
             
-            grouped_data[kwargs["values"]] = grouped_data[columns].sum(axis=1)
+            grouped_data[kwargs["values"]] = grouped_data[columns].sum(axis=1, min_count=1)
+            declare_total(grouped_data, columns, kwargs["values"])
             
             setattr(self, f"{group_element[0] + group_element[1]}_df", grouped_data)
-            print(f"\nGrouped DataFrame with sums: \n{grouped_data.head()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Grouped DataFrame with sums:\n%s", grouped_data.head())
 
             values = kwargs.get("values")
             index = kwargs.get("index")
@@ -234,6 +606,8 @@ class BasicSecurity(Dataset):
             return func(self, values, index, column_header, grouped_data)
         return wrapper_function
     
+    @instrumented
+    @Dataset.memoised
     @modify_for_pivot
     def pivot_table(self, values: str, index: str, column_header: str, grouped_data: pd.DataFrame) -> pd.DataFrame:
         '''
@@ -249,7 +623,11 @@ class BasicSecurity(Dataset):
         - Pivot Table in a Pandas Dataframe object
         '''
         try:
-            pivot_table = grouped_data.pivot_table(values=values, index=index, columns=column_header)
+            # Summing the single value of each cell keeps fixed-point integers exact, the default mean would turn them into floats
+            pivot_table = grouped_data.pivot_table(values=values, index=index, columns=column_header, aggfunc="sum", observed=True)
+
+            if values in fixed_point_columns(grouped_data):
+                declare_fixed_point(pivot_table, {str(col): fixed_point_columns(grouped_data)[values] for col in pivot_table.columns})
         
             setattr(self, "pivot_table", pivot_table)
 
@@ -257,8 +635,19 @@ class BasicSecurity(Dataset):
 
             return pivot_table
         except KeyError:
-                print(f"column argument {column_header}  & {values} entered is not part of DataFrame {grouped_data}", "Calling Function with baseline Dataset parameters")
+                logger.error("column argument %s & %s entered is not part of DataFrame %s", column_header, values, grouped_data.columns)
+
+    def plan_step(self, plan, name: str, args: tuple, kwargs: dict) -> None:
+        '''
+        Records the pivot_table step in the query plan in addition to the steps of the Dataset class.
+        '''
+        if name == "pivot_table":
+            plan.pivot(*args, **kwargs)
+        else:
+            super().plan_step(plan, name, args, kwargs)
 
+    @instrumented
+    @Dataset.memoised
     def max_quarterly_assessment(self, data: pd.DataFrame, cols: list[str], var_assignment: str, value_name: str) -> pd.DataFrame:
         '''
         Provides the expanded dataframe object and maximum quarterly values for further visualization
@@ -281,7 +670,7 @@ class BasicSecurity(Dataset):
 
             return elongate_df, max_value
         except KeyError:
-            print(f"{cols} are not found inside the Dataframe selection")
+            logger.error("%s are not found inside the Dataframe selection", cols)
 
 
 
@@ -289,23 +678,37 @@ class Subsistence(Dataset):
     '''
     The Subsistence is deriving attributes and methods from the Parent Dataset class.
     '''
-    def __init__(self, path_to_file, delimiter, skiprows, skipfooter):
+    # The sex header row sits above the nationality row
+    header_depth = 2
+    # The tidy model is built from the collected wide frame
+    eager_steps = ("tidy",)
+
+    def __init__(self, path_to_file, delimiter, skiprows=None, skipfooter=None):
         '''
-        Instantiates the Subsistence class object with the same parameters as defined in the Dataset class with no additions
+        Instantiates the Subsistence class object with the same parameters as defined in the Dataset class, the long model attributes are set by tidy
         '''
         super().__init__(path_to_file, delimiter, skiprows, skipfooter)
+        self.row_keys = None
+        self.reported_totals = None
 
+    @instrumented
     @Dataset.encoding_detection
     def file_processing(self, encoding: str) -> pd.DataFrame:
         '''
         Utilizes the encoding decorator to retrieve the csv files encoding as an input parameter in the wrapper function. Optimizes the csv file to translate into a Dataframe object by removing unnecessary rows and footers.
         '''
-        with open(self.path_to_file, "r", encoding=encoding) as data_file:
-            file_contents = data_file.read()
-            print("\n", file_contents[:500])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Head of %s:\n%s", self.path_to_file, read_head(self.path_to_file, encoding))
 
-        df = pd.read_csv(self.path_to_file, encoding=encoding, delimiter=';', skiprows=self.skiprows, skipfooter=self.skipfooter, engine="python")
+        df = read_genesis_table(self.path_to_file, encoding, self.delimiter, skiprows=self.skiprows, skipfooter=self.skipfooter, header_depth=self.header_depth, engine=self.engine)
+
+        self.df = self.prepare_frame(df)
+        #print("This is revised dataframe of the subsistence recipients\n", df.head())
 
+    def prepare_frame(self, df: pd.DataFrame, first=True) -> pd.DataFrame:
+        '''
+        Names the 27 count columns of the raw table (or of a chunk of it), removes the nationality row heading the first chunk, reduces the reference date to its year and normalises the Länder labels.
+        '''
         df.rename(
             columns=
             {
@@ -341,34 +744,129 @@ class Subsistence(Dataset):
             "Date": "Year"}, 
             inplace=True)
         
-        df = df.iloc[1:]
+        if first:
+            # A copy rather than a view, the columns are replaced below
+            df = df.iloc[1:].copy()
 
         df.Year = df["Year"].str[:4]
         
-        replaced_substring_1 = "ttemberg"
-        replaced_substring_2 = "ingen"
-        change_mechanism_1 = df["Länder"].str.endswith(replaced_substring_1)
-        change_mechanism_2 = df["Länder"].str.endswith(replaced_substring_2)
+        df["Länder"] = LÄNDER.normalise(df["Länder"])
 
-        df.loc[change_mechanism_1, "Länder"] = "Baden-Württemberg"
-        df.loc[change_mechanism_2, "Länder"] = "Thüringen"
+        return df
 
-        self.df = df
-        #print("This is revised dataframe of the subsistence recipients\n", df.head())
 
+    def plan_step(self, plan, name: str, args: tuple, kwargs: dict) -> None:
+        '''
+        Records the year range filter in the query plan, it produces filtered_df and leaves df unchanged like the eager method.
+        '''
+        if name == "filter_data":
+            def filter_years(year_start: int, year_end: int):
+                plan.between("Year", year_start, year_end, name="filtered_df")
 
+            filter_years(*args, **kwargs)
+        else:
+            super().plan_step(plan, name, args, kwargs)
+
+    @instrumented
     def filter_data(self, year_start: int, year_end: int) -> pd.DataFrame:
         '''
-        Optimizes the dataframe to set as per a specified date range for analysis.
+        Optimizes the dataframe to set as per a specified date range for analysis. The filtered frame is the wide table, rebuilt from the long model once tidy has run.
 
         Inputs:
         - year_start: The starting year range
         - year_end: The final filter year range
         '''
-        filtered_df = self.df[self.df["Year"].between(year_start, year_end)]
+        if self.reported_totals is not None:
+            filtered_df = self.year_range(year_start, year_end)
+        else:
+            filtered_df = self.df[self.df["Year"].between(year_start, year_end)]
 
         setattr(self, "filtered_df", filtered_df)
 
         #print(f"Filtered data between {year_start} & {year_end}\n", filtered_df.head(15))
 
+    @instrumented
+    def tidy(self) -> pd.DataFrame:
+        '''
+        Replaces the wide dataframe by the long model of the tidy module: self.df holds one Count per Länder, Year, Location, Nationality and Gender base cell, reported_totals the published subtotals that differ from the sum of their base cells and row_keys the Länder and Year rows of the wide table.
+        '''
+        from .tidy import ROW_DIMENSIONS, to_long
+
+        base, reported = to_long(self.df)
+        self.row_keys = self.df[ROW_DIMENSIONS].reset_index(drop=True)
+        self.reported_totals = reported
+        # Set last, the df setter invalidates the memoised wide view. The base counts are kept ordered by year, so year_range slices them without a sort
+        self.df = base.sort_values("Year", kind="stable", ignore_index=True)
+
+        return self.df
+
+    @property
+    def counts(self) -> pd.Series:
+        '''
+        The base counts indexed by Länder, Year, Location, Nationality and Gender.
+        '''
+        from .tidy import CELL_DIMENSIONS, ROW_DIMENSIONS
+
+        return self.df.set_index(ROW_DIMENSIONS + [dimension.name for dimension in CELL_DIMENSIONS])["Count"]
+
+    def total(self, location=None, nationality=None, sex=None, by=("Länder", "Year"), published=True) -> pd.Series:
+        '''
+        Computes a cell of the table from the base counts, e.g. total(location="Institution", nationality="Foreign", sex="Female", by=["Länder"]) for the foreign females in institutions per Land.
+
+        Inputs:
+        - location, nationality, sex: labels of the cell, None sums over the dimension
+        - by: Länder and/or Year dimensions of the result
+        - published: use the published subtotals where GENESIS reports a value different from the sum of the base cells, True as default argument
+
+        Output:
+        - nullable integer series indexed by the by dimensions
+        '''
+        from .tidy import normalise_cell, reduce_cell
+
+        return reduce_cell(self.df, self.reported_totals, pd.MultiIndex.from_frame(self.row_keys), normalise_cell(location, nationality, sex), by=list(by), published=published)
+
+    @Dataset.memoised
+    def wide_view(self, year_start=None, year_end=None) -> pd.DataFrame:
+        '''
+        Provides the wide table with the Länder, Year and 27 count columns of file_processing, computed once per version of the long model.
+
+        Inputs:
+        - year_start: The starting year range, unbounded when None
+        - year_end: The final filter year range, unbounded when None
+        '''
+        from .tidy import to_wide
+
+        wide = to_wide(self.df, self.reported_totals, pd.MultiIndex.from_frame(self.row_keys))
+        if year_start is not None or year_end is not None:
+            wide = self.year_partitions(wide=True).slice(year_start, year_end).sort_index()
+
+        return wide
+
+    @Dataset.memoised
+    def year_partitions(self, wide=True):
+        '''
+        Provides the YearPartitions of the wide view or of the long base counts, built once per version of the long model.
+        '''
+        from .tidy import YearPartitions
+
+        return YearPartitions(self.wide_view() if wide else self.df)
+
+    def year_range(self, year_start=None, year_end=None, wide=True) -> pd.DataFrame:
+        '''
+        Provides the rows between year_start and year_end (both included, unbounded when None) by a binary search over the year partitions instead of a scan of the Year column. The result is a slice of the year ordered frame, e.g. for the year slider of the dashboard.
+
+        Inputs:
+        - year_start: The starting year range
+        - year_end: The final filter year range
+        - wide: slice of the wide view when True, of the long base counts when False
 
+        Output:
+        - DataFrame object ordered by year
+        '''
+        return self.year_partitions(wide=wide).slice(year_start, year_end)
+
+    def year_bounds(self) -> tuple[int, int]:
+        '''
+        Provides the first and last year of the table.
+        '''
+        return self.year_partitions(wide=False).bounds()
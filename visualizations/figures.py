@@ -0,0 +1,171 @@
+'''
+This section contributes towards the incremental building of the Visuals figures. The first figure of a chart type is built through plotly.express and kept as a template; the following figures of the type copy the validated trace and layout of the template and only replace the trace data, colours and titles of the new input, skipping the dataframe validation, trace grouping and property validation of plotly.express. Every chart shares the one layout template converted from the default plotly template.
+'''
+from __future__ import annotations
+
+import threading
+from itertools import cycle
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+TRANSPARENT = "rgba(0,0,0,0)"
+# Layout properties shared by every chart of the dashboard
+CHART_LAYOUT = {"plot_bgcolor": TRANSPARENT, "paper_bgcolor": TRANSPARENT, "hovermode": "closest"}
+
+
+def chart_layout(height: int, margin: dict, **layout) -> dict:
+    '''
+    Provides the shared transparent layout of the charts with the height, margins and further properties of a chart.
+    '''
+    return {**CHART_LAYOUT, "height": height, "margin": margin, **layout}
+
+
+def merge(base: dict, updates: dict) -> dict:
+    '''
+    Provides a copy of base with the updates applied. Nested dictionaries are merged, the branches without updates are shared with base.
+
+    Inputs:
+    - base: dictionary, e.g. the plotly JSON of a template trace
+    - updates: values replacing or extending the values of base
+
+    Output:
+    - merged dictionary
+    '''
+    merged = dict(base)
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def groups(data: pd.DataFrame, column: str, *columns: str) -> list[tuple]:
+    '''
+    Splits columns of a dataframe by the values of a column in the order the values first appear, as plotly.express orders the traces of a color column.
+
+    Inputs:
+    - data: DataFrame object
+    - column: column the traces are split by
+    - columns: columns plotted by every trace
+
+    Output:
+    - list of (value, arrays of the columns) tuples
+    '''
+    codes, uniques = pd.factorize(data[column], sort=False)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    arrays = [data[col].to_numpy() for col in columns]
+    return [(value, [array[order[start:end]] for array in arrays]) for value, start, end in zip(uniques, bounds[:-1], bounds[1:])]
+
+
+def largest_groups(data: pd.DataFrame, column: str, measure: str, limit: int, label_cols=()) -> pd.DataFrame:
+    '''
+    Sums a measure per value of a column and keeps the limit - 1 largest sums, the remaining values are summed into one "Other" row, e.g. the Kreise beyond the largest ones of a bar plot.
+
+    Inputs:
+    - data: DataFrame object
+    - column: column whose values are aggregated
+    - measure: additive measure column
+    - limit: number of rows of the result
+    - label_cols: columns holding one value for all rows, e.g. the x-axis column of a bar plot
+
+    Output:
+    - DataFrame with the label columns, the column and the measure, largest sums first
+    '''
+    sums = data.groupby(column, observed=True, sort=False)[measure].sum()
+    largest = sums.nlargest(limit - 1)
+    rest = sums.drop(largest.index)
+
+    aggregated = pd.DataFrame({column: largest.index.astype(object), measure: largest.to_numpy()})
+    if len(rest):
+        aggregated.loc[len(aggregated)] = [f"Other ({len(rest)})", rest.sum()]
+    for col in label_cols:
+        aggregated.insert(0, col, data[col].iloc[0])
+    return aggregated
+
+
+class FigureTemplates:
+    '''
+    Store of one template per chart type. A template holds the plotly JSON of the first trace and of the layout of a figure built through plotly.express; figures of the type are created from copies of it without validation, the patches only set values of the same properties and types as the validated template.
+    '''
+
+    def __init__(self) -> None:
+        self.builds = 0
+        self.patches = 0
+        self._templates: dict[tuple, dict] = {}
+        self._layout_template = None
+        self._lock = threading.Lock()
+
+    def layout_template(self) -> dict:
+        '''
+        Provides the plotly JSON of the default plotly template, converted once and shared by the layouts of every chart.
+        '''
+        if self._layout_template is None:
+            import plotly.io as pio
+
+            self._layout_template = pio.templates[pio.templates.default].to_plotly_json()
+        return self._layout_template
+
+    def colorway(self) -> list[str]:
+        '''
+        Provides the trace colours of the layout template, the default colour sequence of plotly.express.
+        '''
+        return self.layout_template().get("layout", {}).get("colorway") or ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
+
+    def colours(self, sequence=None) -> cycle:
+        '''
+        Provides the colours assigned to the traces in order, cycling through the sequence or the colorway of the layout template.
+        '''
+        return cycle(sequence or self.colorway())
+
+    def figure(self, key: tuple, build: Callable[[], go.Figure], traces: list[dict], layout: dict) -> go.Figure:
+        '''
+        Provides a figure of a chart type.
+
+        Inputs:
+        - key: chart type and the properties that change the structure of its figures, e.g. ("bar", "group")
+        - build: function building a figure of the type through plotly.express, only called when the type has no template
+        - traces: data, colours and labels of every trace
+        - layout: titles and sizes of the figure
+
+        Output:
+        - Plotly Graph Objects figure
+        '''
+        import plotly.graph_objects as go
+
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None:
+                figure = build()
+                self.builds += 1
+                if not figure.data:
+                    # A figure without traces provides no trace template
+                    return figure
+
+                spec = figure.to_plotly_json()
+                spec["layout"].pop("template", None)
+                template = self._templates[key] = {"trace": spec["data"][0], "layout": spec["layout"]}
+            self.patches += 1
+
+        return go.Figure(
+            {"data": [merge(template["trace"], trace) for trace in traces], "layout": merge({**template["layout"], "template": self.layout_template()}, layout)},
+            _validate=False,
+        )
+
+    def clear(self) -> None:
+        '''
+        Removes every template, e.g. after the default plotly template was changed.
+        '''
+        with self._lock:
+            self._templates.clear()
+            self._layout_template = None
+
+
+# Templates shared by the Visuals instances
+figure_templates = FigureTemplates()
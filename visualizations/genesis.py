@@ -0,0 +1,486 @@
+'''
+This section contributes towards the low level handling of the raw .csv exports of the GENESIS-Online Database. The helpers resolve file encodings from a bounded sample of the file and persist the outcome next to the source file, and locate the data block of a table so only that byte range is handed to the C or pyarrow parser of pandas.
+'''
+import io
+import json
+import os
+import re
+from typing import NamedTuple
+
+import chardet
+import pandas as pd
+
+from .instrumentation import instrumentation
+
+SAMPLE_SIZE = 16 * 1024
+MIN_CONFIDENCE = 0.7
+SCAN_BLOCK_SIZE = 256 * 1024
+BOUNDARY_BLOCK_SIZE = 8 * 1024
+MAX_BOUNDARY_BLOCK_SIZE = 1024 * 1024
+
+GENESIS_PREAMBLE = b"GENESIS-Tabelle:"
+FOOTER_SEPARATOR = re.compile(rb"^_{3,}\s*$")
+
+_resolved_encodings: dict[tuple, str] = {}
+
+
+def file_signature(path_to_file: str) -> tuple[str, int, int]:
+    '''
+    Provides the identity of a file on disk as its absolute path, size and modification time.
+
+    Inputs:
+    - path_to_file: relative or absolute file path
+
+    Output:
+    - tuple of (absolute path, size in bytes, mtime in nanoseconds)
+    '''
+    stat = os.stat(path_to_file)
+    return os.path.abspath(path_to_file), stat.st_size, stat.st_mtime_ns
+
+
+def sidecar_path(path_to_file: str, suffix: str) -> str:
+    '''
+    Provides the location of the hidden sidecar file stored next to the source file, e.g. data/.public_assistance.csv.encoding.json
+    '''
+    directory, name = os.path.split(path_to_file)
+    return os.path.join(directory, f".{name}.{suffix}.json")
+
+
+def read_sample(path_to_file: str, sample_size=SAMPLE_SIZE) -> bytes:
+    '''
+    Reads a bounded sample of the file: the block at the start of the file holding the GENESIS header lines and the block at the end holding the footer notes. Partial lines at the block boundaries are dropped so multi-byte characters are not cut in half.
+
+    Inputs:
+    - path_to_file: relative or absolute file path
+    - sample_size: number of bytes taken from the start and from the end of the file
+
+    Output:
+    - bytes sample of at most 2 * sample_size bytes
+    '''
+    with open(path_to_file, "rb") as data_file:
+        head = data_file.read(sample_size)
+        size = data_file.seek(0, os.SEEK_END)
+
+        if size <= 2 * sample_size:
+            data_file.seek(0)
+            return data_file.read()
+
+        data_file.seek(size - sample_size)
+        tail = data_file.read()
+
+    head = head[:head.rfind(b"\n") + 1] or head
+    tail = tail[tail.find(b"\n") + 1:]
+
+    return head + tail
+
+
+def read_head(path_to_file: str, encoding: str, n_chars=500) -> str:
+    '''
+    Returns the first n_chars characters of the file without reading the remainder of it.
+    '''
+    with open(path_to_file, "r", encoding=encoding, errors="replace") as data_file:
+        return data_file.read(n_chars)
+
+
+def full_scan_encoding(path_to_file: str) -> dict:
+    '''
+    Fallback detection feeding the complete file to chardet block by block. The scan stops as soon as the detector has reached a decision.
+
+    Output:
+    - chardet result dictionary with the keys encoding and confidence
+    '''
+    detector = chardet.UniversalDetector()
+
+    with open(path_to_file, "rb") as data_file:
+        for block in iter(lambda: data_file.read(SCAN_BLOCK_SIZE), b""):
+            detector.feed(block)
+            if detector.done:
+                break
+
+    return detector.close()
+
+
+def load_sidecar(path_to_file: str, suffix: str, signature: tuple) -> dict | None:
+    '''
+    Loads the values stored in the sidecar file when it was written for the same size and mtime of the source file.
+
+    Inputs:
+    - path_to_file: source file path
+    - suffix: name of the sidecar, e.g. "encoding"
+    - signature: current file_signature of the source file
+
+    Output:
+    - dictionary of stored values or None when missing or stale
+    '''
+    try:
+        with open(sidecar_path(path_to_file, suffix)) as sidecar:
+            stored = json.load(sidecar)
+    except (OSError, ValueError):
+        return None
+
+    if [stored.get("size"), stored.get("mtime_ns")] != list(signature[1:]):
+        return None
+
+    return stored
+
+
+def store_sidecar(path_to_file: str, suffix: str, signature: tuple, values: dict) -> None:
+    '''
+    Persists values in the sidecar file together with the size and mtime of the source file.
+    '''
+    try:
+        with open(sidecar_path(path_to_file, suffix), "w") as sidecar:
+            json.dump({"size": signature[1], "mtime_ns": signature[2], **values}, sidecar)
+    except OSError:
+        # Read-only data directories still work, the result is then only kept in memory
+        pass
+
+
+def resolve_encoding(path_to_file: str, sample_size=SAMPLE_SIZE, min_confidence=MIN_CONFIDENCE) -> str | None:
+    '''
+    Resolves the encoding of the file. Previously resolved encodings are served from memory or from the sidecar file when the path, size and mtime of the file are unchanged. Otherwise chardet inspects the bounded header/footer sample and only falls back to a full scan when the sample result is below min_confidence or plain ASCII.
+
+    Inputs:
+    - path_to_file: relative or absolute file path
+    - sample_size: number of bytes inspected at the start and end of the file
+    - min_confidence: chardet confidence required to accept the sample result
+
+    Output:
+    - Encoding name or None when it could not be identified
+    '''
+    signature = file_signature(path_to_file)
+
+    if signature in _resolved_encodings:
+        return _resolved_encodings[signature]
+
+    stored = load_sidecar(path_to_file, "encoding", signature)
+    encoding = stored.get("encoding") if stored else None
+
+    if encoding is None:
+        result = chardet.detect(read_sample(path_to_file, sample_size))
+
+        # An ASCII sample only shows that the header and footer hold no umlauts, e.g. a Kreis-level table with Länder names in the middle of the file
+        if not result["encoding"] or result["confidence"] < min_confidence or result["encoding"] == "ascii":
+            result = full_scan_encoding(path_to_file)
+
+        encoding = result["encoding"]
+        if encoding:
+            store_sidecar(path_to_file, "encoding", signature, {"encoding": encoding, "confidence": result["confidence"]})
+
+    if encoding:
+        _resolved_encodings[signature] = encoding
+
+    return encoding
+
+
+class ByteRange(io.RawIOBase):
+    '''
+    Read-only raw stream exposing the bytes [start, end) of a file, allowing pandas to parse the data block of a GENESIS table without the preamble and footer notes.
+    '''
+
+    def __init__(self, path_to_file: str, start: int, end: int) -> None:
+        '''
+        Inputs:
+        - path_to_file: relative or absolute file path
+        - start: byte offset of the first byte exposed
+        - end: byte offset after the last byte exposed
+        '''
+        super().__init__()
+        self._file = open(path_to_file, "rb")
+        self._file.seek(start)
+        self._remaining = max(end - start, 0)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size == 0:
+            return 0
+
+        count = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= count
+        instrumentation.count_bytes(count)
+        return count
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def line_offset(data_file, n_lines: int) -> int:
+    '''
+    Provides the byte offset at which line n_lines (0 based) starts, reading the head of the file in small blocks until enough line breaks were seen.
+
+    Inputs:
+    - data_file: file object opened in binary mode
+    - n_lines: number of lines to skip
+    '''
+    data_file.seek(0)
+    offset = 0
+
+    while n_lines > 0:
+        block = data_file.read(BOUNDARY_BLOCK_SIZE)
+        if not block:
+            break
+
+        position = -1
+        while n_lines > 0:
+            position = block.find(b"\n", position + 1)
+            if position == -1:
+                break
+            n_lines -= 1
+
+        if n_lines == 0:
+            return offset + position + 1
+        offset += len(block)
+
+    return offset
+
+
+def footer_offset(data_file, n_rows: int, quotechar=b'"') -> int:
+    '''
+    Provides the byte offset at which the last n_rows rows of the file start. Rows are counted the way the skipfooter argument of pandas counts them: blank lines are ignored and a quoted note spanning several lines is a single row. Only growing blocks at the end of the file are read.
+
+    Inputs:
+    - data_file: file object opened in binary mode
+    - n_rows: number of footer rows
+    - quotechar: quote character of the file
+    '''
+    size = data_file.seek(0, os.SEEK_END)
+    if n_rows <= 0:
+        return size
+
+    block_size = BOUNDARY_BLOCK_SIZE
+    while True:
+        start = max(size - block_size, 0)
+        data_file.seek(start)
+        block = data_file.read(size - start)
+
+        # Drop the first partial line unless the block starts at the beginning of the file
+        first = 0 if start == 0 else block.find(b"\n") + 1
+        if start == 0 or first > 0:
+            starts = [first]
+            position = block.find(b"\n", first)
+            while position != -1 and position + 1 < len(block):
+                starts.append(position + 1)
+                position = block.find(b"\n", position + 1)
+
+            in_quotes = False
+            rows = 0
+            for line_start, line_end in zip(reversed(starts), reversed([*starts[1:], len(block)])):
+                line = block[line_start:line_end]
+                if line.count(quotechar) % 2:
+                    in_quotes = not in_quotes
+                if in_quotes or not line.strip():
+                    continue
+
+                rows += 1
+                if rows == n_rows:
+                    return start + line_start
+
+            if start == 0:
+                return 0
+
+        block_size *= 2
+
+
+class GenesisBoundaries(NamedTuple):
+    '''
+    Location of the data block inside a GENESIS table export.
+
+    - table: GENESIS table code, e.g. 22111-0022
+    - header_start: line index of the first column header line
+    - data_start: line index of the first data row
+    - line_offsets: byte offsets of the lines 0 ... data_start
+    - data_end: byte offset at which the footer notes start, or the file size when there are none
+    '''
+    table: str
+    header_start: int
+    data_start: int
+    line_offsets: tuple[int, ...]
+    data_end: int
+
+    def skiprows(self, header_depth=1) -> int:
+        '''
+        Number of lines to skip so that the header row lies header_depth lines above the first data row.
+        '''
+        return self.data_start - header_depth
+
+    def start_offset(self, header_depth=1) -> int:
+        '''
+        Byte offset of the header row lying header_depth lines above the first data row.
+        '''
+        return self.line_offsets[self.skiprows(header_depth)]
+
+
+def _first_field(line: bytes, delimiter: bytes) -> bytes:
+    return line.split(delimiter, 1)[0].strip()
+
+
+def detect_boundaries(path_to_file: str, delimiter: str) -> GenesisBoundaries:
+    '''
+    Detects the preamble, column header lines and footer notes of a GENESIS table. Only a small block at the start of the file and a small block at the end of the file are read, independent of the file size.
+
+    The preamble starts with "GENESIS-Tabelle: <code>" followed by title lines. Column header lines start with the delimiter (empty row label) and the data block starts with the first labelled line after them. The footer starts at the "__________" separator line, or after the last line containing the delimiter.
+
+    Inputs:
+    - path_to_file: relative or absolute file path
+    - delimiter: column separator
+
+    Output:
+    - GenesisBoundaries of the table
+    '''
+    separator = delimiter.encode("ascii")
+
+    with open(path_to_file, "rb") as data_file:
+        block_size = BOUNDARY_BLOCK_SIZE
+        while True:
+            data_file.seek(0)
+            head = data_file.read(block_size)
+            lines = head.split(b"\n")
+            complete = len(head) < block_size
+
+            if not lines[0].startswith(GENESIS_PREAMBLE):
+                raise ValueError(f"{path_to_file} does not start with a GENESIS-Tabelle preamble")
+
+            header_start = data_start = None
+            # The final line of the block may be cut off unless the whole file was read
+            for index, line in enumerate(lines if complete else lines[:-1]):
+                if index == 0 or not line.strip():
+                    continue
+                labelled = bool(_first_field(line, separator))
+                if header_start is None and not labelled:
+                    header_start = index
+                elif header_start is not None and labelled:
+                    data_start = index
+                    break
+
+            if data_start is not None:
+                break
+            if complete or block_size >= MAX_BOUNDARY_BLOCK_SIZE:
+                raise ValueError(f"No data block was found in {path_to_file}")
+            block_size *= 2
+
+        offsets = [0]
+        for line in lines[:data_start]:
+            offsets.append(offsets[-1] + len(line) + 1)
+
+        data_end = _detect_footer(data_file, separator)
+
+    table = lines[0][len(GENESIS_PREAMBLE):].split(separator, 1)[0].strip().decode("ascii", errors="replace")
+
+    return GenesisBoundaries(table, header_start, data_start, tuple(offsets), max(data_end, offsets[-1]))
+
+
+def _detect_footer(data_file, separator: bytes) -> int:
+    size = data_file.seek(0, os.SEEK_END)
+    block_size = BOUNDARY_BLOCK_SIZE
+
+    while True:
+        start = max(size - block_size, 0)
+        data_file.seek(start)
+        block = data_file.read(size - start)
+
+        lines = block.split(b"\n")
+        offsets = [start]
+        for line in lines[:-1]:
+            offsets.append(offsets[-1] + len(line) + 1)
+
+        # Lines are inspected from the end, the first one in the block may be incomplete
+        candidates = list(zip(offsets, lines))
+        if start > 0:
+            candidates = candidates[1:]
+
+        last_data_line = None
+        for offset, line in reversed(candidates):
+            if FOOTER_SEPARATOR.match(line):
+                return offset
+            if last_data_line is None and separator in line and line.count(b'"') % 2 == 0:
+                last_data_line = offset + len(line) + 1
+
+        # The last line is a data row, the table carries no footer notes
+        trailing = [line for _, line in candidates if line.strip()]
+        if trailing and separator in trailing[-1]:
+            return size
+
+        if start == 0 or block_size >= MAX_BOUNDARY_BLOCK_SIZE:
+            return min(last_data_line, size) if last_data_line is not None else size
+        block_size *= 2
+
+
+def read_genesis_table(path_to_file: str, encoding: str, delimiter: str, skiprows=None, skipfooter=None, header_depth=1, engine="c", chunksize=None, **kwargs):
+    '''
+    Reads the data block of a GENESIS table with the C or pyarrow engine of pandas. The preamble and footer boundaries are translated into byte offsets so that skipfooter, which is only supported by the slow python engine, is not needed.
+
+    Inputs:
+    - path_to_file: relative or absolute file path
+    - encoding: file encoding
+    - delimiter: column separator
+    - skiprows: number of lines before the header row, detected from the GENESIS header lines when None
+    - skipfooter: number of footer rows after the data block, detected from the GENESIS footer notes when None
+    - header_depth: number of lines the header row lies above the first data row, used when skiprows is detected
+    - engine: "c" or "pyarrow"
+    - chunksize: when provided, a GenesisChunks iterator over DataFrame chunks of chunksize rows is returned
+    - kwargs: further arguments passed on to pd.read_csv
+
+    Output:
+    - pd.DataFrame, or an iterator of pd.DataFrame chunks
+    '''
+    boundaries = None
+    if skiprows is None or skipfooter is None:
+        boundaries = detect_boundaries(path_to_file, delimiter)
+
+    with open(path_to_file, "rb") as data_file:
+        start = boundaries.start_offset(header_depth) if skiprows is None else line_offset(data_file, skiprows)
+        end = boundaries.data_end if skipfooter is None else footer_offset(data_file, skipfooter)
+        end = max(end, start)
+    if chunksize is not None and engine == "pyarrow":
+        # The pyarrow engine does not support chunked reading
+        engine = "c"
+
+    handle = io.BufferedReader(ByteRange(path_to_file, start, end))
+
+    if chunksize is not None:
+        return GenesisChunks(handle, pd.read_csv(handle, encoding=encoding, delimiter=delimiter, engine=engine, chunksize=chunksize, **kwargs))
+
+    with handle:
+        return pd.read_csv(handle, encoding=encoding, delimiter=delimiter, engine=engine, **kwargs)
+
+
+class GenesisChunks:
+    '''
+    Iterator over the DataFrame chunks of a GENESIS table. The number of rows of the following chunks can be changed while iterating, e.g. once the memory taken by a row is known from the first chunk. The file is closed when the iteration is exhausted.
+    '''
+
+    def __init__(self, handle, reader) -> None:
+        self._handle = handle
+        self._reader = reader
+
+    @property
+    def chunksize(self) -> int:
+        return self._reader.chunksize
+
+    @chunksize.setter
+    def chunksize(self, rows: int) -> None:
+        self._reader.chunksize = max(int(rows), 1)
+
+    def __iter__(self) -> "GenesisChunks":
+        return self
+
+    def __next__(self) -> pd.DataFrame:
+        try:
+            return next(self._reader)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        self._reader.close()
+        self._handle.close()
+
+    def __enter__(self) -> "GenesisChunks":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
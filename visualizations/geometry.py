@@ -0,0 +1,324 @@
+'''
+This section contributes towards the boundary geometries of the choropleth figures. A GeoJSON file is parsed once and kept in memory, keyed by its path, size and mtime, together with simplified variants at several resolution levels. The rings are split into arcs at the points where neighbouring regions meet and every arc is simplified once, so a border shared by two Länder stays identical in both and the simplified map has neither gaps nor overlaps. Each render picks the coarsest level whose error stays below the size of a pixel.
+'''
+import json
+import math
+import threading
+
+import numpy as np
+
+from .genesis import file_signature
+
+# Decimal places the coordinates are quantised to, about 0.1 metres
+QUANTISE_DIGITS = 6
+# Douglas-Peucker tolerances of the resolution levels in degrees, from the finest to the coarsest
+RESOLUTION_LEVELS = {"full": 0.0, "high": 0.0005, "medium": 0.002, "low": 0.008}
+# Largest simplification error accepted by the auto level, as a fraction of the degrees covered by a pixel
+PIXEL_FRACTION = 0.5
+
+
+def polygons(geometry: dict) -> list:
+    '''
+    Provides the polygons of a Polygon or MultiPolygon geometry as lists of rings, other geometry types have none.
+    '''
+    if geometry is None:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def quantise(ring: list, digits=QUANTISE_DIGITS) -> list[tuple]:
+    '''
+    Rounds the coordinates of a closed ring and drops the repeated points the rounding produces.
+
+    Output:
+    - closed list of (x, y) tuples
+    '''
+    points = []
+    for coordinate in ring:
+        point = (round(coordinate[0], digits), round(coordinate[1], digits))
+        if not points or points[-1] != point:
+            points.append(point)
+    if points and points[0] != points[-1]:
+        points.append(points[0])
+    return points
+
+
+def find_junctions(rings: list[list[tuple]]) -> set:
+    '''
+    Provides the points at which the boundary of a ring stops following the boundary of another ring. A point on a shared border has the same two neighbours in both rings, a point with more than two distinct neighbours is the end of a shared border.
+    '''
+    neighbours: dict[tuple, set] = {}
+    for ring in rings:
+        open_ring = ring[:-1]
+        for position, point in enumerate(open_ring):
+            adjacent = neighbours.setdefault(point, set())
+            adjacent.add(open_ring[position - 1])
+            adjacent.add(open_ring[(position + 1) % len(open_ring)])
+
+    return {point for point, adjacent in neighbours.items() if len(adjacent) > 2}
+
+
+def douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    '''
+    Selects the points of a line that keep it within the tolerance, the first and last point are always kept.
+
+    Inputs:
+    - points: array of shape (n, 2)
+    - tolerance: largest distance of a dropped point from the simplified line
+
+    Output:
+    - boolean mask of the kept points
+    '''
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        start, end = points[first], points[last]
+        inner = points[first + 1:last] - start
+        segment = end - start
+        length = math.hypot(*segment)
+        if length == 0:
+            # A closed arc starts and ends at the same point, the distance is measured from that point
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.extend(((first, split), (split, last)))
+
+    return keep
+
+
+def simplify_arc(arc: list[tuple], tolerance: float, arcs: dict) -> list[tuple]:
+    '''
+    Simplifies an arc, the result is stored under the orientation-independent form of the arc so the neighbour tracing it backwards receives the same points.
+    '''
+    forward = tuple(arc)
+    backward = forward[::-1]
+    canonical = min(forward, backward)
+    if canonical not in arcs:
+        keep = douglas_peucker(np.array(canonical), tolerance)
+        arcs[canonical] = [point for point, kept in zip(canonical, keep) if kept]
+
+    simplified = arcs[canonical]
+    return simplified if forward == canonical else simplified[::-1]
+
+
+def simplify_ring(ring: list[tuple], junctions: set, tolerance: float, arcs: dict) -> list[tuple]:
+    '''
+    Simplifies a closed ring arc by arc between its junctions. A ring without junctions, e.g. an island or an enclave such as Berlin that is traced by both neighbours, is a single arc starting at its smallest point.
+
+    Output:
+    - closed list of points, the quantised ring itself when the simplification collapses it
+    '''
+    open_ring = ring[:-1]
+    cuts = [position for position, point in enumerate(open_ring) if point in junctions]
+    if not cuts:
+        cuts = [min(range(len(open_ring)), key=open_ring.__getitem__)]
+
+    rotated = open_ring[cuts[0]:] + open_ring[:cuts[0]] + [open_ring[cuts[0]]]
+    offsets = [cut - cuts[0] for cut in cuts] + [len(open_ring)]
+
+    simplified = []
+    for first, last in zip(offsets, offsets[1:]):
+        simplified.extend(simplify_arc(rotated[first:last + 1], tolerance, arcs)[:-1])
+    simplified.append(simplified[0])
+
+    return simplified if len(simplified) >= 4 else ring
+
+
+def level_digits(tolerance: float) -> int:
+    '''
+    Provides the decimal places kept at a tolerance, one digit finer than the tolerance itself.
+    '''
+    if tolerance <= 0:
+        return QUANTISE_DIGITS
+    return min(QUANTISE_DIGITS, max(2, math.ceil(-math.log10(tolerance)) + 1))
+
+
+def simplify_collection(collection: dict, rings: dict, junctions: set, tolerance: float) -> dict:
+    '''
+    Produces the FeatureCollection of a resolution level.
+
+    Inputs:
+    - collection: parsed GeoJSON FeatureCollection
+    - rings: quantised rings keyed by (feature, polygon, ring) position
+    - junctions: points returned by find_junctions
+    - tolerance: Douglas-Peucker tolerance in degrees, 0 keeps every quantised point
+
+    Output:
+    - FeatureCollection with the properties of the input and the simplified coordinates
+    '''
+    digits = level_digits(tolerance)
+    arcs: dict = {}
+    features = []
+    for feature_position, feature in enumerate(collection["features"]):
+        geometry = feature.get("geometry")
+        shapes = polygons(geometry)
+        if not shapes:
+            features.append(feature)
+            continue
+
+        coordinates = []
+        for polygon_position, polygon in enumerate(shapes):
+            simplified_polygon = []
+            for ring_position in range(len(polygon)):
+                ring = rings[feature_position, polygon_position, ring_position]
+                if tolerance > 0 and len(ring) >= 4:
+                    ring = simplify_ring(ring, junctions, tolerance, arcs)
+                simplified_polygon.append([list(point) for point in quantise(ring, digits)])
+            coordinates.append(simplified_polygon)
+
+        if geometry["type"] == "Polygon":
+            coordinates = coordinates[0]
+        features.append({**feature, "geometry": {"type": geometry["type"], "coordinates": coordinates}})
+
+    return {**collection, "features": features}
+
+
+def feature_id(feature: dict, featureidkey: str):
+    '''
+    Provides the value at a dotted key of a feature, e.g. "properties.name" as used by plotly.
+    '''
+    value = feature
+    for key in featureidkey.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def feature_bounds(feature: dict) -> tuple | None:
+    '''
+    Provides the (min x, min y, max x, max y) bounds of a feature, None without polygons.
+    '''
+    points = [point for polygon in polygons(feature.get("geometry")) for ring in polygon for point in ring]
+    if not points:
+        return None
+    xs, ys = [point[0] for point in points], [point[1] for point in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class GeometryEntry:
+    '''
+    The parsed GeoJSON file of one file signature together with its resolution levels and the bounds of its features.
+    '''
+
+    def __init__(self, collection: dict, levels=RESOLUTION_LEVELS) -> None:
+        '''
+        Inputs:
+        - collection: parsed GeoJSON FeatureCollection
+        - levels: dictionary of level name to tolerance in degrees
+        '''
+        rings = {
+            (feature_position, polygon_position, ring_position): quantise(ring)
+            for feature_position, feature in enumerate(collection["features"])
+            for polygon_position, polygon in enumerate(polygons(feature.get("geometry")))
+            for ring_position, ring in enumerate(polygon)
+        }
+        junctions = find_junctions([ring for ring in rings.values() if len(ring) >= 4])
+
+        self.tolerances = dict(levels)
+        self.levels = {name: simplify_collection(collection, rings, junctions, tolerance) for name, tolerance in self.tolerances.items()}
+        self.bounds = [feature_bounds(feature) for feature in collection["features"]]
+
+    def level_for(self, positions: list[int], height: int) -> str:
+        '''
+        Provides the coarsest level whose tolerance stays below PIXEL_FRACTION of the degrees covered by a pixel of a map fitted to the features at the positions.
+        '''
+        bounds = [self.bounds[position] for position in positions if self.bounds[position] is not None]
+        if not bounds:
+            return min(self.tolerances, key=self.tolerances.get)
+
+        span = max(max(bound[2] for bound in bounds) - min(bound[0] for bound in bounds), max(bound[3] for bound in bounds) - min(bound[1] for bound in bounds))
+        accepted = {name: tolerance for name, tolerance in self.tolerances.items() if tolerance <= PIXEL_FRACTION * span / height}
+        if not accepted:
+            return min(self.tolerances, key=self.tolerances.get)
+        return max(accepted, key=accepted.get)
+
+
+class GeometryStore:
+    '''
+    In-memory store of the GeoJSON files used by the choropleth figures. A file is parsed and simplified on its first use and again only when its size or mtime changes.
+    '''
+
+    def __init__(self, levels=RESOLUTION_LEVELS) -> None:
+        '''
+        Inputs:
+        - levels: dictionary of level name to Douglas-Peucker tolerance in degrees
+        '''
+        self.levels = dict(levels)
+        self.loads = 0
+        self._entries: dict[str, tuple[tuple, GeometryEntry]] = {}
+        self._lock = threading.Lock()
+
+    def entry(self, path: str) -> GeometryEntry:
+        '''
+        Provides the parsed and simplified geometries of the current version of a file.
+        '''
+        signature = file_signature(path)
+        with self._lock:
+            stored = self._entries.get(signature[0])
+            if stored is not None and stored[0] == signature:
+                return stored[1]
+
+            with open(path) as dimension:
+                entry = GeometryEntry(json.load(dimension), self.levels)
+            self._entries[signature[0]] = (signature, entry)
+            self.loads += 1
+            return entry
+
+    def collection(self, path: str, resolution="auto", ids=None, featureidkey="properties.name", height=350) -> dict:
+        '''
+        Provides the FeatureCollection of a file at a resolution level.
+
+        Inputs:
+        - path: GeoJSON file
+        - resolution: name of a level, or "auto" for the coarsest level that is exact to the pixel for a map of the given height fitted to the selected features
+        - ids: feature ids to keep, all features when None
+        - featureidkey: dotted key of the feature ids, as passed to plotly
+        - height: height of the map in pixels
+
+        Output:
+        - FeatureCollection dictionary, shared between the calls and not to be modified
+        '''
+        entry = self.entry(path)
+        features = entry.levels[min(entry.tolerances, key=entry.tolerances.get)]["features"]
+        if ids is None:
+            positions = list(range(len(features)))
+        else:
+            wanted = set(ids)
+            positions = [position for position, feature in enumerate(features) if feature_id(feature, featureidkey) in wanted]
+
+        if resolution == "auto":
+            resolution = entry.level_for(positions, height)
+        level = entry.levels[resolution]
+        if ids is None:
+            return level
+        return {**level, "features": [level["features"][position] for position in positions]}
+
+    def report(self, path: str) -> dict[str, dict]:
+        '''
+        Provides the number of points and the serialised size in bytes of each resolution level of a file.
+        '''
+        entry = self.entry(path)
+        return {
+            name: {
+                "points": sum(len(ring) for feature in level["features"] for polygon in polygons(feature.get("geometry")) for ring in polygon),
+                "bytes": len(json.dumps(level, separators=(",", ":"))),
+            }
+            for name, level in entry.levels.items()
+        }
+
+
+# Store shared by the Visuals instances
+geometry_store = GeometryStore()
@@ -0,0 +1,194 @@
+'''
+This section contributes towards the instrumentation of the Dataset processing methods and the Visuals figure builders. Each instrumented call records its wall time, the rows of its input and output frames, the bytes read from the source file and, while memory tracing is enabled, its peak allocation. The records are kept in a bounded log exposed as a machine-readable report, e.g. for the diagnostics panel of the dashboard.
+'''
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+RECORD_LIMIT = 2000
+
+
+def frame_rows(value) -> int | None:
+    '''
+    Provides the number of rows of a DataFrame or Series, or of the first one inside a tuple result, None for anything else.
+    '''
+    if isinstance(value, tuple):
+        value = next((item for item in value if isinstance(item, (pd.DataFrame, pd.Series))), None)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+class Instrumentation:
+    '''
+    Log of the instrumented calls. Stages may be nested (e.g. file_processing inside run_pipeline), bytes read and peak allocations are attributed to every open stage of the thread. Memory tracing uses tracemalloc, it slows allocations down and is therefore off unless enabled, e.g. by setting VISUALIZATIONS_TRACE_MEMORY=1. The traced peak is process wide and only approximate while pipelines run concurrently.
+    '''
+
+    def __init__(self, maxlen=RECORD_LIMIT) -> None:
+        '''
+        Inputs:
+        - maxlen: number of records kept, the oldest records are dropped beyond it
+        '''
+        self.records: deque = deque(maxlen=maxlen)
+        self.enabled = True
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        if os.environ.get("VISUALIZATIONS_TRACE_MEMORY") == "1":
+            self.trace_memory(True)
+
+    def _open_stages(self) -> list[dict]:
+        if not hasattr(self._local, "stages"):
+            self._local.stages = []
+        return self._local.stages
+
+    def trace_memory(self, enabled=True) -> None:
+        '''
+        Starts or stops the tracing of the peak allocation of the stages.
+        '''
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, stage: str, owner=None, source=None, rows_in=None):
+        '''
+        Records the enclosed block as a stage. The yielded record accepts further values, e.g. record["rows_out"] = len(df).
+
+        Inputs:
+        - stage: name of the stage, e.g. "dtype_conversion"
+        - owner: name of the object running the stage, e.g. "PublicAssistance"
+        - source: file the stage works on
+        - rows_in: rows of the input frame
+        '''
+        if not self.enabled:
+            yield {}
+            return
+
+        stages = self._open_stages()
+        tracing = tracemalloc.is_tracing()
+        record = {
+            "stage": stage, "owner": owner, "source": source, "thread": threading.current_thread().name,
+            "started": time.time(), "seconds": None, "rows_in": rows_in, "rows_out": None, "bytes_read": 0, "peak_bytes": None,
+        }
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            for outer in stages:
+                outer["_high"] = max(outer.get("_high", 0), peak)
+            tracemalloc.reset_peak()
+            record["_start_memory"], record["_high"] = current, current
+
+        stages.append(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - started
+            stages.pop()
+
+            start_memory, high = record.pop("_start_memory", None), record.pop("_high", None)
+            if tracing and tracemalloc.is_tracing():
+                high = max(high, tracemalloc.get_traced_memory()[1])
+                record["peak_bytes"] = high - start_memory
+                if stages:
+                    stages[-1]["_high"] = max(stages[-1].get("_high", 0), high)
+
+            with self._lock:
+                self.records.append(record)
+
+    def count_bytes(self, count: int) -> None:
+        '''
+        Adds bytes read from a source file to every open stage of the thread.
+        '''
+        for record in getattr(self._local, "stages", ()):
+            record["bytes_read"] += count
+
+    def report(self) -> list[dict]:
+        '''
+        Provides a copy of the recorded stages, oldest first.
+        '''
+        with self._lock:
+            return [dict(record) for record in self.records]
+
+    def summary(self) -> list[dict]:
+        '''
+        Provides the calls, total and maximum wall time, rows, bytes, peak allocation and throughput per owner and stage.
+        '''
+        totals: dict[tuple, dict] = {}
+        for record in self.report():
+            key = (record["owner"], record["stage"])
+            total = totals.setdefault(key, {
+                "owner": record["owner"], "stage": record["stage"], "calls": 0, "seconds": 0.0, "max_seconds": 0.0,
+                "rows_in": 0, "rows_out": 0, "bytes_read": 0, "peak_bytes": None,
+            })
+            total["calls"] += 1
+            total["seconds"] += record["seconds"]
+            total["max_seconds"] = max(total["max_seconds"], record["seconds"])
+            total["rows_in"] += record["rows_in"] or 0
+            total["rows_out"] += record["rows_out"] or 0
+            total["bytes_read"] += record["bytes_read"]
+            if record["peak_bytes"] is not None:
+                total["peak_bytes"] = max(total["peak_bytes"] or 0, record["peak_bytes"])
+
+        for total in totals.values():
+            total["rows_per_second"] = total["rows_in"] / total["seconds"] if total["seconds"] else None
+            total["bytes_per_second"] = total["bytes_read"] / total["seconds"] if total["seconds"] else None
+
+        return sorted(totals.values(), key=lambda total: total["seconds"], reverse=True)
+
+    def to_json(self, path=None) -> str:
+        '''
+        Provides the summary and the recorded stages as a JSON document, written to path when provided.
+        '''
+        document = json.dumps({"summary": self.summary(), "records": self.report()}, indent=2, default=str)
+        if path is not None:
+            with open(path, "w") as report_file:
+                report_file.write(document)
+
+        return document
+
+    def clear(self) -> None:
+        '''
+        Removes every record.
+        '''
+        with self._lock:
+            self.records.clear()
+
+
+# Log shared by the Dataset and Visuals classes
+instrumentation = Instrumentation()
+
+
+def instrumented(func):
+    '''
+    A Decorator recording every call of the wrapping function (func) as a stage named after it. The rows of self.df (or of the first DataFrame argument for objects without a df) before the call are recorded as rows in, the rows of the returned frame (or of self.df) after it as rows out.
+
+    Inputs:
+    - func: The callback function to be used in the wrapper function
+    '''
+    @functools.wraps(func)
+    def wrapping_function(self, *args, **kwargs):
+        if not instrumentation.enabled:
+            return func(self, *args, **kwargs)
+
+        holds_df = "_df" in vars(self)
+        if holds_df:
+            rows_in = frame_rows(self.df)
+        else:
+            rows_in = next((frame_rows(value) for value in (*args, *kwargs.values()) if isinstance(value, (pd.DataFrame, pd.Series))), None)
+
+        with instrumentation.stage(func.__name__, type(self).__name__, getattr(self, "path_to_file", None), rows_in) as record:
+            result = func(self, *args, **kwargs)
+            rows_out = frame_rows(result)
+            record["rows_out"] = rows_out if rows_out is not None or not holds_df else frame_rows(self.df)
+
+        return result
+    return wrapping_function
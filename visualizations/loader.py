@@ -0,0 +1,136 @@
+'''
+This section contributes towards loading the datasets concurrently. Each dataset pipeline is independent file I/O and parsing, so the pipelines are submitted to a thread pool and exposed as futures: callers wait only on the dataset they need and the time spent on each pipeline is recorded.
+'''
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+class DatasetLoader:
+    '''
+    The DatasetLoader runs named pipeline functions, each returning a processed Dataset object, in a thread pool. Threads are used rather than processes as the parsers and the Parquet cache release the GIL for most of their work and the resulting frames do not need to be pickled back into the application process.
+    '''
+
+    def __init__(self, pipelines: dict[str, Callable], max_workers=None) -> None:
+        '''
+        Inputs:
+        - pipelines: dictionary of dataset name to a function without arguments producing the dataset
+        - max_workers: number of threads, one per pipeline when None
+        '''
+        self.pipelines = dict(pipelines)
+        self.max_workers = max_workers or len(self.pipelines)
+        self.timings: dict[str, dict] = {}
+        self.futures: dict[str, Future] = {}
+        self._generations: dict[str, int] = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _timed(self, name: str, pipeline: Callable):
+        started = time.perf_counter()
+        self.timings[name] = {"started": started, "seconds": None}
+        try:
+            return pipeline()
+        finally:
+            self.timings[name]["seconds"] = time.perf_counter() - started
+            logger.info("Dataset %s loaded in %.3fs", name, self.timings[name]["seconds"])
+
+    def submit(self, name: str) -> Future:
+        '''
+        Submits a single pipeline to the thread pool unless it was submitted before, so callers needing one dataset do not pay for the others.
+
+        Inputs:
+        - name: dataset name
+
+        Output:
+        - future of the dataset
+        '''
+        with self._lock:
+            if name not in self.futures:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dataset-loader")
+                self.futures[name] = self._executor.submit(self._timed, name, self.pipelines[name])
+
+            return self.futures[name]
+
+    def reload(self, name: str, accept: Callable = None) -> Future:
+        '''
+        Runs the pipeline of a dataset again, e.g. after its source file changed. The current dataset stays the result of the dataset until the new one is complete and then replaces it in a single step, so readers are never blocked by the reload. A failed reload leaves the current dataset in place.
+
+        Inputs:
+        - name: dataset name
+        - accept: function returning whether the new dataset may replace the current one, every completed dataset is accepted when None
+
+        Output:
+        - future of the reloaded dataset
+        '''
+        with self._lock:
+            if name not in self.futures:
+                generation = None
+            else:
+                generation = self._generations[name] = self._generations.get(name, 0) + 1
+                future = self._executor.submit(self._reload, name, generation, accept)
+
+        return self.submit(name) if generation is None else future
+
+    def _reload(self, name: str, generation: int, accept: Callable):
+        dataset = self._timed(name, self.pipelines[name])
+
+        if accept is None or accept(dataset):
+            swapped = Future()
+            swapped.set_result(dataset)
+            with self._lock:
+                # An earlier reload finishing after a later one must not replace its result
+                if self._generations[name] == generation:
+                    self.futures[name] = swapped
+
+        return dataset
+
+    def loaded(self) -> dict:
+        '''
+        Provides the datasets whose pipeline has completed successfully, by name.
+        '''
+        with self._lock:
+            futures = dict(self.futures)
+
+        return {name: future.result() for name, future in futures.items() if future.done() and not future.cancelled() and future.exception() is None}
+
+    def start(self) -> "DatasetLoader":
+        '''
+        Submits every pipeline that was not submitted yet to the thread pool.
+        '''
+        for name in self.pipelines:
+            self.submit(name)
+
+        return self
+
+    def future(self, name: str) -> Future:
+        '''
+        Provides the future of a dataset, submitting its pipeline when required.
+        '''
+        return self.submit(name)
+
+    def result(self, name: str, timeout=None):
+        '''
+        Waits for a single dataset and returns it. Exceptions raised by its pipeline are raised again here.
+
+        Inputs:
+        - name: dataset name
+        - timeout: seconds to wait, unlimited when None
+        '''
+        return self.future(name).result(timeout)
+
+    def wait_all(self, timeout=None) -> None:
+        '''
+        Waits until every pipeline has finished.
+        '''
+        self.start()
+        wait(self.futures.values(), timeout=timeout)
+
+    def report(self) -> dict[str, float | None]:
+        '''
+        Provides the wall time in seconds of each finished pipeline, None for pipelines still running.
+        '''
+        return {name: timing["seconds"] for name, timing in self.timings.items()}
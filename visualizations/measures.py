@@ -0,0 +1,146 @@
+'''
+This section contributes towards the conversion of the GENESIS measure columns into compact numeric types. The special markers of the GENESIS-Online Database are turned into missing values, counts are stored in the smallest nullable integer type that holds them and currency measures are stored as exact fixed-point integers.
+'''
+import logging
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# "-" nothing reported, "." unknown or confidential, "x" cell locked, "..." not yet available, "/" not meaningful
+GENESIS_MISSING_MARKERS = ("-", ".", "x", "...", "/")
+
+_UNSIGNED_TYPES = ("UInt8", "UInt16", "UInt32", "UInt64")
+_SIGNED_TYPES = ("Int8", "Int16", "Int32", "Int64")
+
+
+def downcast_counts(values: pd.Series) -> pd.Series:
+    '''
+    Downcasts an integral series to the smallest nullable integer type holding its value range, unsigned when no value is negative. Series with fractional values are returned as nullable floats.
+
+    Inputs:
+    - values: numeric series
+
+    Output:
+    - series with a nullable UInt/Int/Float dtype
+    '''
+    present = values.dropna()
+
+    if pd.api.types.is_float_dtype(values):
+        if not (present % 1 == 0).all():
+            return values.astype("Float64")
+        values = values.astype("Int64")
+
+    if present.empty:
+        return values.astype("UInt8")
+
+    low, high = present.min(), present.max()
+    for dtype in (_UNSIGNED_TYPES if low >= 0 else _SIGNED_TYPES):
+        limits = np.iinfo(dtype.lower())
+        if limits.min <= low and high <= limits.max:
+            return values.astype(dtype)
+
+    return values
+
+
+def warn_invalid(series: pd.Series, invalid: pd.Series, expected: str) -> None:
+    '''
+    Logs the cells of a measure column that are neither numbers nor GENESIS markers, e.g. a stray flag like "1.234p", which the converters treat as missing.
+    '''
+    if invalid.any():
+        logger.warning("%s: %d cells are not %s and are treated as missing, e.g. %r", series.name, invalid.sum(), expected, series[invalid].iloc[0])
+
+
+def to_counts(series: pd.Series, markers=GENESIS_MISSING_MARKERS) -> pd.Series:
+    '''
+    Converts a measure column into a nullable numeric column. GENESIS markers become missing values in the same vectorised pass that parses the numbers, and integral columns are downcast (e.g. to UInt32). Other cells that are no numbers become missing values with a warning.
+
+    Inputs:
+    - series: raw measure column
+    - markers: cell values standing for missing, suppressed or locked values
+
+    Output:
+    - converted series with the same index
+    '''
+    if not pd.api.types.is_numeric_dtype(series):
+        series = series.mask(series.isin(markers))
+
+    numbers = pd.to_numeric(series, errors="coerce", dtype_backend="numpy_nullable")
+    warn_invalid(series, series.notna() & numbers.isna(), "numbers")
+    return downcast_counts(numbers)
+
+
+class FixedPoint(NamedTuple):
+    '''
+    Declaration of a fixed-point currency measure: values are stored as int64 in units of 10 ** -decimals of the declared unit, e.g. FixedPoint("TEUR", 3) stores whole euros.
+    '''
+    unit: str
+    decimals: int
+
+    @property
+    def scale(self) -> int:
+        return 10 ** self.decimals
+
+
+# GENESIS publishes the public assistance measures in whole thousand euros
+TEUR = FixedPoint("TEUR", 0)
+
+
+def to_fixed_point(series: pd.Series, fixed_point: FixedPoint, markers=GENESIS_MISSING_MARKERS) -> pd.Series:
+    '''
+    Converts a currency column into scaled int64 values without a floating point round trip: the integer and fraction digits of the text are parsed separately, so "1234,5" with two declared decimals becomes exactly 123450. Numeric input is scaled and rounded. Like in to_counts, cells that are no decimal numbers or carry more than the declared decimals become missing values with a warning.
+
+    Inputs:
+    - series: raw currency column
+    - fixed_point: declared unit and number of decimals
+    - markers: cell values standing for missing, suppressed or locked values
+
+    Output:
+    - nullable Int64 series of scaled values
+    '''
+    if pd.api.types.is_numeric_dtype(series):
+        return (series.astype("Float64") * fixed_point.scale).round().astype("Int64")
+
+    text = series.astype("string").str.strip()
+    text = text.mask(text.isin(markers)).str.replace(",", ".", regex=False)
+
+    parts = text.str.extract(r"^(?P<sign>[-+]?)(?P<whole>\d*)(?:\.(?P<fraction>\d*))?$")
+    fraction = parts["fraction"].fillna("")
+    invalid = text.notna() & (parts["whole"].isna() | (parts["whole"].fillna("") + fraction == "") | (fraction.str.len() > fixed_point.decimals))
+    warn_invalid(text, invalid, f"decimal numbers with at most {fixed_point.decimals} decimals")
+    parts, fraction = parts.mask(invalid), fraction.mask(invalid, "")
+
+    whole = pd.to_numeric(parts["whole"].replace("", "0"), dtype_backend="numpy_nullable").astype("Int64")
+    fraction = fraction.str.ljust(fixed_point.decimals, "0").replace("", "0")
+    scaled = whole * fixed_point.scale + pd.to_numeric(fraction, dtype_backend="numpy_nullable").astype("Int64")
+
+    return scaled.where(parts["sign"] != "-", -scaled).astype("Int64")
+
+
+def fixed_point_columns(df: pd.DataFrame) -> dict[str, FixedPoint]:
+    '''
+    Provides the fixed-point declarations stored in the attrs of the dataframe, restricted to its columns.
+    '''
+    declared = df.attrs.get("fixed_point", {})
+    return {col: FixedPoint(**declared[col]) for col in df.columns if col in declared}
+
+
+def declare_fixed_point(df: pd.DataFrame, columns: dict[str, FixedPoint]) -> pd.DataFrame:
+    '''
+    Records the fixed-point declarations of the columns in the attrs of the dataframe, which pandas carries through filtering, sorting, grouping and the Parquet cache.
+    '''
+    df.attrs["fixed_point"] = {**df.attrs.get("fixed_point", {}), **{col: fixed_point._asdict() for col, fixed_point in columns.items()}}
+    return df
+
+
+def display_values(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Converts the fixed-point columns of the dataframe back into their declared unit for display, e.g. 123450 with two decimals becomes 1234.5. Columns without decimals are left as integers and frames without fixed-point columns are returned unchanged.
+    '''
+    scaled = {col: fixed_point for col, fixed_point in fixed_point_columns(df).items() if fixed_point.decimals}
+    if not scaled:
+        return df
+
+    return df.assign(**{col: df[col].astype("Float64") / fixed_point.scale for col, fixed_point in scaled.items()})
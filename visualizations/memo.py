@@ -0,0 +1,89 @@
+'''
+This section contributes towards the memoisation of the Dataset results. Results of the grouping, pivot and melt methods are kept in a bounded least recently used store keyed by the method, its arguments and the version of the dataframe they were computed from, so repeated calls are free and a reloaded dataframe never receives results of its predecessor.
+'''
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def freeze(value):
+    '''
+    Converts a method argument into a hashable key. Lists, tuples and dictionaries are frozen recursively and DataFrame objects are identified by their identity, the cache entry keeps them alive so the identity is not reused.
+    '''
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("frame", id(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return frozenset(freeze(item) for item in value)
+    return value
+
+
+def detached(value):
+    '''
+    Provides a copy of a stored result, frames and series are copied and tuples of them copied item by item, so a caller changing its result in place (e.g. sort_values(inplace=True)) does not change the result served to later callers.
+    '''
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(detached(item) for item in value)
+    return value
+
+
+class ResultCache:
+    '''
+    Least recently used store of method results with hit, miss and eviction counters.
+    '''
+
+    def __init__(self, maxsize=64) -> None:
+        '''
+        Inputs:
+        - maxsize: number of results kept, the least recently used result is evicted beyond it
+        '''
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        '''
+        Provides the stored entry of the key and marks it as recently used, None on a miss.
+        '''
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, entry) -> None:
+        '''
+        Stores an entry, evicting the least recently used entries beyond maxsize.
+        '''
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        '''
+        Removes every entry, the counters are kept.
+        '''
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict:
+        '''
+        Provides the hit, miss and eviction counters together with the current and maximum size.
+        '''
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._entries), "maxsize": self.maxsize}
@@ -0,0 +1,275 @@
+'''
+This section contributes towards the lazy query pipeline of the Dataset classes. Instead of every processing method materialising a new copy of the dataframe, the steps are recorded as a plan and executed in one optimised pass: the subtotal filter and the column projection are pushed below the type conversion and a single groupby is shared by every aggregation of the plan.
+'''
+import logging
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import instrumented
+from .measures import GENESIS_MISSING_MARKERS, declare_fixed_point, fixed_point_columns, to_counts, to_fixed_point
+
+logger = logging.getLogger(__name__)
+
+
+class Step(NamedTuple):
+    '''
+    A recorded operation of the query plan.
+    '''
+    op: str
+    params: dict
+
+
+def _unique(items) -> list:
+    return list(dict.fromkeys(items))
+
+
+class QueryPlan:
+    '''
+    The QueryPlan records select, convert, filter, group, pivot and melt steps against the raw frame of a Dataset object and executes them on collect. The recorded steps follow the signatures of the corresponding Dataset methods, so a run_pipeline step list can be replayed lazily.
+    '''
+
+    def __init__(self, dataset) -> None:
+        '''
+        Inputs:
+        - dataset: Dataset object holding the raw frame produced by file_processing
+        '''
+        self.dataset = dataset
+        self.steps: list[Step] = []
+
+    def _record(self, op: str, **params) -> "QueryPlan":
+        self.steps.append(Step(op, params))
+        return self
+
+    def select(self, columns: list[str]) -> "QueryPlan":
+        '''
+        Restricts the frame to the columns.
+        '''
+        return self._record("select", columns=list(columns))
+
+    def convert(self, *columns: str, missing_markers=GENESIS_MISSING_MARKERS) -> "QueryPlan":
+        '''
+        Converts the measure columns like Dataset.dtype_conversion.
+        '''
+        return self._record("convert", columns=list(columns), missing_markers=missing_markers)
+
+    def filter(self, region_col="Länder", markers=("Total",), label_cols=None) -> "QueryPlan":
+        '''
+        Removes the subtotal rows like Dataset.filter_data.
+        '''
+        return self._record("filter", markers=markers, label_cols=label_cols)
+
+    def between(self, column: str, low, high, name: str) -> "QueryPlan":
+        '''
+        Stores the rows with column values between low and high as an additional output frame, e.g. the year range of the Subsistence dataset.
+        '''
+        return self._record("between", column=column, low=low, high=high, name=name)
+
+    def group(self, cols: list[str], group_element: str, include_total=False) -> "QueryPlan":
+        '''
+        Sums the columns per group like Dataset.data_group, the output frame is named f"{group_element}_df".
+        '''
+        return self._record("group", keys=[group_element], cols=list(cols), total="Total" if include_total else None, name=f"{group_element}_df")
+
+    def pivot(self, columns: list[str], group_element: list[str], values: str, index: str, column_header: str) -> "QueryPlan":
+        '''
+        Sums the columns per group with a row total and pivots the totals like BasicSecurity.pivot_table.
+        '''
+        self._record("group", keys=list(group_element), cols=list(columns), total=values, name=f"{group_element[0] + group_element[1]}_df")
+        return self._record("pivot", source=f"{group_element[0] + group_element[1]}_df", values=values, index=index, column_header=column_header)
+
+    def melt(self, source: str, cols: list[str], var_name: str, value_name: str, name="melted_df") -> "QueryPlan":
+        '''
+        Unpivots the value columns of an output frame like BasicSecurity.max_quarterly_assessment, cols[0] is the identifier column.
+        '''
+        return self._record("melt", source=source, cols=list(cols), var_name=var_name, value_name=value_name, name=name)
+
+    def optimise(self, keep_df=True) -> dict:
+        '''
+        Resolves the recorded steps into a physical plan.
+
+        Inputs:
+        - keep_df: whether the filtered and converted frame itself is an output, otherwise only the columns read by later steps are kept
+
+        Output:
+        - dictionary describing the filters, projection, conversions, shared aggregation and outputs
+        '''
+        source = self.dataset.df
+        projection = list(source.columns)
+        converted: dict[str, tuple] = {}
+        marker_filters, between, groups, pivots, melts = [], [], [], [], []
+
+        for step in self.steps:
+            params = step.params
+            if step.op == "select":
+                projection = [col for col in projection if col in params["columns"]]
+            elif step.op == "convert":
+                converted.update({col: params["missing_markers"] for col in params["columns"]})
+            elif step.op == "filter":
+                label_cols = params["label_cols"]
+                if label_cols is None:
+                    # Resolved against the schema at this point of the plan: converted columns are numeric by then
+                    label_cols = [col for col in projection if col not in converted and not pd.api.types.is_numeric_dtype(source[col])]
+                marker_filters.append((params["markers"], list(label_cols)))
+            elif step.op == "between":
+                between.append(params)
+            elif step.op == "group":
+                groups.append(params)
+            elif step.op == "pivot":
+                pivots.append(params)
+            elif step.op == "melt":
+                melts.append(params)
+
+        if keep_df:
+            required = projection
+        else:
+            # Projection pushdown: only the columns read by the filters and aggregations survive the scan
+            read = [col for _, label_cols in marker_filters for col in label_cols]
+            read += [params["column"] for params in between]
+            read += [col for params in groups for col in params["keys"] + params["cols"]]
+            required = [col for col in projection if col in set(read)]
+
+        shared_keys = _unique(key for params in groups for key in params["keys"])
+        shared_cols = _unique(col for params in groups for col in params["cols"])
+
+        return {
+            "marker_filters": marker_filters,
+            "projection": required,
+            "converted": {col: markers for col, markers in converted.items() if col in required},
+            "between": between,
+            "shared_aggregation": (shared_keys, shared_cols) if len(groups) > 1 else None,
+            "groups": groups,
+            "pivots": pivots,
+            "melts": melts,
+            "keep_df": keep_df,
+        }
+
+    def explain(self, keep_df=True) -> str:
+        '''
+        Describes the optimised plan, one operation per line in execution order.
+        '''
+        plan = self.optimise(keep_df)
+        lines = [f"scan {len(self.dataset.df.columns)} columns"]
+        for markers, label_cols in plan["marker_filters"]:
+            lines.append(f"filter out rows matching {list(markers)} in {label_cols} (before conversion)")
+        lines.append(f"project {plan['projection']}")
+        lines.append(f"convert {list(plan['converted'])}")
+        for params in plan["between"]:
+            lines.append(f"output {params['name']}: {params['column']} between {params['low']} and {params['high']}")
+        backend = self.sql_backend(plan)
+        if plan["shared_aggregation"] and backend is None:
+            keys, cols = plan["shared_aggregation"]
+            lines.append(f"aggregate sum of {cols} by {keys} (shared)")
+        for params in plan["groups"]:
+            if backend is not None:
+                origin = f"{backend.engine} aggregate"
+            else:
+                origin = "rollup of shared aggregation" if plan["shared_aggregation"] else "aggregate"
+            lines.append(f"output {params['name']}: {origin} by {params['keys']}" + (f" with total {params['total']}" if params["total"] else ""))
+        for params in plan["pivots"]:
+            lines.append(f"output pivot_table: {params['values']} of {params['source']} by {params['index']} x {params['column_header']}")
+        for params in plan["melts"]:
+            lines.append(f"output {params['name']}: melt {params['source']} {params['cols'][1:]}")
+
+        return "\n".join(lines)
+
+    def sql_backend(self, plan: dict):
+        '''
+        Provides the SQLBackend of the dataset when the groups of the plan are aggregated in SQL, None for pandas groupbys. The backend ingests the df attribute, so a plan without the df output aggregates in pandas.
+        '''
+        return self.dataset.sql_backend if plan["groups"] and plan["keep_df"] else None
+
+    def _scan(self, plan: dict) -> pd.DataFrame:
+        '''
+        Builds the filtered and converted frame column by column: the row mask is computed on the raw label columns first, so only surviving rows of the projected columns are ever converted.
+        '''
+        from .eda import marker_mask
+
+        source = self.dataset.df
+        keep = np.ones(len(source), dtype=bool)
+        for markers, label_cols in plan["marker_filters"]:
+            keep &= ~marker_mask(source, markers, label_cols)
+
+        money_columns = self.dataset.money_columns
+        columns = {}
+        if plan["marker_filters"] and plan["keep_df"]:
+            # Dataset.filter_data keeps the original row numbers
+            columns["index"] = source.index[keep]
+
+        for col in plan["projection"]:
+            values = source[col][keep]
+            if col in plan["converted"] and col in money_columns:
+                values = to_fixed_point(values, money_columns[col], plan["converted"][col])
+            elif col in plan["converted"]:
+                values = to_counts(values, plan["converted"][col])
+            # Dataset.filter_data renumbers the rows, without a subtotal filter the row labels are kept
+            columns[col] = values.reset_index(drop=True) if plan["marker_filters"] else values
+
+        frame = pd.DataFrame(columns)
+        declare_fixed_point(frame, {col: money_columns[col] for col in plan["converted"] if col in money_columns})
+        return frame
+
+    @instrumented
+    def collect(self, keep_df=True) -> dict[str, pd.DataFrame]:
+        '''
+        Executes the optimised plan and stores every output frame on the Dataset object under the attribute name the eager methods use (df, Länder_df, pivot_table, ...).
+
+        Inputs:
+        - keep_df: whether the filtered and converted frame replaces the df attribute, True as default argument
+
+        Output:
+        - dictionary of attribute name to output frame
+        '''
+        from .eda import declare_total
+
+        plan = self.optimise(keep_df)
+        frame = self._scan(plan)
+        outputs = {"df": frame} if keep_df else {}
+
+        for params in plan["between"]:
+            outputs[params["name"]] = frame[frame[params["column"]].between(params["low"], params["high"])]
+
+        backend = self.sql_backend(plan)
+        if backend is not None:
+            # The aggregations run as SQL queries over the scanned frame, like the eager data_group and pivot_table
+            self.dataset.df = frame
+            table = self.dataset.sql_table()
+        elif plan["shared_aggregation"]:
+            keys, cols = plan["shared_aggregation"]
+            # The only full-frame aggregation, every group is a rollup of its (much smaller) result
+            base = frame.groupby(keys, observed=True)[cols].sum(min_count=1).reset_index()
+            declare_fixed_point(base, fixed_point_columns(frame))
+        else:
+            base = frame
+
+        for params in plan["groups"]:
+            if backend is not None:
+                grouped = backend.group_sum(table, params["keys"], params["cols"])
+            else:
+                grouped = base.groupby(params["keys"], observed=True)[params["cols"]].sum(min_count=1).reset_index()
+                declare_fixed_point(grouped, fixed_point_columns(base))
+
+            if params["total"]:
+                grouped[params["total"]] = grouped[params["cols"]].sum(axis=1, min_count=1)
+                declare_total(grouped, params["cols"], params["total"])
+            outputs[params["name"]] = grouped
+
+        for params in plan["pivots"]:
+            grouped = outputs[params["source"]]
+            pivot_table = grouped.pivot_table(values=params["values"], index=params["index"], columns=params["column_header"], aggfunc="sum", observed=True)
+            if params["values"] in fixed_point_columns(grouped):
+                declare_fixed_point(pivot_table, {str(col): fixed_point_columns(grouped)[params["values"]] for col in pivot_table.columns})
+            outputs["pivot_table"] = pivot_table
+
+        for params in plan["melts"]:
+            cols = params["cols"]
+            outputs[params["name"]] = pd.melt(outputs[params["source"]][cols], id_vars=[cols[0]], var_name=params["var_name"], value_name=params["value_name"])
+
+        for name, output in outputs.items():
+            if getattr(self.dataset, name, None) is not output:
+                setattr(self.dataset, name, output)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Lazy plan of %s executed:\n%s", self.dataset.path_to_file, self.explain(keep_df))
+        return outputs
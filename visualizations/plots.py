@@ -1,16 +1,45 @@
-from urllib.request import urlopen
-from matplotlib import pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 import pandas as pd
-import json
+import logging
+
+from .downsampling import downsample
+from .figures import chart_layout, figure_templates, groups, largest_groups
+from .geometry import geometry_store
+from .instrumentation import instrumented
+from .raster import HeatmapRaster
+from .measures import display_values
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    # plotly and matplotlib take about a second to import, the Visuals methods import plotly when they first draw a figure
+    from matplotlib import pyplot as plt
+    import plotly.graph_objects as go
 
 
 class Visuals:
     '''
     The class Visuals connects the Dataframe objects to convert them into visualizations for understanding feature relationships. The methods provided by the class provide bar, choropleths, heatmaps, donuts and line charts.
+
+    The rendering of the line and bar charts follows the size of their input: every line is downsampled to points_per_pixel points per pixel of the chart width, line charts with more than webgl_points points are drawn as WebGL (Scattergl) traces, bar plots with more than bar_limit regions show the largest regions and one bar summing the others, heatmaps of more than raster_cells cells are binned to the chart size and drawn as an image. The thresholds may be set per instance.
     '''
-    def choropleth_figure(self, dataframe: pd.DataFrame, dimensions_url: str, locations: str ,color: str, labels: dict, title: str, range_color: tuple, color_continuous_scale="plasma") -> go.choropleth:
+    # Width in pixels assumed for a chart spanning the page, e.g. with use_container_width
+    chart_width = 1200
+    # Points kept per pixel of the chart width by the downsampling of a line
+    points_per_pixel = 1
+    # Points of a line chart beyond which its traces are drawn with WebGL instead of SVG
+    webgl_points = 1000
+    # Regions of a bar plot beyond which the smaller regions are summed into one bar
+    bar_limit = 40
+    # Cells of a pivot table beyond which its heatmap is rasterised
+    raster_cells = 10_000
+    # Height in pixels of the heatmaps
+    heatmap_height = 300
+
+    @instrumented
+    def choropleth_figure(self, dataframe: pd.DataFrame, dimensions_url: str, locations: str ,color: str, labels: dict, title: str, range_color: tuple, color_continuous_scale="plasma", resolution="auto", height=350) -> go.choropleth:
         '''
         Creates a plotly figure object -> choropleth image utilizing a json dimensions file and sizing parameters to segregate defined datapoints.
 
@@ -22,16 +51,20 @@ class Visuals:
         - title: figure title
         - range_color: range of values to establish scale of color scaling
         - color_continuous_scale: similar to plotly parameter for color spectrum
+        - resolution: level of the simplified boundaries ("full", "high", "medium", "low"), "auto" picks the coarsest level exact to the pixel for the selected regions
+        - height: figure height in pixels
         - fig_template: plotly defined template for dark mode
         - fig_margins: plotly figure margins
 
         Output:
         - Plotly Graph Objects figure: Chloropeth map figure
         '''
-        with open(dimensions_url) as dimension:
-            bundesland = json.load(dimension)
-        
-        choro = px.choropleth(dataframe, geojson=bundesland, locations=locations, featureidkey="properties.name",
+        import plotly.express as px
+
+        # The file is parsed and simplified once, only the regions in the dataframe are sent to the browser
+        bundesland = geometry_store.collection(dimensions_url, resolution, ids=dataframe[locations].unique(), featureidkey="properties.name", height=height)
+
+        choro = px.choropleth(display_values(dataframe), geojson=bundesland, locations=locations, featureidkey="properties.name",
         color=color, labels=labels, title=title, color_continuous_scale=color_continuous_scale,
         range_color=range_color
         )
@@ -43,15 +76,16 @@ class Visuals:
         paper_bgcolor="rgba(0,0,0,0)",
         geo_bgcolor="rgba(0,0,0,0)",
         margin={"l":0, "r":0, "t":30, "b":0},
-        height=350,
+        height=height,
         hovermode="closest"
         )
 
         return choro
     
+    @instrumented
     def sorted_df_visual(self, data: pd.DataFrame, sort_by: str, asc_order: bool) -> pd.DataFrame:
         '''
-        Produces a sorted dataframe defined by the sort_by parameter and returns the sorted Dataframe for a table visual
+        Produces a sorted dataframe defined by the sort_by parameter and returns the sorted Dataframe for a table visual. Fixed-point currency columns are sorted on their exact integer values and converted into their declared unit for display.
 
         Inputs:
         - data: the input pd.DataFrame
@@ -61,12 +95,14 @@ class Visuals:
         Output:
         - Sorted DataFrame object
         '''
-        sorted_df = data.sort_values(by=sort_by, ascending=asc_order)
+        sorted_df = display_values(data.sort_values(by=sort_by, ascending=asc_order))
 
-        print(sorted_df.head(10))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sorted table:\n%s", sorted_df.head(10))
 
         return sorted_df
     
+    @instrumented
     def bar_plot_visual(self, data: pd.DataFrame, column_name: str, filter_by: str, value_measure: str, fig_title: str, type_area="Länder", chosen_states=None)-> plt.figure:
         '''
         Provides a bar plot visualization from a refined dataframe.
@@ -79,36 +115,44 @@ class Visuals:
         - chosen_states (list): filtering component for regions
 
         Output: 
-        - Barplot plotly figure
+        - Barplot plotly figure, with the regions beyond the largest bar_limit - 1 summed into one bar
         '''
-        df_filter = data[data[column_name] == filter_by]
+        df_filter = display_values(data[data[column_name] == filter_by])
         if chosen_states:
             df_filter= df_filter[df_filter[type_area].isin(chosen_states)]
-
-        visual = px.bar(
-            data_frame=df_filter,
-            x=column_name,
-            y=value_measure,
-            title=fig_title,
-            color=type_area,
-            labels={
-                column_name:column_name,
-                value_measure:filter_by
-            },
-            barmode="group",
-        )
-
-        visual.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            margin={"l":0, "r":0, "t":40, "b":10},
-            height=800,
-            hovermode="closest"
-        )
-
-        return visual
-
-
+        if df_filter[type_area].nunique() > self.bar_limit:
+            # An SVG bar per region, e.g. per Kreis, stalls the browser long before the chart is readable
+            df_filter = largest_groups(df_filter, type_area, value_measure, self.bar_limit, label_cols=[column_name])
+
+        layout = chart_layout(800, {"l":0, "r":0, "t":40, "b":10}, title={"text": fig_title}, xaxis={"title": {"text": column_name}}, yaxis={"title": {"text": filter_by}}, legend={"title": {"text": type_area}})
+
+        def build():
+            import plotly.express as px
+
+            return px.bar(
+                data_frame=df_filter,
+                x=column_name,
+                y=value_measure,
+                title=fig_title,
+                color=type_area,
+                labels={
+                    column_name:column_name,
+                    value_measure:filter_by
+                },
+                barmode="group",
+            ).update_layout(layout)
+
+        # Only the bars, colours and titles are set on a copy of the template built by plotly.express on the first call
+        traces = [
+            {"name": area, "legendgroup": area, "offsetgroup": area, "marker": {"color": colour}, "x": x_values, "y": y_values,
+             "hovertemplate": f"{type_area}={area}<br>{column_name}=%{{x}}<br>{filter_by}=%{{y}}<extra></extra>"}
+            for (area, (x_values, y_values)), colour in zip(groups(df_filter, type_area, column_name, value_measure), figure_templates.colours())
+        ]
+
+        return figure_templates.figure(("bar_plot",), build, traces, layout)
+
+
+    @instrumented
     def donut_visual(self, data: pd.DataFrame, grouping_type: str, col_name: str, in_percent=False):
         '''
         Provides Donut Chart visualization.
@@ -121,24 +165,27 @@ class Visuals:
         Output:
         - Plotly Donut Chart
         '''
+        data = display_values(data)
+
         if in_percent:
             totals = data[grouping_type].sum()
             data = data.copy()
             data["Percentage"] = data[grouping_type] / totals * 100
 
-        do_chart = px.pie(data, values=grouping_type, names=col_name, hole=0.5)
+        layout = chart_layout(350, dict(l=0, r=0, t=50, b=10))
 
-        do_chart.update_traces(textposition='inside', textinfo='percent')
-        do_chart.update_layout(
-            margin=dict(l=0, r=0, t=50, b=10),
-            height=350,
-            hovermode="closest",
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)"
-        )
+        def build():
+            import plotly.express as px
 
-        return do_chart
+            do_chart = px.pie(data, values=grouping_type, names=col_name, hole=0.5)
+            do_chart.update_traces(textposition='inside', textinfo='percent')
+            return do_chart.update_layout(layout)
 
+        trace = {"labels": data[col_name].to_numpy(), "values": data[grouping_type].to_numpy(), "hovertemplate": f"{col_name}=%{{label}}<br>{grouping_type}=%{{value}}<extra></extra>"}
+
+        return figure_templates.figure(("donut",), build, [trace], layout)
+
+    @instrumented
     def generate_heatmap(self, x: str, y: str, color_by: str, title: str, pivot_table: pd.DataFrame) -> go.Heatmap:
         '''
         Produce a heatmap visual from plotly.objects
@@ -151,21 +198,43 @@ class Visuals:
         - pivot_table: pivot table dataframe retrieved from the EDA
 
         Output:
-        - Heatmap
+        - Heatmap, or above raster_cells cells an image of the cell averages binned to heatmap_height x chart_width pixels whose cells are provided by heatmap_detail
         '''
-        visual = px.imshow(pivot_table, labels={"x": x, "y": y, "color": color_by}, title=title)
+        pivot_table = display_values(pivot_table)
+        if pivot_table.size > self.raster_cells:
+            # Every cell of px.imshow is serialised with its labels, the image keeps the payload bounded by the chart size
+            colorscale = figure_templates.layout_template()["layout"]["colorscale"]["sequential"]
+            raster = HeatmapRaster(pivot_table, self.heatmap_height, self.chart_width)
+            return raster.figure(x, y, color_by, title, colorscale, chart_layout(self.heatmap_height, {"l":0, "r":0, "t": 40, "b":10}))
 
-        visual.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            margin={"l":0, "r":0, "t": 40, "b":10},
-            height=300,
-            hovermode="closest"
-        )
-        # visual.show()
-        return visual
+        layout = chart_layout(self.heatmap_height, {"l":0, "r":0, "t": 40, "b":10}, title={"text": title}, xaxis={"title": {"text": x}}, yaxis={"title": {"text": y}}, coloraxis={"colorbar": {"title": {"text": color_by}}})
+
+        def build():
+            import plotly.express as px
+
+            return px.imshow(pivot_table, labels={"x": x, "y": y, "color": color_by}, title=title).update_layout(layout)
 
+        trace = {"x": pivot_table.columns.to_numpy(), "y": pivot_table.index.to_numpy(), "z": pivot_table.to_numpy(), "hovertemplate": f"{x}: %{{x}}<br>{y}: %{{y}}<br>{color_by}: %{{z}}<extra></extra>"}
 
+        # plotly.express lays out numeric and label axes differently
+        return figure_templates.figure(("heatmap", pivot_table.columns.inferred_type, pivot_table.index.inferred_type), build, [trace], layout)
+
+    def heatmap_detail(self, pivot_table: pd.DataFrame, x: int, y: int) -> pd.DataFrame:
+        '''
+        Provides the cells of a pivot table behind a pixel of its rasterised heatmap, e.g. for a click on the image.
+
+        Inputs:
+        - pivot_table: pivot table passed to generate_heatmap
+        - x: column of the pixel
+        - y: row of the pixel
+
+        Output:
+        - DataFrame with the rows and columns of the pivot table averaged into the pixel
+        '''
+        return HeatmapRaster(display_values(pivot_table), self.heatmap_height, self.chart_width).detail(x, y)
+
+
+    @instrumented
     def grouped_bar_plot(self, data: pd.DataFrame, max_value: int, X: str, y: str, color_by: str, title: str, color_sequence: list[str], barmode="group") -> pd.DataFrame:
         '''
         Provides a coupled bar plot visualization of all Quarterly generations of data from the Security Benefits DataFrame
@@ -180,25 +249,26 @@ class Visuals:
         - colorsequence: iterable to segregate each bar color
         - barmode: "group" default
         '''
-        visual = px.bar(data, x=X, y=y, color=color_by, barmode=barmode, 
-                        labels={y: y, X: X}, title=title,
-                        color_discrete_sequence=color_sequence
-                        )
-        
-        visual.update_yaxes(range=[0, max_value], tick0=0, dtick=(max_value // 5))
-
-        visual.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            margin={"l":0, "r":0, "t":40, "b":10},
-            height=800,
-            hovermode="closest"
-        )
+        layout = chart_layout(800, {"l":0, "r":0, "t":40, "b":10}, title={"text": title}, xaxis={"title": {"text": X}}, yaxis={"title": {"text": y}, "range": [0, max_value], "tick0": 0, "dtick": max_value // 5}, legend={"title": {"text": color_by}})
+
+        def build():
+            import plotly.express as px
 
-        # visual.show()
-        return visual
+            return px.bar(data, x=X, y=y, color=color_by, barmode=barmode, 
+                          labels={y: y, X: X}, title=title,
+                          color_discrete_sequence=color_sequence
+                          ).update_layout(layout)
 
-    def line_progression_chart(self, data: pd.DataFrame, X: str, y: str, hue: str, title: str):
+        traces = [
+            {"name": group, "legendgroup": group, "offsetgroup": group, "marker": {"color": colour}, "x": x_values, "y": y_values,
+             "hovertemplate": f"{color_by}={group}<br>{X}=%{{x}}<br>{y}=%{{y}}<extra></extra>"}
+            for (group, (x_values, y_values)), colour in zip(groups(data, color_by, X, y), figure_templates.colours(color_sequence))
+        ]
+
+        return figure_templates.figure(("grouped_bar", barmode), build, traces, layout)
+
+    @instrumented
+    def line_progression_chart(self, data: pd.DataFrame, X: str, y: str, hue: str, title: str, width=None, x_range=None):
         '''
         A line plot for the Subsistence payments dataset
 
@@ -208,17 +278,29 @@ class Visuals:
         - y: Vertical axis column value
         - hue: color by column specification
         - title
+        - width: width of the chart in pixels, chart_width when None
+        - x_range: (start, end) of the visible X values, e.g. reported by a zoom of the host, the points outside are dropped before the lines are downsampled
+
+        Output:
+        - Line plotly figure, each line downsampled with LTTB to points_per_pixel points per pixel, with WebGL traces above webgl_points points
         '''
-        visual = px.line(data, x=X, y=y, color=hue, title=title)
-
-        visual.update_layout(
-            xaxis_title=X,
-            yaxis_title=y,
-            legend_title=hue,
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            margin={"l":0, "r":0, "t":40, "b":10},
-            height=800,
-            hovermode="closest"
-        )
-        return visual
+        if x_range is not None:
+            data = data[data[X].between(*x_range)]
+        budget = int((width or self.chart_width) * self.points_per_pixel)
+
+        lines = [(group, *downsample(x_values, y_values, budget)) for group, (x_values, y_values) in groups(data, hue, X, y)]
+        render_mode = "webgl" if sum(len(x_values) for _, x_values, _ in lines) > self.webgl_points else "svg"
+        layout = chart_layout(800, {"l":0, "r":0, "t":40, "b":10}, title={"text": title}, xaxis={"title": {"text": X}}, yaxis={"title": {"text": y}}, legend={"title": {"text": hue}})
+
+        def build():
+            import plotly.express as px
+
+            return px.line(data, x=X, y=y, color=hue, title=title, render_mode=render_mode).update_layout(layout)
+
+        traces = [
+            {"name": group, "legendgroup": group, "line": {"color": colour}, "x": x_values, "y": y_values,
+             "hovertemplate": f"{hue}={group}<br>{X}=%{{x}}<br>{y}=%{{y}}<extra></extra>"}
+            for (group, x_values, y_values), colour in zip(lines, figure_templates.colours())
+        ]
+
+        return figure_templates.figure(("line", render_mode), build, traces, layout)
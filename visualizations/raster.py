@@ -0,0 +1,154 @@
+'''
+This section contributes towards the rasterised heatmaps of large pivot tables. A pivot table with more cells than the chart has pixels is binned to the display resolution, coloured on the server and sent as one 8 bit PNG image, so the payload of the figure is bounded by the size of the chart instead of growing with the number of cells. The cells behind a pixel of the image are looked up again from the pivot table, e.g. on a click.
+'''
+import base64
+import io
+
+import numpy as np
+import pandas as pd
+
+# Tick labels per axis of a rasterised heatmap
+RASTER_TICKS = 20
+
+
+def bin_edges(cells: int, bins: int) -> np.ndarray:
+    '''
+    Provides the bounds of bins of nearly equal size over a number of cells, one bin per cell when there are fewer cells than bins.
+
+    Output:
+    - ascending array of bins + 1 positions from 0 to cells
+    '''
+    return np.linspace(0, cells, min(cells, bins) + 1).astype(np.intp)
+
+
+def bin_matrix(values: np.ndarray, row_edges: np.ndarray, col_edges: np.ndarray) -> np.ndarray:
+    '''
+    Averages the cells of every bin of a matrix, missing cells are left out of the averages.
+
+    Inputs:
+    - values: 2 dimensional float array, NaN for missing cells
+    - row_edges, col_edges: bin bounds from bin_edges
+
+    Output:
+    - matrix of the bin averages, NaN for bins without values
+    '''
+    present = ~np.isnan(values)
+    sums = np.add.reduceat(np.add.reduceat(np.where(present, values, 0), row_edges[:-1], axis=0), col_edges[:-1], axis=1)
+    counts = np.add.reduceat(np.add.reduceat(present.astype(np.int64), row_edges[:-1], axis=0), col_edges[:-1], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def palette(colorscale: list) -> np.ndarray:
+    '''
+    Samples a plotly colorscale into the palette of an 8 bit image, index 0 is reserved for missing cells.
+
+    Inputs:
+    - colorscale: list of [position, colour] pairs with "#rrggbb" or "rgb(r, g, b)" colours
+
+    Output:
+    - uint8 array of 256 RGB colours
+    '''
+    from plotly.colors import hex_to_rgb, unlabel_rgb
+
+    positions = np.array([float(position) for position, _ in colorscale])
+    colours = np.array([hex_to_rgb(colour) if colour.startswith("#") else unlabel_rgb(colour) for _, colour in colorscale], dtype=float)
+
+    samples = np.linspace(0, 1, 255)
+    sampled = np.zeros((256, 3), dtype=np.uint8)
+    for channel in range(3):
+        sampled[1:, channel] = np.interp(samples, positions, colours[:, channel]).round()
+    return sampled
+
+
+def colour_indices(values: np.ndarray, zmin: float, zmax: float) -> np.ndarray:
+    '''
+    Maps a matrix onto the palette indices 1 to 255 between zmin and zmax, missing cells onto index 0.
+    '''
+    scaled = np.clip((np.nan_to_num(values, nan=zmin) - zmin) / ((zmax - zmin) or 1), 0, 1)
+    return np.where(np.isnan(values), 0, 1 + (scaled * 254).round()).astype(np.uint8)
+
+
+def png_source(indices: np.ndarray, colours: np.ndarray) -> str:
+    '''
+    Encodes palette indices as an 8 bit PNG data URI for the source of a plotly Image trace, index 0 is transparent.
+    '''
+    from PIL import Image
+
+    image = Image.fromarray(indices, mode="P")
+    image.putpalette(colours.ravel().tolist())
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", transparency=0)
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def tick_labels(labels: pd.Index, edges: np.ndarray) -> tuple[list[int], list[str]]:
+    '''
+    Provides up to RASTER_TICKS evenly spaced bin positions with the label of the first cell of each bin.
+    '''
+    positions = np.unique(np.linspace(0, len(edges) - 2, min(RASTER_TICKS, len(edges) - 1)).astype(np.intp))
+    return positions.tolist(), [str(labels[edges[position]]) for position in positions]
+
+
+class HeatmapRaster:
+    '''
+    The binning of a pivot table to a display resolution. The bins are derived from the shape of the table only, so the cells behind a pixel of a drawn raster are found again from the table and the pixel position.
+    '''
+
+    def __init__(self, pivot_table: pd.DataFrame, height: int, width: int) -> None:
+        '''
+        Inputs:
+        - pivot_table: DataFrame of numeric cells
+        - height, width: display resolution in pixels, the largest number of row and column bins
+        '''
+        self.pivot_table = pivot_table
+        self.row_edges = bin_edges(pivot_table.shape[0], height)
+        self.col_edges = bin_edges(pivot_table.shape[1], width)
+
+    def binned(self) -> np.ndarray:
+        '''
+        Provides the bin averages of the pivot table.
+        '''
+        values = self.pivot_table.to_numpy(dtype=float, na_value=np.nan)
+        return bin_matrix(values, self.row_edges, self.col_edges)
+
+    def detail(self, x: int, y: int) -> pd.DataFrame:
+        '''
+        Provides the cells of the pivot table behind a pixel of the raster.
+
+        Inputs:
+        - x: column of the pixel, as reported by a click on the image
+        - y: row of the pixel
+        '''
+        return self.pivot_table.iloc[self.row_edges[y]:self.row_edges[y + 1], self.col_edges[x]:self.col_edges[x + 1]]
+
+    def figure(self, x: str, y: str, color_by: str, title: str, colorscale: list, layout: dict):
+        '''
+        Provides the heatmap as an Image trace of the coloured bins and a colour bar.
+
+        Inputs:
+        - x, y, color_by, title: axis, colour bar and figure titles
+        - colorscale: list of [position, colour] pairs
+        - layout: layout properties shared with the other charts
+
+        Output:
+        - Plotly Graph Objects figure
+        '''
+        import plotly.graph_objects as go
+
+        binned = self.binned()
+        zmin, zmax = (float(np.nanmin(binned)), float(np.nanmax(binned))) if not np.isnan(binned).all() else (0.0, 1.0)
+        x_ticks, x_text = tick_labels(self.pivot_table.columns, self.col_edges)
+        y_ticks, y_text = tick_labels(self.pivot_table.index, self.row_edges)
+
+        image = go.Image(source=png_source(colour_indices(binned, zmin, zmax), palette(colorscale)), hovertemplate=f"{x} bin: %{{x}}<br>{y} bin: %{{y}}<extra></extra>")
+        # An empty scatter trace draws the colour bar of the image
+        colour_bar = go.Scatter(x=[None], y=[None], mode="markers", showlegend=False, hoverinfo="skip",
+                                marker={"colorscale": colorscale, "cmin": zmin, "cmax": zmax, "showscale": True, "colorbar": {"title": {"text": color_by}}})
+
+        return go.Figure([image, colour_bar], {
+            **layout,
+            "title": {"text": title},
+            "xaxis": {"title": {"text": x}, "tickvals": x_ticks, "ticktext": x_text, "showgrid": False},
+            "yaxis": {"title": {"text": y}, "tickvals": y_ticks, "ticktext": y_text, "showgrid": False, "autorange": "reversed"},
+        })
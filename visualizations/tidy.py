@@ -0,0 +1,217 @@
+'''
+This section contributes towards the tidy long model of the Subsistence table. GENESIS publishes 27 count columns per Land and year, one per combination of location (outside/inside institutions), nationality and sex including their subtotals. The long model keeps the 8 base cells as one row each and computes subtotals by vectorised reductions. Published subtotals that differ from the sum of their base cells (GENESIS rounds values and suppresses small cells) are kept in a sparse table of reported totals, so the wide table can be rebuilt exactly.
+'''
+import numpy as np
+import pandas as pd
+
+from .dimensions import LOCATIONS, NATIONALITIES, SEXES
+from .measures import downcast_counts
+
+TOTAL = "Total"
+ROW_DIMENSIONS = ["Länder", "Year"]
+CELL_DIMENSIONS = [LOCATIONS, NATIONALITIES, SEXES]
+
+_LOCATION_ORDER = ("Non-Institution", "Institution", TOTAL)
+_SEX_ORDER = ("Male", "Female", TOTAL)
+_NATIONALITY_ORDER = ("German", "Foreign", TOTAL)
+
+# (location, nationality, sex) of the wide Subsistence columns, in the column order of the GENESIS table
+SUBSISTENCE_CELLS = dict(zip([
+    "Non-Institution German Males", "Non-Institution Foreign Males", "Total Non-Insitution Males",
+    "Non-Institution German Females", "Non-Institution Foreign Females", "Total Non-Insitution Females",
+    "Non-Institution Germans Total", "Non-Institution Foreign Total", "Non-Institution Total",
+    "Institution German Males", "Insitution Foreign Males", "Total Institution Males",
+    "Institution German Females", "Insitution Foreign Females", "Total Institution Females",
+    "Institution Germans Total", "Institution Foreign Total", "Institution Total",
+    "Total German Males", "Total Foreign Males", "Total Males",
+    "Total German Females", "Total Foreign Females", "Total Females",
+    "Germans Total", "Foreign Total", "Total",
+], [(location, nationality, sex) for location in _LOCATION_ORDER for sex in _SEX_ORDER for nationality in _NATIONALITY_ORDER]))
+
+BASE_CELLS = {name: cell for name, cell in SUBSISTENCE_CELLS.items() if TOTAL not in cell}
+
+
+def cell_rows(rows: pd.DataFrame, cells: list[tuple]) -> pd.DataFrame:
+    '''
+    Repeats the Länder and Year row keys once per cell and adds the cell labels as categoricals of the shared dimensions.
+
+    Inputs:
+    - rows: frame of the row keys
+    - cells: list of (location, nationality, sex)
+
+    Output:
+    - frame with len(rows) * len(cells) rows, cell by cell
+    '''
+    frame = rows[ROW_DIMENSIONS].iloc[np.tile(np.arange(len(rows)), len(cells))].reset_index(drop=True)
+    cell_codes = np.repeat(np.arange(len(cells)), len(rows))
+
+    for position, dimension in enumerate(CELL_DIMENSIONS):
+        labels = pd.Categorical([cell[position] for cell in cells], dtype=dimension.dtype)
+        frame[dimension.name] = labels[cell_codes]
+
+    return frame
+
+
+def normalise_cell(location=None, nationality=None, sex=None) -> tuple:
+    '''
+    Provides the cell of the labels, None stands for the subtotal over the dimension.
+    '''
+    return tuple(TOTAL if label is None else label for label in (location, nationality, sex))
+
+
+def derive_cells(base: pd.DataFrame, index: pd.MultiIndex, cells: dict[str, tuple]) -> pd.DataFrame:
+    '''
+    Sums the base counts into the requested cells. The base counts are spread into one column per base cell once and each cell is a row-wise sum over its matching columns, a cell without any reported base count stays missing.
+
+    Inputs:
+    - base: long frame of base counts
+    - index: Länder and Year row keys of the result
+    - cells: dictionary of output column name to (location, nationality, sex)
+
+    Output:
+    - wide frame of nullable integers with one column per cell
+    '''
+    names = [dimension.name for dimension in CELL_DIMENSIONS]
+    spread = base.pivot_table(index=ROW_DIMENSIONS, columns=names, values="Count", aggfunc="sum", observed=True).reindex(index)
+    spread = spread.astype("Int64")
+
+    derived = {}
+    for name, cell in cells.items():
+        matching = [column for column in spread.columns if all(label == TOTAL or label == value for label, value in zip(cell, column))]
+        derived[name] = spread[matching].sum(axis=1, min_count=1) if matching else pd.Series(pd.NA, index=index, dtype="Int64")
+
+    return pd.DataFrame(derived, index=index)
+
+
+def to_long(wide: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    '''
+    Converts the wide Subsistence table into its long model.
+
+    Inputs:
+    - wide: frame with the Länder and Year columns and the count columns of SUBSISTENCE_CELLS
+
+    Output:
+    - base: one row per Land, year and base cell with a reported count
+    - reported: one row per Land, year and subtotal cell whose published value differs from the sum of its base cells, the published value may be missing
+    '''
+    rows = wide[ROW_DIMENSIONS].reset_index(drop=True)
+
+    base = cell_rows(rows, list(BASE_CELLS.values()))
+    base["Count"] = pd.concat([wide[name].astype("Int64") for name in BASE_CELLS], ignore_index=True)
+    base = base[base["Count"].notna()].reset_index(drop=True)
+    # Missing cells are not stored, so the counts fit a plain unsigned integer type
+    base["Count"] = base["Count"].astype(downcast_counts(base["Count"]).dtype.numpy_dtype)
+
+    totals = {name: cell for name, cell in SUBSISTENCE_CELLS.items() if name not in BASE_CELLS}
+    index = pd.MultiIndex.from_frame(rows)
+    derived = derive_cells(base, index, totals)
+    published = wide[list(totals)].astype("Int64").set_axis(index)
+
+    differs = (published.isna() != derived.isna()) | (published.fillna(0) != derived.fillna(0))
+    positions, columns = np.nonzero(differs.to_numpy())
+
+    names = list(totals)
+    reported = rows.iloc[positions].reset_index(drop=True)
+    for position, dimension in enumerate(CELL_DIMENSIONS):
+        reported[dimension.name] = pd.Categorical([totals[names[column]][position] for column in columns], dtype=dimension.dtype)
+    reported["Count"] = pd.array([published.iat[row, column] for row, column in zip(positions, columns)], dtype="Int64")
+    reported["Count"] = downcast_counts(reported["Count"])
+
+    return base, reported
+
+
+def apply_reported(derived: pd.DataFrame, reported: pd.DataFrame, cells: dict[str, tuple]) -> pd.DataFrame:
+    '''
+    Replaces derived subtotals by the published values recorded in the reported totals.
+
+    Inputs:
+    - derived: wide frame indexed by the Länder and Year row keys
+    - reported: long frame of reported subtotals
+    - cells: dictionary of column name of derived to (location, nationality, sex)
+    '''
+    for name, cell in cells.items():
+        if TOTAL not in cell:
+            continue
+        exact = np.logical_and.reduce([(reported[dimension.name] == label).to_numpy() for dimension, label in zip(CELL_DIMENSIONS, cell)])
+        overrides = reported[exact]
+        if len(overrides):
+            derived.loc[pd.MultiIndex.from_frame(overrides[ROW_DIMENSIONS]), name] = overrides["Count"].astype("Int64").to_numpy()
+
+    return derived
+
+
+def reduce_cell(base: pd.DataFrame, reported: pd.DataFrame, index: pd.MultiIndex, cell: tuple, by=ROW_DIMENSIONS, published=True) -> pd.Series:
+    '''
+    Computes one cell, e.g. ("Institution", "Foreign", "Female"), per Land and year and sums it over the by dimensions.
+
+    Inputs:
+    - base: long frame of base counts
+    - reported: long frame of reported subtotals
+    - index: Länder and Year row keys
+    - cell: (location, nationality, sex), "Total" sums over the dimension
+    - by: row dimensions of the result, summing over the Länder leaves out the Total rows
+    - published: use the published subtotal where it differs from the sum of the base cells
+
+    Output:
+    - nullable integer series indexed by the by dimensions
+    '''
+    values = derive_cells(base, index, {"Count": cell})
+    if published:
+        values = apply_reported(values, reported, {"Count": cell})
+    values = values["Count"]
+
+    if "Länder" not in by:
+        # The Germany-wide rows are subtotals over the Länder
+        values = values[values.index.get_level_values("Länder") != TOTAL]
+    if list(by) != ROW_DIMENSIONS:
+        values = values.groupby(level=list(by), observed=True).sum(min_count=1)
+
+    return downcast_counts(values)
+
+
+def to_wide(base: pd.DataFrame, reported: pd.DataFrame, index: pd.MultiIndex) -> pd.DataFrame:
+    '''
+    Rebuilds the wide Subsistence table from the long model.
+
+    Output:
+    - frame with the Länder and Year columns followed by the columns of SUBSISTENCE_CELLS
+    '''
+    wide = apply_reported(derive_cells(base, index, SUBSISTENCE_CELLS), reported, SUBSISTENCE_CELLS)
+    return wide.apply(downcast_counts).reset_index()
+
+
+class YearPartitions:
+    '''
+    Rows of a frame ordered by year together with the row offset of every year, so a year range is located by a binary search over the distinct years and returned as a slice of the ordered frame.
+    '''
+
+    def __init__(self, frame: pd.DataFrame, column="Year") -> None:
+        '''
+        Inputs:
+        - frame: DataFrame object with an integer year column without missing values
+        - column: name of the year column
+        '''
+        years = frame[column].to_numpy(dtype=np.int64)
+        if len(years) and (np.diff(years) < 0).any():
+            # Stable, so the rows of a year keep their order, e.g. by Land
+            order = np.argsort(years, kind="stable")
+            frame, years = frame.iloc[order], years[order]
+
+        self.frame = frame
+        self.years, starts = np.unique(years, return_index=True)
+        self.offsets = np.append(starts, len(years))
+
+    def slice(self, year_start=None, year_end=None) -> pd.DataFrame:
+        '''
+        Provides the rows with a year between year_start and year_end (both included, unbounded when None) as a positional slice of the ordered frame.
+        '''
+        low = 0 if year_start is None else np.searchsorted(self.years, year_start, side="left")
+        high = len(self.years) if year_end is None else np.searchsorted(self.years, year_end, side="right")
+
+        return self.frame.iloc[self.offsets[low]:self.offsets[high]]
+
+    def bounds(self) -> tuple[int, int]:
+        '''
+        Provides the first and last year of the frame.
+        '''
+        return int(self.years[0]), int(self.years[-1])
@@ -0,0 +1,121 @@
+'''
+This section contributes towards refreshing the datasets while the dashboard is running. The source files of the loaded datasets are polled in a background thread; a file whose content changed has its pipeline run again through the DatasetLoader and the new dataset replaces the old one once it is complete, so the data is refreshed without a restart and without blocking the readers of the current frames.
+'''
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class DataWatcher:
+    '''
+    The DataWatcher polls the size and mtime of the source file of every loaded dataset. Only a file whose content hash differs from the one its dataset was processed from triggers a reload, e.g. a copied file with unchanged content is ignored, and unchanged tables are never parsed again.
+    '''
+
+    def __init__(self, loader, on_swap: Callable = None, interval=2.0) -> None:
+        '''
+        Inputs:
+        - loader: DatasetLoader object holding the datasets
+        - on_swap: function called with the list of reloaded dataset names after they were swapped in, e.g. to rebuild derived frames
+        - interval: seconds between two polls of the background thread
+        '''
+        self.loader = loader
+        self.on_swap = on_swap
+        self.interval = interval
+        self.signatures: dict[str, tuple] = {}
+        self.swaps = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def changed(self) -> list[str]:
+        '''
+        Provides the names of the loaded datasets whose source file content differs from the content their pipeline was run on. The content is only hashed again when the size or mtime of the file changed since the last poll.
+        '''
+        from .cache import content_hash
+        from .genesis import file_signature
+
+        names = []
+        for name, dataset in self.loader.loaded().items():
+            if getattr(dataset, "source_hash", None) is None:
+                continue
+            try:
+                signature = file_signature(dataset.path_to_file)
+            except FileNotFoundError:
+                # A file being replaced may be missing for a moment, it is checked again on the next poll
+                continue
+
+            if self.signatures.get(name) == signature:
+                continue
+            self.signatures[name] = signature
+
+            if content_hash(dataset.path_to_file) != dataset.source_hash:
+                names.append(name)
+
+        return names
+
+    @staticmethod
+    def processed(dataset) -> bool:
+        '''
+        Whether the pipeline produced frames, the processing methods report most failures (e.g. an unknown encoding) by leaving them out.
+        '''
+        return bool(dataset.processed_frames())
+
+    def poll(self) -> list[str]:
+        '''
+        Reloads the datasets with changed source files and swaps them in once every reload has finished.
+
+        Output:
+        - names of the swapped datasets
+        '''
+        # Only the check and the submit are serialised, start() and other pollers are not held up by the reloads themselves
+        with self._lock:
+            reloads = {name: self.loader.reload(name, accept=self.processed) for name in self.changed()}
+
+        swapped = []
+        for name, future in reloads.items():
+            try:
+                if not self.processed(future.result()):
+                    raise ValueError("the pipeline produced no frames")
+            except Exception as error:
+                logger.warning("Reload of %s failed, the current dataset is kept: %r", name, error)
+                continue
+            swapped.append(name)
+
+        if swapped:
+            with self._lock:
+                self.swaps += 1
+            logger.info("Datasets %s reloaded from changed source files", swapped)
+            if self.on_swap is not None:
+                self.on_swap(swapped)
+
+        return swapped
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as error:
+                # The watcher keeps running, the next poll starts from the recorded state
+                logger.warning("Polling the data files failed: %r", error)
+
+    def start(self) -> "DataWatcher":
+        '''
+        Starts the background polling thread unless it is running.
+        '''
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+                self._thread.start()
+
+        return self
+
+    def stop(self, timeout=None) -> None:
+        '''
+        Stops the background polling thread.
+        '''
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
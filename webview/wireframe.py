@@ -1,6 +1,11 @@
+import logging
 import streamlit
-import altair
-from visualizations import public_assist, pa, bsc, basics, melted_df, max_quarterly_value, sub_benefits, subsistence
+import visualizations
+from visualizations import dataset_loader, dataset_watcher, public_assist, basics, subsistence
+from visualizations.instrumentation import instrumentation
+from visualizations.measures import display_values
+
+logger = logging.getLogger(__name__)
 
 class WebApp:
     '''
@@ -20,10 +25,17 @@ class WebApp:
         self.title = title
         self.icon = icon
         self.col: str = "PublicAssistance"
-        self.filter_by_benefit: iter = pa.df[self.col].unique()
+
+        # Each section waits only on its own dataset, the loader keeps parsing the other datasets in the background
+        dataset_loader.start()
+        # Changed files in data/ are re-processed in the background and picked up by the next rerun of the script
+        dataset_watcher.start()
+        self.pa = dataset_loader.result("pa")
+        self.filter_by_benefit: iter = self.pa.df[self.col].unique()
         self.values = ["Expenditure(TEUR)", "Revenue(TEUR)", "NetExpenditure(TEUR)"]
 
-        # Altair visualization sets the backgroun theme to darkmode
+        # Altair visualization sets the backgroun theme to darkmode, altair is only imported once the application is built
+        import altair
         altair.themes.enable("dark")
 
         # Method calls upon instantiation to load the visualizations directly as the program loads up, all parameters are defined within each function definition with their respective datasets
@@ -32,7 +44,8 @@ class WebApp:
         self.establish_top_wireframe()
         self.middle_wireframe()
         self.second_dataset()
-        self.thirdataset(data=sub_benefits.filtered_df)
+        self.thirdataset()
+        self.diagnostics()
 
     def page_configuration(self, theme="dark"):
         '''
@@ -45,7 +58,7 @@ class WebApp:
             initial_sidebar_state="auto"
         )
 
-        print("Streamlit Webpage Setup complete")        
+        logger.info("Streamlit Webpage Setup complete")
         return
     
     def develop_sidebar(self):
@@ -60,7 +73,7 @@ class WebApp:
             self.value_measure: iter = streamlit.selectbox("Filter by Exp, Rev, NetExp", self.values)
 
 
-            self.region: str = streamlit.multiselect("Select Bundesland", pa.Länder_df["Länder"].unique(), default=pa.Länder_df["Länder"].unique())
+            self.region: str = streamlit.multiselect("Select Bundesland", self.pa.Länder_df["Länder"].unique(), default=self.pa.Länder_df["Länder"].unique())
 
             streamlit.markdown("***")
             streamlit.markdown("This project is part of the M605A Advanced Programming Module in GISMA University of Applied Sciences")
@@ -79,7 +92,9 @@ class WebApp:
 
             streamlit.markdown("Deutschland's tax contribution bracket is coupled with social benefit payments - supported by the Sozialamt. This dashboard highlights the overall expenditures within this sector and looks into two specific areas: Basic Security benefits & Subsistence Payments.")
 
-            map_region_filter = pa.Länder_df[pa.Länder_df["Länder"].isin(self.region)] 
+            # Widget changes are answered from the precomputed rollups of the aggregate cube, which is built from the datasets started by the loader
+            aggregate_cube = visualizations.aggregate_cube
+            map_region_filter = aggregate_cube.query("pa", by=["Länder"], where={"Länder": self.region})
 
 
 
@@ -90,7 +105,7 @@ class WebApp:
                                 color=self.value_measure, 
                                 labels={self.value_measure: f"{self.value_measure[:-5]}in Thousand Euros"}, 
                                 title=f"{self.value_measure} By State in Deutschland", 
-                                range_color=(0, pa.Länder_df["NetExpenditure(TEUR)"].max())
+                                range_color=(0, display_values(aggregate_cube.query("pa", by=["Länder"]))["NetExpenditure(TEUR)"].max())
                                 )
             streamlit.plotly_chart(deutschland_map, use_container_width=True)
 
@@ -98,10 +113,12 @@ class WebApp:
         '''
         The dataset is segregated within the function call to establish a second entity within the streamlit application. Housing the visualizations from the relationships within the first dataset. Outlines the barplot visualizations, table view and donut chart.
         '''
+        aggregate_cube = visualizations.aggregate_cube
+
         with streamlit.container():
             
             barplot_visual = public_assist.bar_plot_visual(
-                    data=pa.df, 
+                    data=aggregate_cube.query("pa", by=[self.col, "Länder"], where={self.col: [self.filter_by], "Länder": self.region}), 
                     column_name=self.col, 
                     filter_by=self.filter_by, 
                     fig_title=f"{self.value_measure} by {self.filter_by}", 
@@ -113,7 +130,7 @@ class WebApp:
             col1, col2 = streamlit.columns(2, gap="small")
 
             with col1:
-                table_view = public_assist.sorted_df_visual(data=pa.PublicAssistance_df, sort_by="PublicAssistance", asc_order=True)
+                table_view = public_assist.sorted_df_visual(data=aggregate_cube.query("pa", by=[self.col]), sort_by="PublicAssistance", asc_order=True)
 
                 streamlit.dataframe(
                     table_view,
@@ -125,25 +142,25 @@ class WebApp:
                             "Expenditure(TEUR)",
                             format="%f",
                             min_value=0,
-                            max_value=max(table_view["Expenditure(TEUR)"])
+                            max_value=table_view["Expenditure(TEUR)"].max()
                         ),
                         "Revenue(TEUR)": streamlit.column_config.ProgressColumn(
                             "Revenue",
                             format="%f",
                             min_value=0,
-                            max_value=max(table_view["Revenue(TEUR)"])
+                            max_value=table_view["Revenue(TEUR)"].max()
                         ),
                         "NetExpenditure(TEUR)": streamlit.column_config.ProgressColumn(
                             "NetExpenditure(TEUR)",
                             format="%f",
                             min_value=0,
-                            max_value=max(table_view["NetExpenditure(TEUR)"])
+                            max_value=table_view["NetExpenditure(TEUR)"].max()
                         )
                     }
                 )
 
             with col2:
-                do_visual = public_assist.donut_visual(data=pa.PublicAssistance_df, grouping_type=self.value_measure, col_name=self.col, in_percent=True)
+                do_visual = public_assist.donut_visual(data=aggregate_cube.query("pa", by=[self.col], measures=[self.value_measure]), grouping_type=self.value_measure, col_name=self.col, in_percent=True)
 
                 streamlit.plotly_chart(do_visual)
 
@@ -151,6 +168,9 @@ class WebApp:
         '''
         Encompasses the second dataset within a separate section of streamlit and provides the visualizations to seek the relationship and data analysis of the Basic Security Benefits.
         '''
+        bsc = dataset_loader.result("bsc")
+        melted_df, max_quarterly_value = bsc.max_quarterly_assessment(data=bsc.LänderGender_df, cols=["Länder", "Q1", "Q2", "Q3", "Q4"], var_assignment="Quarter", value_name="Value")
+
         with streamlit.container():
             streamlit.subheader("Social Benefits: Basic Security Benefits", divider="violet")
 
@@ -172,21 +192,40 @@ class WebApp:
             streamlit.plotly_chart(grouped_bar)
 
 
-    def thirdataset(self, data: object):
+    def thirdataset(self):
         '''
         Focusing the Subsistence Payment section of the relationships in social benefits. The Subsistence Payments relationship over time.
         '''
+        sub_benefits = dataset_loader.result("sub_benefits")
+
         with streamlit.container():
             streamlit.subheader("Social Benefits: Subsistence Payment Recipients", divider="blue")
             
-            
-            
-            visual_filter = data[sub_benefits.filtered_df["Länder"].isin(self.region)]
+            # Each move of the slider is a binary search over the year partitions of the Subsistence table
+            first_year, last_year = sub_benefits.year_bounds()
+            self.years: tuple = streamlit.slider("Subsistence Years", min_value=first_year, max_value=last_year, value=(max(first_year, 2010), min(last_year, 2022)))
+            data = sub_benefits.year_range(*self.years)
+
+            visual_filter = data[data["Länder"].isin(self.region)]
 
             visual = subsistence.line_progression_chart(data=visual_filter, X="Year", y="Total", hue="Länder", title="Total Recipients of Subsistence Benefits By Bundesland")
 
             streamlit.plotly_chart(visual)
 
+    def diagnostics(self):
+        '''
+        Hidden panel with the per-stage timings of the dataset pipelines and figure builders, shown when the page is opened with ?diagnostics in its URL. The full report can be downloaded as JSON.
+        '''
+        if "diagnostics" not in streamlit.query_params:
+            return
+
+        import pandas as pd
+
+        with streamlit.expander("Diagnostics", expanded=True):
+            streamlit.dataframe(pd.DataFrame(instrumentation.summary()), hide_index=True)
+            streamlit.json(dataset_loader.report())
+            streamlit.download_button("Download timing report", instrumentation.to_json(), file_name="timing_report.json", mime="application/json")
+
 
 
 